@@ -0,0 +1,334 @@
+"""
+Advanced Metrics - Hollinger PER and Basketball-Reference Win Shares
+Computed in bulk from season totals instead of scraped per season.
+
+Inputs (NBA API column names, any number of seasons stacked):
+  players: SEASON, PLAYER_NAME, TEAM_ID, GP, MIN, FGM, FGA, FG3M, FTM, FTA,
+           OREB, DREB, REB, AST, STL, BLK, TOV, PF, PTS        (Totals)
+  teams:   SEASON, TEAM_ID, GP, MIN (game minutes), the same box columns,
+           and OPP_FGM, OPP_FGA, OPP_FTM, OPP_FTA, OPP_OREB, OPP_DREB,
+           OPP_TOV, OPP_PTS                                   (Totals + Opponent)
+
+League totals are per-season grouped broadcasts over the team table, team
+context is joined back to every player-season, and the per-player formulas are
+metrics_engine metrics evaluated in one vectorised pass. A traded player is
+evaluated against the context of the team listed on his row.
+
+References: Hollinger PER and the Win Shares / Dean Oliver individual rating
+definitions in the Basketball-Reference glossary.
+"""
+
+import numpy as np
+
+import metrics_engine
+from metrics_engine import metric
+
+TEAM_BOX = ['GP', 'MIN', 'FGM', 'FGA', 'FG3M', 'FTM', 'FTA', 'OREB', 'DREB', 'REB',
+            'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS']
+OPP_BOX = ['OPP_FGM', 'OPP_FGA', 'OPP_FTM', 'OPP_FTA', 'OPP_OREB', 'OPP_DREB',
+           'OPP_TOV', 'OPP_PTS']
+LEAGUE_SUMS = ['GP', 'MIN', 'FGM', 'FGA', 'FTM', 'FTA', 'OREB', 'REB', 'AST', 'TOV',
+               'PF', 'PTS', 'TEAM_POSS']
+
+TEAM_METRICS = ['TEAM_POSS', 'TEAM_PACE', 'TEAM_SCPOSS', 'TEAM_ORB_PCT', 'TEAM_PLAY_PCT',
+                'TEAM_ORB_WEIGHT', 'TEAM_DRTG', 'DOR_PCT', 'FMWT', 'D_PTS_PER_SCPOSS']
+LEAGUE_METRICS = ['LG_FACTOR', 'LG_VOP', 'LG_DRB_PCT', 'LG_PACE', 'LG_PPP',
+                  'MARGINAL_PTS_PER_WIN']
+PLAYER_METRICS = ['uPER', 'aPER', 'PPROD', 'TOT_POSS', 'ORTG', 'DRTG',
+                  'OWS', 'DWS', 'WS', 'WS_48']
+
+
+def _div(a, b):
+    """a / b with 0 where b == 0 (players with no FTA, etc.)"""
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    return np.divide(a, b, out=np.zeros_like(a), where=b != 0)
+
+
+def _ft_miss_sq(ftm, fta):
+    """(1 - FT%)^2, the share of trips ending with a missed final free throw"""
+    return (1 - _div(ftm, fta)) ** 2
+
+
+# ============= TEAM CONTEXT (evaluated on the team table) =============
+
+@metric('TEAM_POSS', 'TM_FGA', 'TM_FTA', 'TM_OREB', 'TM_DREB', 'TM_FGM', 'TM_TOV',
+        'OPP_FGA', 'OPP_FTA', 'OPP_OREB', 'OPP_DREB', 'OPP_FGM', 'OPP_TOV')
+def _team_poss(fga, fta, oreb, dreb, fgm, tov, o_fga, o_fta, o_oreb, o_dreb, o_fgm, o_tov):
+    """Possessions, averaged over both teams' estimates"""
+    team = fga + 0.4 * fta - 1.07 * _div(oreb, oreb + o_dreb) * (fga - fgm) + tov
+    opp = o_fga + 0.4 * o_fta - 1.07 * _div(o_oreb, o_oreb + dreb) * (o_fga - o_fgm) + o_tov
+    return 0.5 * (team + opp)
+
+
+@metric('TEAM_PACE', 'TEAM_POSS', 'TM_MIN')
+def _team_pace(poss, game_minutes):
+    """Possessions per 48 minutes"""
+    return 48 * _div(poss, game_minutes)
+
+
+@metric('TEAM_SCPOSS', 'TM_FGM', 'TM_FTM', 'TM_FTA')
+def _team_scposs(fgm, ftm, fta):
+    """Team scoring possessions"""
+    return fgm + (1 - _ft_miss_sq(ftm, fta)) * fta * 0.4
+
+
+@metric('TEAM_ORB_PCT', 'TM_OREB', 'OPP_DREB')
+def _team_orb_pct(oreb, o_dreb):
+    return _div(oreb, oreb + o_dreb)
+
+
+@metric('TEAM_PLAY_PCT', 'TEAM_SCPOSS', 'TM_FGA', 'TM_FTA', 'TM_TOV')
+def _team_play_pct(scposs, fga, fta, tov):
+    return _div(scposs, fga + fta * 0.4 + tov)
+
+
+@metric('TEAM_ORB_WEIGHT', 'TEAM_ORB_PCT', 'TEAM_PLAY_PCT')
+def _team_orb_weight(orb_pct, play_pct):
+    num = (1 - orb_pct) * play_pct
+    return _div(num, num + orb_pct * (1 - play_pct))
+
+
+@metric('TEAM_DRTG', 'OPP_PTS', 'TEAM_POSS')
+def _team_drtg(o_pts, poss):
+    """Points allowed per 100 possessions"""
+    return 100 * _div(o_pts, poss)
+
+
+@metric('DOR_PCT', 'OPP_OREB', 'TM_DREB')
+def _dor_pct(o_oreb, dreb):
+    """Opponent offensive rebound rate"""
+    return _div(o_oreb, o_oreb + dreb)
+
+
+@metric('FMWT', 'OPP_FGM', 'OPP_FGA', 'DOR_PCT')
+def _fmwt(o_fgm, o_fga, dor_pct):
+    """Weight of forced misses vs defensive rebounds in stops"""
+    dfg = _div(o_fgm, o_fga)
+    num = dfg * (1 - dor_pct)
+    return _div(num, num + (1 - dfg) * dor_pct)
+
+
+@metric('D_PTS_PER_SCPOSS', 'OPP_PTS', 'OPP_FGM', 'OPP_FTM', 'OPP_FTA')
+def _d_pts_per_scposs(o_pts, o_fgm, o_ftm, o_fta):
+    return _div(o_pts, o_fgm + (1 - _ft_miss_sq(o_ftm, o_fta)) * o_fta * 0.4)
+
+
+# ============= LEAGUE CONTEXT (on team rows, after per-season sums) =============
+
+@metric('LG_FACTOR', 'LG_AST', 'LG_FGM', 'LG_FTM')
+def _lg_factor(ast, fgm, ftm):
+    return 2 / 3 - _div(0.5 * _div(ast, fgm), 2 * _div(fgm, ftm))
+
+
+@metric('LG_VOP', 'LG_PTS', 'LG_FGA', 'LG_OREB', 'LG_TOV', 'LG_FTA')
+def _lg_vop(pts, fga, oreb, tov, fta):
+    """League value of a possession"""
+    return _div(pts, fga - oreb + tov + 0.44 * fta)
+
+
+@metric('LG_DRB_PCT', 'LG_REB', 'LG_OREB')
+def _lg_drb_pct(reb, oreb):
+    return _div(reb - oreb, reb)
+
+
+@metric('LG_PACE', 'LG_TEAM_POSS', 'LG_MIN')
+def _lg_pace(poss, game_minutes):
+    return 48 * _div(poss, game_minutes)
+
+
+@metric('LG_PPP', 'LG_PTS', 'LG_TEAM_POSS')
+def _lg_ppp(pts, poss):
+    """League points per possession"""
+    return _div(pts, poss)
+
+
+@metric('MARGINAL_PTS_PER_WIN', 'LG_PTS', 'LG_GP', 'TEAM_PACE', 'LG_PACE')
+def _marginal_pts_per_win(pts, games, pace, lg_pace):
+    return 0.32 * _div(pts, games) * _div(pace, lg_pace)
+
+
+# ============= PLAYER METRICS =============
+
+@metric('uPER', 'MIN', 'FG3M', 'AST', 'FGM', 'FTM', 'FGA', 'FTA', 'TOV', 'REB', 'OREB',
+        'STL', 'BLK', 'PF', 'TM_AST', 'TM_FGM', 'LG_FACTOR', 'LG_VOP', 'LG_DRB_PCT',
+        'LG_FTM', 'LG_FTA', 'LG_PF')
+def _uper(mp, fg3m, ast, fgm, ftm, fga, fta, tov, reb, oreb, stl, blk, pf,
+          tm_ast, tm_fgm, factor, vop, drb_pct, lg_ftm, lg_fta, lg_pf):
+    """Unadjusted PER (Hollinger)"""
+    tm_ast_ratio = _div(tm_ast, tm_fgm)
+    value = (fg3m
+             + (2 / 3) * ast
+             + (2 - factor * tm_ast_ratio) * fgm
+             + ftm * 0.5 * (1 + (1 - tm_ast_ratio) + (2 / 3) * tm_ast_ratio)
+             - vop * tov
+             - vop * drb_pct * (fga - fgm)
+             - vop * 0.44 * (0.44 + 0.56 * drb_pct) * (fta - ftm)
+             + vop * (1 - drb_pct) * (reb - oreb)
+             + vop * drb_pct * oreb
+             + vop * stl
+             + vop * drb_pct * blk
+             - pf * (_div(lg_ftm, lg_pf) - 0.44 * _div(lg_fta, lg_pf) * vop))
+    return _div(value, mp)
+
+
+@metric('aPER', 'uPER', 'LG_PACE', 'TEAM_PACE')
+def _aper(uper, lg_pace, pace):
+    """Pace-adjusted PER (normalised to a league average of 15 per season)"""
+    return uper * _div(lg_pace, pace)
+
+
+@metric('Q_AST', 'MIN', 'AST', 'FGM', 'TM_MP', 'TM_AST', 'TM_FGM', intermediate=True)
+def _q_ast(mp, ast, fgm, tm_mp, tm_ast, tm_fgm):
+    """Share of a player's field goals that were assisted"""
+    share = _div(mp, tm_mp / 5)
+    return (share * (1.14 * _div(tm_ast - ast, tm_fgm))
+            + _div(_div(tm_ast, tm_mp) * mp * 5 - ast, _div(tm_fgm, tm_mp) * mp * 5 - fgm)
+            * (1 - share))
+
+
+@metric('SCORING_WEIGHT', 'TM_OREB', 'TEAM_SCPOSS', 'TEAM_ORB_WEIGHT', 'TEAM_PLAY_PCT',
+        intermediate=True)
+def _scoring_weight(tm_oreb, scposs, orb_weight, play_pct):
+    """Discount for team offensive rebounds credited separately"""
+    return 1 - _div(tm_oreb, scposs) * orb_weight * play_pct
+
+
+@metric('TOT_POSS', 'FGM', 'FGA', 'FTM', 'FTA', 'PTS', 'AST', 'OREB', 'TOV', 'Q_AST',
+        'TM_PTS', 'TM_FTM', 'TM_FGA', 'TEAM_ORB_PCT', 'TEAM_ORB_WEIGHT', 'TEAM_PLAY_PCT',
+        'SCORING_WEIGHT')
+def _tot_poss(fgm, fga, ftm, fta, pts, ast, oreb, tov, q_ast, tm_pts, tm_ftm, tm_fga,
+              orb_pct, orb_weight, play_pct, scoring_weight):
+    """Individual possessions used (Oliver)"""
+    fg_part = fgm * (1 - 0.5 * _div(pts - ftm, 2 * fga) * q_ast)
+    ast_part = 0.5 * _div((tm_pts - tm_ftm) - (pts - ftm), 2 * (tm_fga - fga)) * ast
+    ft_part = (1 - _ft_miss_sq(ftm, fta)) * 0.4 * fta
+    orb_part = oreb * orb_weight * play_pct
+    sc_poss = (fg_part + ast_part + ft_part) * scoring_weight + orb_part
+    fgx_poss = (fga - fgm) * (1 - 1.07 * orb_pct)
+    ftx_poss = _ft_miss_sq(ftm, fta) * 0.4 * fta
+    return sc_poss + fgx_poss + ftx_poss + tov
+
+
+@metric('PPROD', 'FGM', 'FGA', 'FG3M', 'FTM', 'PTS', 'AST', 'OREB', 'Q_AST', 'TM_FGM',
+        'TM_FG3M', 'TM_PTS', 'TM_FTM', 'TM_FGA', 'TEAM_SCPOSS', 'TEAM_ORB_WEIGHT',
+        'TEAM_PLAY_PCT', 'SCORING_WEIGHT')
+def _pprod(fgm, fga, fg3m, ftm, pts, ast, oreb, q_ast, tm_fgm, tm_fg3m, tm_pts, tm_ftm,
+           tm_fga, scposs, orb_weight, play_pct, scoring_weight):
+    """Individual points produced (Oliver)"""
+    fg_part = 2 * (fgm + 0.5 * fg3m) * (1 - 0.5 * _div(pts - ftm, 2 * fga) * q_ast)
+    ast_part = (2 * _div(tm_fgm - fgm + 0.5 * (tm_fg3m - fg3m), tm_fgm - fgm)
+                * 0.5 * _div((tm_pts - tm_ftm) - (pts - ftm), 2 * (tm_fga - fga)) * ast)
+    orb_part = oreb * orb_weight * play_pct * _div(tm_pts, scposs)
+    return (fg_part + ast_part + ftm) * scoring_weight + orb_part
+
+
+@metric('ORTG', 'PPROD', 'TOT_POSS')
+def _ortg(pprod, tot_poss):
+    """Individual offensive rating: points produced per 100 possessions"""
+    return 100 * _div(pprod, tot_poss)
+
+
+@metric('STOPS', 'MIN', 'STL', 'BLK', 'DREB', 'PF', 'FMWT', 'DOR_PCT', 'OPP_FGA',
+        'OPP_FGM', 'OPP_TOV', 'OPP_FTM', 'OPP_FTA', 'TM_BLK', 'TM_STL', 'TM_PF', 'TM_MP')
+def _stops(mp, stl, blk, dreb, pf, fmwt, dor_pct, o_fga, o_fgm, o_tov, o_ftm, o_fta,
+           tm_blk, tm_stl, tm_pf, tm_mp):
+    """Individual defensive stops (Oliver)"""
+    stops1 = stl + blk * fmwt * (1 - 1.07 * dor_pct) + dreb * (1 - fmwt)
+    stops2 = ((_div(o_fga - o_fgm - tm_blk, tm_mp) * fmwt * (1 - 1.07 * dor_pct)
+               + _div(o_tov - tm_stl, tm_mp)) * mp
+              + _div(pf, tm_pf) * 0.4 * o_fta * _ft_miss_sq(o_ftm, o_fta))
+    return stops1 + stops2
+
+
+@metric('DRTG', 'STOPS', 'MIN', 'TM_MP', 'TEAM_POSS', 'TEAM_DRTG', 'D_PTS_PER_SCPOSS')
+def _drtg(stops, mp, tm_mp, poss, team_drtg, d_pts_per_scposs):
+    """Individual defensive rating: points allowed per 100 possessions"""
+    stop_pct = _div(stops * tm_mp, poss * mp)  # opponent MP == team MP
+    return team_drtg + 0.2 * (100 * d_pts_per_scposs * (1 - stop_pct) - team_drtg)
+
+
+@metric('OWS', 'PPROD', 'TOT_POSS', 'LG_PPP', 'MARGINAL_PTS_PER_WIN')
+def _ows(pprod, tot_poss, lg_ppp, marginal_pts_per_win):
+    """Offensive Win Shares"""
+    return _div(pprod - 0.92 * lg_ppp * tot_poss, marginal_pts_per_win)
+
+
+@metric('DWS', 'MIN', 'TM_MP', 'TEAM_POSS', 'LG_PPP', 'DRTG', 'MARGINAL_PTS_PER_WIN')
+def _dws(mp, tm_mp, poss, lg_ppp, drtg, marginal_pts_per_win):
+    """Defensive Win Shares"""
+    marginal_defense = _div(mp, tm_mp) * poss * (1.08 * lg_ppp - drtg / 100)
+    return _div(marginal_defense, marginal_pts_per_win)
+
+
+@metric('WS', 'OWS', 'DWS')
+def _ws(ows, dws):
+    """Win Shares"""
+    return ows + dws
+
+
+@metric('WS_48', 'WS', 'MIN')
+def _ws_48(ws, mp):
+    """Win Shares per 48 minutes"""
+    return 48 * _div(ws, mp)
+
+
+# ============= ENGINE =============
+
+def team_context(teams):
+    """
+    Team and league context per (SEASON, TEAM_ID): team box columns become
+    TM_*, league totals LG_* are per-season sums broadcast to every team row
+    """
+    missing = [c for c in ['SEASON', 'TEAM_ID'] + TEAM_BOX + OPP_BOX if c not in teams.columns]
+    if missing:
+        raise KeyError(f"Team table is missing columns: {', '.join(missing)}")
+
+    context = teams[['SEASON', 'TEAM_ID'] + TEAM_BOX + OPP_BOX].rename(
+        columns={c: f"TM_{c}" for c in TEAM_BOX})
+    context['TM_MP'] = context['TM_MIN'] * 5  # player-minutes
+
+    context = metrics_engine.compute(context, ['TEAM_POSS'])
+
+    # Grouped broadcast of league totals (one groupby for all columns)
+    sums = [f"TM_{c}" if c != 'TEAM_POSS' else c for c in LEAGUE_SUMS]
+    league = context.groupby('SEASON')[sums].transform('sum')
+    league.columns = [f"LG_{c}" for c in LEAGUE_SUMS]
+    context = context.join(league)
+
+    return metrics_engine.compute(context, TEAM_METRICS + LEAGUE_METRICS)
+
+
+def compute(players, teams, metrics=None):
+    """
+    Add PER and Win Shares (plus ORtg/DRtg) to a multi-season player totals
+    table. PER is aPER normalised so the minute-weighted league average is 15.
+    """
+    metrics = metrics or PLAYER_METRICS
+    context = team_context(teams)
+
+    df = players.merge(context, on=['SEASON', 'TEAM_ID'], how='left', validate='many_to_one')
+    unmatched = df['TEAM_POSS'].isna()
+    if unmatched.any():
+        print(f"[WARNING] {unmatched.sum()} player rows have no team context - skipped")
+        df = df[~unmatched]
+
+    df = metrics_engine.compute(df, metrics + ['aPER'])
+
+    # League normalisation: grouped minute-weighted mean of aPER per season
+    weighted = (df['aPER'] * df['MIN']).groupby(df['SEASON']).transform('sum')
+    minutes = df['MIN'].groupby(df['SEASON']).transform('sum')
+    df['PER'] = df['aPER'] * 15 / (weighted / minutes)
+
+    return df[list(players.columns) + ['PER'] + [m for m in metrics if m not in players.columns]]
+
+
+def to_bbref_columns(df):
+    """Rename to the Basketball-Reference advanced table layout"""
+    out = df.rename(columns={'PLAYER_NAME': 'Player', 'TEAM_ABBREVIATION': 'Tm',
+                             'GP': 'G', 'MIN': 'MP', 'WS_48': 'WS/48',
+                             'ORTG': 'ORtg', 'DRTG': 'DRtg'})
+    if {'PTS', 'FGA', 'FTA'} <= set(df.columns):
+        out['TS%'] = _div(df['PTS'], 2 * (df['FGA'] + 0.44 * df['FTA']))
+    columns = ['SEASON', 'Player', 'Tm', 'G', 'MP', 'PER', 'TS%', 'OWS', 'DWS', 'WS',
+               'WS/48', 'ORtg', 'DRtg']
+    return out[[c for c in columns if c in out.columns]]
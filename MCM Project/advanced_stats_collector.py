@@ -4,11 +4,58 @@ Collects Win Shares, PER, BPM, VORP, and team performance data
 """
 
 import pandas as pd
-import requests
+import http_client
 from bs4 import BeautifulSoup
-import time
 import os
-
+import unicodedata
+import instrumentation
+import advanced_metrics
+
+# Basketball-Reference team codes that differ from the NBA API's
+BBREF_TEAMS = {'BRK': 'BKN', 'CHO': 'CHA', 'PHO': 'PHX'}
+
+
+def merge_computed(scraped, computed):
+    """
+    Override the scraped columns `computed` also has with its values. The
+    NBA API rows are season-wide, so they only replace season-wide bbref
+    rows: a traded player's TOT row and players with a single row (joined
+    on Player/Tm, else on a unique name). Traded players' per-team rows and
+    players without a match keep the scraped values.
+    """
+    scraped = scraped.copy()
+    key = scraped['Player'].map(name_key)
+    team = scraped['Tm'].replace(BBREF_TEAMS)
+    season_row = (scraped['Tm'] == 'TOT') | ~key.duplicated(keep=False)
+    computed = computed.assign(_key=computed['Player'].map(name_key))
+    by_team = computed.drop_duplicates(['_key', 'Tm']).set_index(['_key', 'Tm'])
+    by_name = computed.drop_duplicates('_key', keep=False).set_index('_key')
+
+    overrides = [c for c in computed.columns if c not in ('Player', 'Tm', 'G', 'MP', '_key')]
+    found = by_team.reindex(pd.MultiIndex.from_arrays([key, team]))[overrides]
+    found.index = scraped.index
+    by_player = by_name.reindex(key)[overrides]
+    by_player.index = scraped.index
+    missing = found.isna().all(axis=1)
+    found = found.mask(missing, by_player, axis=0)
+    matched = found.notna().any(axis=1) & season_row
+
+    for column in overrides:
+        values = pd.to_numeric(found[column], errors='coerce')
+        scraped[column] = values.where(matched, scraped[column]) \
+            if column in scraped.columns else values.where(matched)
+    print(f"[OK] Computed PER/WS for {int(matched.sum())} of {len(scraped)} rows "
+          f"(BPM/VORP/USG% from Basketball-Reference)")
+    return scraped
+
+
+def name_key(name):
+    """Accent- and case-insensitive player name"""
+    text = unicodedata.normalize('NFKD', str(name))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower().strip()
+
+
+@instrumentation.instrument_class
 class AdvancedStatsCollector:
     def __init__(self):
         self.headers = {
@@ -25,8 +72,8 @@ class AdvancedStatsCollector:
         url = f"https://www.basketball-reference.com/leagues/NBA_{year}_advanced.html"
 
         try:
-            time.sleep(self.delay)
-            response = requests.get(url, headers=self.headers)
+            instrumentation.throttle(self.delay)
+            response = http_client.get(url, headers=self.headers)
 
             if response.status_code == 200:
                 # Parse tables with pandas
@@ -71,6 +118,93 @@ class AdvancedStatsCollector:
             print(f"[ERROR] {e}")
             return pd.DataFrame()
 
+    def get_season_totals(self, season='2023-24'):
+        """
+        Player and team season totals (team + opponent) from the NBA API,
+        the inputs advanced_metrics needs for PER and Win Shares
+        """
+        from nba_api.stats.endpoints import leaguedashplayerstats, leaguedashteamstats
+
+        print(f"  Fetching {season} player/team totals from NBA API...")
+        players = leaguedashplayerstats.LeagueDashPlayerStats(
+            season=season,
+            per_mode_detailed='Totals'
+        )
+        instrumentation.record_endpoint(players)
+        df_players = players.get_data_frames()[0]
+        instrumentation.throttle(self.delay)
+
+        teams = leaguedashteamstats.LeagueDashTeamStats(
+            season=season,
+            per_mode_detailed='Totals'
+        )
+        instrumentation.record_endpoint(teams)
+        df_teams = teams.get_data_frames()[0]
+        instrumentation.throttle(self.delay)
+
+        opponents = leaguedashteamstats.LeagueDashTeamStats(
+            season=season,
+            per_mode_detailed='Totals',
+            measure_type_detailed_defense='Opponent'
+        )
+        instrumentation.record_endpoint(opponents)
+        df_opp = opponents.get_data_frames()[0]
+        instrumentation.throttle(self.delay)
+
+        opp_cols = ['TEAM_ID'] + [c for c in df_opp.columns if c.startswith('OPP_')]
+        df_teams = df_teams.merge(df_opp[opp_cols], on='TEAM_ID')
+
+        df_players.insert(0, 'SEASON', season)
+        df_teams.insert(0, 'SEASON', season)
+        return df_players, df_teams
+
+    def compute_advanced_stats(self, seasons=('2023-24',)):
+        """
+        PER, OWS, DWS, WS and WS/48 computed from NBA API totals for any number
+        of seasons in one pass, in the Basketball-Reference column layout
+        """
+        print(f"\n[1/3] Computing PER and Win Shares for {', '.join(seasons)}...")
+
+        try:
+            player_frames, team_frames = [], []
+            for season in seasons:
+                df_players, df_teams = self.get_season_totals(season)
+                player_frames.append(df_players)
+                team_frames.append(df_teams)
+
+            players = pd.concat(player_frames, ignore_index=True)
+            teams = pd.concat(team_frames, ignore_index=True)
+
+            df = advanced_metrics.compute(players[players['MIN'] > 0], teams)
+            df_clean = advanced_metrics.to_bbref_columns(df).sort_values('WS', ascending=False)
+
+            print(f"[OK] Computed advanced stats for {len(df_clean)} player-seasons")
+            print(f"    Metrics: PER, OWS, DWS, WS, WS/48, ORtg, DRtg, TS%")
+
+            return df_clean
+
+        except Exception as e:
+            print(f"[ERROR] {e}")
+            return pd.DataFrame()
+
+    def get_advanced_stats(self, year=2024):
+        """
+        Basketball-Reference advanced table (BPM, VORP, USG%, ...) with PER/WS
+        and the other computed columns replaced by values computed from NBA
+        API totals. Either source alone is returned if the other fails.
+        """
+        scraped = self.scrape_basketball_reference_advanced(year)
+        season = f"{year - 1}-{str(year)[2:]}"
+        computed = self.compute_advanced_stats([season])
+        if computed.empty:
+            print("[INFO] Using Basketball-Reference PER/WS (computation failed)")
+            return scraped
+        computed = computed.drop(columns=['SEASON'])
+        if scraped.empty:
+            print("[WARNING] Basketball-Reference unavailable - no BPM/VORP/USG%")
+            return computed
+        return merge_computed(scraped, computed)
+
     def scrape_basketball_reference_per_game(self, year=2024):
         """
         Scrape per-game stats to supplement existing data
@@ -80,8 +214,8 @@ class AdvancedStatsCollector:
         url = f"https://www.basketball-reference.com/leagues/NBA_{year}_per_game.html"
 
         try:
-            time.sleep(self.delay)
-            response = requests.get(url, headers=self.headers)
+            instrumentation.throttle(self.delay)
+            response = http_client.get(url, headers=self.headers)
 
             if response.status_code == 200:
                 tables = pd.read_html(response.text)
@@ -123,8 +257,8 @@ class AdvancedStatsCollector:
         url = f"https://www.basketball-reference.com/leagues/NBA_{year}.html"
 
         try:
-            time.sleep(self.delay)
-            response = requests.get(url, headers=self.headers)
+            instrumentation.throttle(self.delay)
+            response = http_client.get(url, headers=self.headers)
 
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
@@ -152,8 +286,8 @@ class AdvancedStatsCollector:
 
                 # If not found in main table, try advanced team stats
                 url_advanced = f"https://www.basketball-reference.com/leagues/NBA_{year}_ratings.html"
-                time.sleep(self.delay)
-                response = requests.get(url_advanced, headers=self.headers)
+                instrumentation.throttle(self.delay)
+                response = http_client.get(url_advanced, headers=self.headers)
 
                 if response.status_code == 200:
                     tables = pd.read_html(response.text)
@@ -183,7 +317,7 @@ class AdvancedStatsCollector:
         os.makedirs('data', exist_ok=True)
 
         # Collect advanced stats
-        advanced = self.scrape_basketball_reference_advanced(year)
+        advanced = self.get_advanced_stats(year)
         if not advanced.empty:
             filepath = 'data/1_player_advanced_bbref.csv'
             advanced.to_csv(filepath, index=False)
@@ -211,8 +345,9 @@ class AdvancedStatsCollector:
         if not advanced.empty:
             print("  - PER (Player Efficiency Rating)")
             print("  - WS (Win Shares) - OWS + DWS")
-            print("  - BPM (Box Plus/Minus) - OBPM + DBPM")
-            print("  - VORP (Value Over Replacement Player)")
+            if 'BPM' in advanced.columns:
+                print("  - BPM (Box Plus/Minus) - OBPM + DBPM")
+                print("  - VORP (Value Over Replacement Player)")
             print("  - TS% (True Shooting Percentage)")
             print("  - USG% (Usage Rate)")
 
@@ -0,0 +1,225 @@
+"""
+Availability Engine
+Games missed, longest absence and availability rate for every player in every
+season, derived from stored game logs (game_log_collector.py) instead of
+hand-entered injury lists.
+
+A team's schedule is its ordered array of game IDs; a player's appearances
+are the game IDs they logged. Every schedule game during the player's time
+with the team that is not among their appearances was missed (injury, rest or
+DNP - the logs don't say which). Both arrays are mapped onto positions in one
+league-wide schedule sorted by (season, team, date), so the set difference
+for all players at once is a join plus a few array operations:
+
+    games possible  = schedule positions in the player's window with the team
+    games missed    = games possible - appearances
+    longest absence = largest gap between consecutive appearance positions
+
+Traded players get one window per team: the first stint starts at the team's
+opener, the last ends at its final game, and each new team's window starts
+with its first game after the player's last appearance for the old one.
+Signings and releases are not in the logs, so those show up as absences.
+
+    python availability_engine.py --seasons 2021-22,2022-23,2023-24
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+
+KEYS = ['season', 'TEAM_ID', 'GAME_ID']
+# Window of the injury tables (Games_Missed_2021..2023), ending with the 2023-24
+# season the collectors fetch stats for
+INJURY_SEASONS = ['2021-22', '2022-23', '2023-24']
+STINT_COLUMNS = ['season', 'PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'TEAM_ABBREVIATION',
+                 'Games_Played', 'Games_Possible', 'Games_Missed', 'Longest_Absence']
+
+
+def _days(dates):
+    """'YYYY-MM-DD' strings -> integer day numbers"""
+    return pd.to_datetime(dates).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+def team_schedules(team_logs, season_type='Regular Season'):
+    """
+    One row per (season, team, game) ordered by date, with POS = position in
+    the league-wide schedule and TS = team-season code
+    """
+    if season_type and 'SEASON_TYPE' in team_logs.columns:
+        team_logs = team_logs[team_logs['SEASON_TYPE'] == season_type]
+    schedule = (team_logs[KEYS + ['GAME_DATE']]
+                .drop_duplicates(KEYS)
+                .sort_values(['season', 'TEAM_ID', 'GAME_DATE', 'GAME_ID'])
+                .reset_index(drop=True))
+    schedule['POS'] = np.arange(len(schedule))
+    schedule['TS'] = schedule.groupby(['season', 'TEAM_ID'], sort=False).ngroup()
+    return schedule
+
+
+def stints(player_logs, schedule, season_type='Regular Season'):
+    """
+    One row per uninterrupted spell of a player with a team in a season:
+    appearances, schedule window and the longest run of missed team games
+    """
+    if season_type and 'SEASON_TYPE' in player_logs.columns:
+        player_logs = player_logs[player_logs['SEASON_TYPE'] == season_type]
+    apps = player_logs[KEYS + ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION']].merge(
+        schedule, on=KEYS)
+    apps = apps.sort_values(['season', 'PLAYER_ID', 'GAME_DATE', 'GAME_ID'],
+                            kind='stable').reset_index(drop=True)
+    if apps.empty:
+        return pd.DataFrame(columns=STINT_COLUMNS)
+
+    pos = apps['POS'].to_numpy()
+    ts = apps['TS'].to_numpy()
+    player = apps['PLAYER_ID'].to_numpy()
+    season = apps['season'].to_numpy()
+
+    # A stint starts at a new player-season or a change of team
+    new_player = np.r_[True, (player[1:] != player[:-1]) | (season[1:] != season[:-1])]
+    new_stint = np.r_[True, ts[1:] != ts[:-1]] | new_player
+    starts = np.flatnonzero(new_stint)
+    ends = np.r_[starts[1:], len(apps)] - 1
+
+    gaps = np.r_[0, np.diff(pos) - 1]
+    gaps[new_stint] = 0
+    inner = np.maximum.reduceat(gaps, starts)
+
+    # Team-season boundaries in the schedule, and a sorted (team-season, day) key
+    sched_ts = schedule['TS'].to_numpy()
+    ts_first = np.r_[0, np.flatnonzero(np.diff(sched_ts)) + 1]
+    ts_last = np.r_[ts_first[1:], len(schedule)] - 1
+    sched_day = _days(schedule['GAME_DATE'])
+    day0 = sched_day.min()
+    sched_key = sched_ts * 100_000 + (sched_day - day0)
+    day = _days(apps['GAME_DATE']) - day0
+
+    first_stint = new_player[starts]
+    last_stint = np.r_[new_player[starts][1:], True]
+    stint_ts = ts[starts]
+
+    # After a trade the window opens at the new team's first game after the
+    # player's last game for the old team
+    prev_last_day = np.r_[0, day[ends][:-1]]
+    after_trade = np.searchsorted(sched_key, stint_ts * 100_000 + prev_last_day, side='right')
+    window_start = np.where(first_stint, ts_first[stint_ts], np.minimum(after_trade, pos[starts]))
+    window_end = np.where(last_stint, ts_last[stint_ts], pos[ends])
+
+    played = ends - starts + 1
+    possible = window_end - window_start + 1
+    return pd.DataFrame({
+        'season': season[starts],
+        'PLAYER_ID': player[starts],
+        'PLAYER_NAME': apps['PLAYER_NAME'].to_numpy()[ends],
+        'TEAM_ID': apps['TEAM_ID'].to_numpy()[starts],
+        'TEAM_ABBREVIATION': apps['TEAM_ABBREVIATION'].to_numpy()[ends],
+        'Games_Played': played,
+        'Games_Possible': possible,
+        'Games_Missed': possible - played,
+        'Longest_Absence': np.maximum.reduce([inner, pos[starts] - window_start,
+                                              window_end - pos[ends]]),
+    })
+
+
+def availability(player_logs, team_logs, season_type='Regular Season'):
+    """
+    Availability of every player in every season of the logs: Games_Played,
+    Games_Possible, Games_Missed, Longest_Absence (consecutive team games)
+    and Availability_Rate (% of possible games played)
+    """
+    schedule = team_schedules(team_logs, season_type)
+    spells = stints(player_logs, schedule, season_type)
+
+    df = spells.groupby(['season', 'PLAYER_ID'], as_index=False, sort=False).agg(
+        PLAYER_NAME=('PLAYER_NAME', 'last'),
+        Team=('TEAM_ABBREVIATION', 'last'),
+        Stints=('TEAM_ID', 'size'),
+        Games_Played=('Games_Played', 'sum'),
+        Games_Possible=('Games_Possible', 'sum'),
+        Games_Missed=('Games_Missed', 'sum'),
+        Longest_Absence=('Longest_Absence', 'max'),
+    )
+    df['Availability_Rate'] = (df['Games_Played'] / df['Games_Possible'] * 100).round(1)
+    return df.rename(columns={'season': 'SEASON', 'PLAYER_NAME': 'Player'})
+
+
+def injury_history(avail, seasons=None):
+    """
+    Wide per-player table in the layout of the old hand-entered injury data:
+    Games_Missed_<YYYY> (season starting in YYYY, newest first),
+    Total_Games_Missed_<n>Yr, Games_Possible, Longest_Absence and
+    Availability_Rate. A season without appearances between two with
+    appearances counts as a full season missed.
+    """
+    seasons = sorted(seasons or avail['SEASON'].unique())
+    df = avail[avail['SEASON'].isin(seasons)].sort_values('SEASON')
+    season_games = df.groupby('SEASON')['Games_Possible'].max().reindex(seasons).to_numpy()
+
+    grid = df.pivot_table(index='PLAYER_ID', columns='SEASON',
+                          values=['Games_Played', 'Games_Possible'], aggfunc='sum')
+    played = grid['Games_Played'].reindex(columns=seasons).to_numpy()
+    possible = grid['Games_Possible'].reindex(columns=seasons).to_numpy()
+
+    active = ~np.isnan(possible)
+    col = np.arange(len(seasons))
+    first = np.where(active, col, len(seasons)).min(axis=1)
+    last = np.where(active, col, -1).max(axis=1)
+    sat_out = ~active & (col >= first[:, None]) & (col <= last[:, None])
+    played = np.where(sat_out, 0, played)
+    possible = np.where(sat_out, season_games, possible)
+    missed = possible - played
+
+    totals = df.groupby('PLAYER_ID').agg(
+        Player=('Player', 'last'),
+        Team=('Team', 'last'),
+        Longest_Absence=('Longest_Absence', 'max'),
+    ).reindex(grid.index)
+    wide = totals[['Player', 'Team']].copy()
+    for i in col[::-1]:
+        wide[f"Games_Missed_{seasons[i][:4]}"] = pd.array(missed[:, i]).astype('Int64')
+    wide[f"Total_Games_Missed_{len(seasons)}Yr"] = np.nansum(missed, axis=1).astype(int)
+    wide['Games_Possible'] = np.nansum(possible, axis=1).astype(int)
+    wide['Longest_Absence'] = np.maximum(totals['Longest_Absence'].to_numpy(),
+                                         np.where(sat_out, season_games, 0).max(axis=1))
+    wide['Availability_Rate'] = (np.nansum(played, axis=1) / wide['Games_Possible'] * 100).round(1)
+    return wide.reset_index()
+
+
+def load_availability(seasons=None, root=columnar_store.DEFAULT_ROOT):
+    """Availability from the stored game logs (empty frame if none are stored)"""
+    from game_log_collector import load_game_logs
+
+    players = load_game_logs(seasons, 'P', root)
+    teams = load_game_logs(seasons, 'T', root)
+    if players.empty or teams.empty:
+        return pd.DataFrame()
+    return availability(players, teams)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Player availability from stored game logs")
+    parser.add_argument('--seasons', default=None,
+                        help="Comma separated (default: every stored season)")
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    parser.add_argument('--output', default=os.path.join('data', '4_player_availability.csv'))
+    args = parser.parse_args()
+
+    seasons = args.seasons.split(',') if args.seasons else None
+    print("="*70)
+    print("PLAYER AVAILABILITY FROM GAME LOGS")
+    print("="*70)
+
+    avail = load_availability(seasons, args.root)
+    if avail.empty:
+        print(f"[ERROR] No game logs under {args.root} - run game_log_collector.py first")
+    else:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        avail.to_csv(args.output, index=False)
+        print(f"[OK] {len(avail)} player-seasons, {avail['SEASON'].nunique()} seasons")
+        print(f"    Average availability: {avail['Availability_Rate'].mean():.1f}%")
+        print(f"[SAVED] {args.output}")
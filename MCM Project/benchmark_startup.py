@@ -0,0 +1,90 @@
+"""
+Startup Benchmark
+Measures how long the pipeline CLI takes to start, and how long importing each
+collector step costs, using fresh interpreters and `python -X importtime`
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from collector_registry import COLLECTORS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def time_command(args, repeat=3):
+    """Best-of-N wall time of a fresh interpreter running `args`"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=HERE,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def top_imports(code, limit=5):
+    """
+    Run `code` under -X importtime and return the slowest direct imports of the
+    imported module as (cumulative_seconds, module) pairs
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=HERE, capture_output=True, text=True)
+    timings = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            timings.append((int(parts[1]) / 1e6, name.strip()))
+    return sorted(timings, reverse=True)[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline startup time")
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help="Max seconds allowed for --help/--plan (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print("="*70)
+    print("PIPELINE STARTUP BENCHMARK")
+    print("="*70)
+
+    baseline = time_command(['-c', 'pass'], args.repeat)
+    print(f"\n  Bare interpreter:          {baseline:.3f}s")
+
+    over_budget = []
+    for label, cmd in [('run_pipeline.py --help', ['run_pipeline.py', '--help']),
+                       ('run_pipeline.py --plan', ['run_pipeline.py', '--plan'])]:
+        elapsed = time_command(cmd, args.repeat)
+        flag = '' if elapsed < args.budget else '  [OVER BUDGET]'
+        print(f"  {label:<26} {elapsed:.3f}s{flag}")
+        if elapsed >= args.budget:
+            over_budget.append(label)
+
+    print("\n  Import cost per step (fresh interpreter, best of "
+          f"{args.repeat}):")
+    for name, spec in COLLECTORS.items():
+        code = f"import collector_registry as r; r.load_collector({name!r})"
+        elapsed = time_command(['-c', code], args.repeat)
+        print(f"    {name:<18} {elapsed:.3f}s")
+        for seconds, module in top_imports(f"import {spec['module']}", limit=3):
+            print(f"        {seconds:.3f}s  {module}")
+
+    if over_budget:
+        print(f"\n[WARNING] Over {args.budget:.1f}s budget: {', '.join(over_budget)}")
+        return 1
+
+    print(f"\n[OK] CLI startup within {args.budget:.1f}s budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,496 @@
+"""
+Benchmark Suite
+Times the data-processing hot paths (lineup edge list, network metrics,
+DataMerger merges, derived and full PER/WS metrics, availability and rolling
+form from game logs, stint reconstruction from play-by-play, lineup/player/pair
+ratings from stints, shot-chart binning, similarity index build + k-NN,
+time-series appends with rollups + 30-day momentum, batched sentiment scoring
+over a process pool, MinHash near-duplicate clustering, inverted index build +
+keyword counts, streaming mention sketches + window merges, embedded JSON
+extraction from pages) on synthetic inputs at 1x, 10x and 100x today's size.
+Every run is appended to a history file, and results are compared against a
+saved baseline to flag regressions.
+
+    python benchmark_suite.py                       # run + compare to baseline
+    python benchmark_suite.py --save-baseline       # accept current timings
+    python benchmark_suite.py --scales 1,10 --cases edge_list,network_metrics
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+import synthetic_data
+
+DEFAULT_DIR = os.path.join('data', 'benchmarks')
+
+
+# ---------- cases ----------
+# Each case gets the synthetic tables and a data dir holding them as CSVs, and
+# returns (callable to time, input rows). Setup is not timed.
+
+def case_edge_list(data, data_dir):
+    from lineup_data_collector import LineupDataCollector
+    collector = LineupDataCollector()
+    return lambda: collector.create_network_edge_list(data['lineups']), len(data['lineups'])
+
+
+def case_network_metrics(data, data_dir):
+    from merge_datasets import DataMerger
+    merger = DataMerger(data_dir)
+    return merger.calculate_player_network_metrics, len(data['edges'])
+
+
+def case_merge_performance(data, data_dir):
+    from merge_datasets import DataMerger
+    merger = DataMerger(data_dir)
+    return merger.merge_player_performance_data, len(data['basic'])
+
+
+def case_merge_financial_social(data, data_dir):
+    from merge_datasets import DataMerger
+    merger = DataMerger(data_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        performance = merger.merge_player_performance_data()
+
+    def run():
+        return merger.add_social_data(merger.merge_player_financial_data(performance.copy()))
+    return run, len(performance)
+
+
+def case_derived_metrics(data, data_dir):
+    from complete_data_collector import CompleteDataCollector
+    collector = CompleteDataCollector()
+    return lambda: collector.calculate_derived_metrics(data['box_scores'].copy()), len(data['box_scores'])
+
+
+def case_advanced_metrics(data, data_dir):
+    import advanced_metrics
+    players, teams = synthetic_data.season_totals(data['box_scores'])
+    return lambda: advanced_metrics.compute(players, teams), len(players)
+
+
+def case_availability(data, data_dir):
+    import availability_engine
+    players, teams = synthetic_data.game_logs(data['box_scores'])
+    return lambda: availability_engine.availability(players, teams), len(players)
+
+
+def case_rolling_form(data, data_dir):
+    import rolling_form
+    players, teams = synthetic_data.game_logs(data['box_scores'])
+    state_file = os.path.join(data_dir, 'no_state.npz')
+    return (lambda: rolling_form.RollingForm(state_file).update(players, teams, '9999-12-31'),
+            len(players))
+
+
+def case_stints(data, data_dir):
+    import stint_engine
+    scale = len(data['roster']) // (synthetic_data.BASE_TEAMS * synthetic_data.PLAYERS_PER_TEAM)
+    events = synthetic_data.play_by_play(data['box_scores'], n_games=20 * scale)
+    return lambda: stint_engine.stints(events, workers=1), len(events)
+
+
+def case_lineup_ratings(data, data_dir):
+    import possession_engine
+    import stint_engine
+    scale = len(data['roster']) // (synthetic_data.BASE_TEAMS * synthetic_data.PLAYERS_PER_TEAM)
+    events = synthetic_data.play_by_play(data['box_scores'], n_games=20 * scale)
+    stints = stint_engine.stints(events, workers=1)
+
+    def run():
+        for level in ('lineup', 'player', 'pair'):
+            possession_engine.stint_ratings(stints, level)
+    return run, len(stints)
+
+
+def case_shot_zones(data, data_dir):
+    import shot_zones
+    scale = len(data['roster']) // (synthetic_data.BASE_TEAMS * synthetic_data.PLAYERS_PER_TEAM)
+    shots = synthetic_data.shot_chart(data['box_scores'], n_shots=200_000 * scale)
+
+    def run():
+        for bins in shot_zones.BINS:
+            shot_zones.ShotProfiles.build(shots, bins=bins)
+    return run, len(shots)
+
+
+def case_similarity(data, data_dir):
+    import numpy as np
+    import pandas as pd
+    import similarity_index
+    seasons = pd.concat([synthetic_data.box_scores(data['roster'], seed).assign(
+        SEASON=f"{1998 + seed}-{str(1999 + seed)[2:]}") for seed in range(25)],
+        ignore_index=True)
+
+    def run():
+        index = similarity_index.SimilarityIndex.build(seasons)
+        index.neighbours(np.arange(min(1000, len(index.X))), k=20)
+    return run, len(seasons)
+
+
+def case_timeseries(data, data_dir):
+    import numpy as np
+    import pandas as pd
+    import timeseries_store
+    social = data['social']
+    days = pd.date_range('2024-01-01', periods=365, freq='D')
+    rate = np.random.default_rng(0).uniform(0, 0.003, len(social))
+    followers = pd.DataFrame(
+        social['Instagram_Followers'].to_numpy() * (1 + rate) ** np.arange(len(days))[:, None],
+        index=days, columns=social['Player'])
+
+    def run():
+        store = timeseries_store.TimeSeriesStore(tempfile.mkdtemp(dir=data_dir))
+        for _, month in followers.groupby(followers.index.month):
+            store.record_series('player', 'instagram_followers', month)
+        store.momentum('player', 'instagram_followers', days=30)
+    return run, followers.size
+
+
+def case_sentiment(data, data_dir):
+    import numpy as np
+    import sentiment_engine
+    rng = np.random.default_rng(0)
+    players = data['box_scores']['PLAYER_NAME'].unique()
+    templates = ['{p} is absolutely incredible tonight!!', '{p} is so overrated, not even close',
+                 "I don't think {p} is that bad", 'Post game thread: {p} with the dagger',
+                 '{p} choked again but the ref show was worse', 'Meh. {p} was fine I guess']
+    n = 20 * len(data['box_scores'])  # ~20 posts per player
+    texts = [templates[t].format(p=players[p]) for t, p in
+             zip(rng.integers(0, len(templates), n), rng.integers(0, len(players), n))]
+    # Compiled once, outside the timing, into the temp dir instead of data/cache
+    sentiment_engine.CACHE_DIR = os.path.join(data_dir, 'cache', 'sentiment')
+    sentiment_engine.lexicon_cache()
+
+    def run():
+        sentiment_engine.score_texts(texts)
+    return run, len(texts)
+
+
+def case_near_duplicate(data, data_dir):
+    import numpy as np
+    import near_duplicate
+    rng = np.random.default_rng(0)
+    players = data['box_scores']['PLAYER_NAME'].unique()
+    vocab = np.array([f"w{i}" for i in range(5000)])
+    n = 20 * len(data['box_scores'])
+    originals = [' '.join(row) for row in vocab[rng.integers(0, len(vocab), (n // 2, 30))]]
+    # Half the stream reposts an earlier text with one word changed
+    texts = originals + [
+        f"{players[i % len(players)]} " + originals[j].replace('w1 ', 'w2 ', 1)
+        for i, j in enumerate(rng.integers(0, len(originals), n - len(originals)))]
+    ids = np.arange(n)
+
+    def run():
+        near_duplicate.dedupe(ids, texts)
+    return run, n
+
+
+def case_inverted_index(data, data_dir):
+    import numpy as np
+    import inverted_index
+    rng = np.random.default_rng(0)
+    players = data['box_scores']['PLAYER_NAME'].unique()
+    vocab = np.array([f"w{i}" for i in range(20000)])
+    n = 20 * len(data['box_scores'])
+    texts = [f"{players[i % len(players)]} " + ' '.join(row)
+             for i, row in enumerate(vocab[rng.zipf(1.3, (n, 20)) % len(vocab)])]
+    ts = rng.integers(1_700_000_000, 1_710_000_000, n)
+    queries = list(players[:50]) + [f"w{i} w{i + 1}" for i in range(50)]
+
+    def run():
+        index = inverted_index.InvertedIndex('bench', tempfile.mkdtemp(dir=data_dir))
+        for i in range(0, n, 50_000):
+            index.add(np.arange(i, min(i + 50_000, n)), texts[i:i + 50_000], ts[i:i + 50_000], 1)
+        for q in queries:
+            index.count(q, '2023-12-01', '2024-01-01')
+    return run, n
+
+
+def case_stream_sketches(data, data_dir):
+    import numpy as np
+    import stream_sketches
+    rng = np.random.default_rng(0)
+    players = data['box_scores']['PLAYER_NAME'].unique()
+    n = 20 * len(data['box_scores'])
+    entities = players[rng.zipf(1.3, n) % len(players)]
+    authors = np.array([f"u{i}" for i in rng.integers(0, max(n // 10, 1), n)], dtype=object)
+    # Recent timestamps: sketches only keep the last DAYS_KEPT days
+    end = int(time.time())
+    ts = np.sort(rng.integers(end - 10 * 86400, end, n))
+
+    def run():
+        # Two workers split the stream; their sketches are merged for the query
+        workers = [stream_sketches.Sketches(), stream_sketches.Sketches()]
+        for i in range(0, n, 5000):
+            workers[(i // 5000) % 2].update(ts[i:i + 5000], entities[i:i + 5000],
+                                            authors[i:i + 5000])
+        merged = workers[0].merge(workers[1])
+        for last in ('24h', '7D'):
+            window = merged.window(last)
+            for player, _, _ in window.top.top(20):
+                window.unique_authors(player)
+    return run, n
+
+
+def case_embedded_json(data, data_dir):
+    import json
+    import embedded_json
+    box = data['box_scores']
+    n = 20 * len(box)
+    names = box['PLAYER_NAME'].to_numpy()
+    rows = [{'player': {'name': names[i % len(names)]}, 'team': {'abbreviation': 'SEA'},
+             'capHit': f"${1_000_000 + i:,}", 'capPercent': '1.0%',
+             'contract': {'value': f"${4_000_000 + i:,}", 'years': 4, 'guaranteed': '$0'},
+             'freeAgent': {'year': 2028}} for i in range(n)]
+    # One page per 1,000 players, like paginated rankings
+    pages = [f"<html><head><script type=\"application/ld+json\">{{}}</script></head><body>"
+             f"<script>window.__INITIAL_STATE__ = "
+             f"{json.dumps({'rankings': {'players': rows[i:i + 1000]}})};</script></body></html>"
+             for i in range(0, n, 1000)]
+
+    def run():
+        for page in pages:
+            embedded_json.extract(page, 'spotrac_salaries')
+    return run, n
+
+
+CASES = {
+    'edge_list': case_edge_list,
+    'network_metrics': case_network_metrics,
+    'merge_performance': case_merge_performance,
+    'merge_financial_social': case_merge_financial_social,
+    'derived_metrics': case_derived_metrics,
+    'advanced_metrics': case_advanced_metrics,
+    'availability': case_availability,
+    'rolling_form': case_rolling_form,
+    'stints': case_stints,
+    'lineup_ratings': case_lineup_ratings,
+    'shot_zones': case_shot_zones,
+    'similarity': case_similarity,
+    'timeseries': case_timeseries,
+    'sentiment': case_sentiment,
+    'near_duplicate': case_near_duplicate,
+    'inverted_index': case_inverted_index,
+    'stream_sketches': case_stream_sketches,
+    'embedded_json': case_embedded_json,
+}
+
+
+# ---------- timing ----------
+
+def time_case(func, repeat, budget):
+    """Best-of-N seconds; stops repeating once the budget is used up"""
+    best = float('inf')
+    spent = 0.0
+    runs = 0
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        runs += 1
+        if spent >= budget:
+            break
+    return best, runs
+
+
+def estimate_seconds(timings, scale):
+    """
+    Extrapolate a case's runtime at `scale` from the scales measured so far,
+    using the growth exponent between the last two points (linear if only one)
+    """
+    if not timings:
+        return 0.0
+    points = sorted(timings.items())
+    last_scale, last_seconds = points[-1]
+    exponent = 1.0
+    if len(points) >= 2:
+        prev_scale, prev_seconds = points[-2]
+        if prev_seconds > 0 and last_seconds > 0:
+            exponent = max(1.0, math.log(last_seconds / prev_seconds) /
+                           math.log(last_scale / prev_scale))
+    return last_seconds * (scale / last_scale) ** exponent
+
+
+def git_commit():
+    try:
+        proc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, timeout=10)
+        return proc.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(cases, scales, repeat=3, budget=60.0, seed=0):
+    """
+    Time every case at every scale. A case is skipped at larger scales once its
+    extrapolated runtime exceeds `budget` seconds (e.g. quadratic code at 100x).
+    """
+    results = []
+    timings = {name: {} for name in cases}
+
+    for scale in scales:
+        print(f"\n[DATA] Generating synthetic inputs at {scale}x...")
+        data = synthetic_data.make_dataset(scale, seed)
+        print(f"  {len(data['lineups'])} lineups, {len(data['edges'])} edges, "
+              f"{len(data['box_scores'])} players")
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            synthetic_data.write_dataset(data, data_dir)
+
+            for name in cases:
+                estimate = estimate_seconds(timings[name], scale)
+                if estimate > budget:
+                    print(f"  {name:<24} {scale:>4}x  [SKIPPED] ~{estimate:.0f}s estimated")
+                    results.append({'case': name, 'scale': scale, 'skipped': True,
+                                    'estimated_seconds': round(estimate, 3)})
+                    continue
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    func, rows = CASES[name](data, data_dir)
+                seconds, runs = time_case(func, repeat, budget)
+                timings[name][scale] = seconds
+                print(f"  {name:<24} {scale:>4}x  {seconds:9.4f}s  ({rows} rows, best of {runs})")
+                results.append({'case': name, 'scale': scale, 'rows': rows,
+                                'seconds': round(seconds, 6), 'runs': runs})
+    return results
+
+
+# ---------- history / baseline ----------
+
+def result_key(result):
+    return f"{result['case']}@{result['scale']}x"
+
+
+def append_history(results, output_dir):
+    import pandas as pd
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, 'history.jsonl')
+    meta = {
+        'run_id': uuid.uuid4().hex[:12],
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+    }
+    with open(path, 'a') as f:
+        for result in results:
+            if not result.get('skipped'):
+                f.write(json.dumps({**meta, **result}) + '\n')
+    return path
+
+
+def load_baseline(output_dir):
+    path = os.path.join(output_dir, 'baseline.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, 'baseline.json')
+    baseline = load_baseline(output_dir) or {}
+    for result in results:
+        if not result.get('skipped'):
+            baseline[result_key(result)] = result['seconds']
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    return path
+
+
+def compare(results, baseline, tolerance=0.25, min_delta=0.02):
+    """
+    Returns (regressions, improvements) as lists of (key, baseline, current).
+    A change counts when it is both > tolerance (relative) and > min_delta seconds.
+    """
+    regressions, improvements = [], []
+    for result in results:
+        key = result_key(result)
+        if result.get('skipped') or key not in baseline:
+            continue
+        base, current = baseline[key], result['seconds']
+        if current > base * (1 + tolerance) and current - base > min_delta:
+            regressions.append((key, base, current))
+        elif current < base / (1 + tolerance) and base - current > min_delta:
+            improvements.append((key, base, current))
+    return regressions, improvements
+
+
+def parse_list(values):
+    return [item.strip() for value in values for item in value.split(',') if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark data-processing steps at scale")
+    parser.add_argument('--scales', action='append', default=[],
+                        help="Comma separated scale factors (default: 1,10,100)")
+    parser.add_argument('--cases', action='append', default=[],
+                        help=f"Comma separated cases (default: all of {', '.join(CASES)})")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--budget', type=float, default=60.0,
+                        help="Seconds a single case may take before larger scales "
+                             "are skipped (default: %(default)s)")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Relative slowdown flagged as a regression (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store these timings as the new baseline")
+    parser.add_argument('--output-dir', default=DEFAULT_DIR)
+    args = parser.parse_args(argv)
+
+    scales = [int(s) for s in parse_list(args.scales)] or [1, 10, 100]
+    cases = parse_list(args.cases) or list(CASES)
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    print("="*70)
+    print("BENCHMARK SUITE - synthetic inputs at " + ', '.join(f"{s}x" for s in scales))
+    print("="*70)
+
+    results = run_suite(cases, sorted(scales), args.repeat, args.budget, args.seed)
+
+    history = append_history(results, args.output_dir)
+    print(f"\n[SAVED] {history}")
+
+    if args.save_baseline:
+        print(f"[SAVED] Baseline: {save_baseline(results, args.output_dir)}")
+        return 0
+
+    baseline = load_baseline(args.output_dir)
+    if baseline is None:
+        print("[INFO] No baseline yet - run with --save-baseline to create one")
+        return 0
+
+    regressions, improvements = compare(results, baseline, args.tolerance)
+    for key, base, current in improvements:
+        print(f"[OK] Faster: {key} {base:.4f}s -> {current:.4f}s")
+    for key, base, current in regressions:
+        print(f"[REGRESSION] {key} {base:.4f}s -> {current:.4f}s "
+              f"(+{(current / base - 1) * 100:.0f}%)")
+
+    if regressions:
+        return 1
+    print(f"[OK] No regressions beyond {args.tolerance:.0%} of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""
+Collector Registry
+Declares every pipeline step by module/class/method name so that heavy
+dependencies (pandas, nba_api, pytrends, bs4) are imported only when a step runs
+"""
+
+import importlib
+import importlib.util
+
+# Steps run in this order. 'season_arg' tells run_step how to pass the season:
+#   'season' -> season='2023-24', 'year' -> year=2024, None -> not passed
+COLLECTORS = {
+    'core': {
+        'module': 'data_collection',
+        'class': 'BasketballDataCollector',
+        'method': 'collect_all_data',
+        'season_arg': 'season',
+        'default': True,
+        'description': 'Basic/advanced player stats, salaries, trends, city data',
+        'requires': ['pandas', 'requests', 'bs4', 'nba_api', 'pytrends'],
+    },
+    'lineups': {
+        'module': 'lineup_data_collector',
+        'class': 'LineupDataCollector',
+        'method': 'collect_all_lineup_data',
+        'season_arg': 'season',
+        'default': True,
+        'description': '5-player and 2-player lineups, network edge list',
+        'requires': ['pandas', 'nba_api'],
+    },
+    'social': {
+        'module': 'social_media_collector',
+        'class': 'SocialMediaCollector',
+        'method': 'collect_all_social_data',
+        'season_arg': None,
+        'default': True,
+        'description': 'Google Trends for teams/players, social media templates',
+        'requires': ['pandas', 'pytrends', 'pyarrow'],
+    },
+    'advanced': {
+        'module': 'advanced_stats_collector',
+        'class': 'AdvancedStatsCollector',
+        'method': 'collect_all_advanced_stats',
+        'season_arg': 'year',
+        'default': True,
+        'description': 'PER/WS from NBA API totals, Basketball-Reference BPM/VORP, team ratings',
+        'requires': ['pandas', 'requests', 'bs4', 'lxml', 'nba_api'],
+    },
+    'financial': {
+        'module': 'financial_data_collector',
+        'class': 'FinancialDataCollector',
+        'method': 'collect_all_financial_data',
+        'season_arg': 'year',
+        'default': True,
+        'description': 'Spotrac salaries, Forbes valuations, merchandise',
+        'requires': ['pandas', 'requests', 'bs4', 'lxml'],
+    },
+    'social_influence': {
+        'module': 'social_influence_collector',
+        'class': 'SocialInfluenceCollector',
+        'method': 'collect_all_social_data',
+        'season_arg': None,
+        'default': True,
+        'description': 'Expansion city trends, detailed social templates, MSA data',
+        'requires': ['pandas', 'pytrends', 'pyarrow'],
+    },
+    'trends_daily': {
+        'module': 'trends_stitcher',
+        'class': 'TrendsStitcher',
+        'method': 'collect_daily_trends',
+        'season_arg': None,
+        'default': False,
+        'description': 'Multi-year daily Google Trends stitched from overlapping windows',
+        'requires': ['pandas', 'pytrends', 'pyarrow'],
+    },
+    'supplementary': {
+        'module': 'supplementary_data_collector',
+        'class': 'SupplementaryDataCollector',
+        'method': 'collect_all_supplementary_data',
+        'season_arg': None,
+        'default': True,
+        'description': 'Injury history, Reddit/Twitter sentiment, media buzz',
+        'requires': ['pandas', 'requests', 'bs4'],
+    },
+    'reddit': {
+        'module': 'reddit_ingester',
+        'class': 'RedditIngester',
+        'method': 'collect_all_reddit',
+        'season_arg': None,
+        'default': False,
+        'description': 'New r/nba submissions and comments (checkpointed), keyword activity',
+        'requires': ['pandas', 'requests', 'pyarrow'],
+    },
+    'sentiment': {
+        'module': 'sentiment_engine',
+        'class': 'SentimentEngine',
+        'method': 'collect_all_sentiment',
+        'season_arg': None,
+        'default': False,
+        'description': 'Rule-based sentiment of stored Reddit posts, per keyword/player and day',
+        'requires': ['pandas', 'numpy', 'pyarrow'],
+    },
+    'complete': {
+        'module': 'complete_data_collector',
+        'class': 'CompleteDataCollector',
+        'method': 'collect_all',
+        'season_arg': None,
+        'default': False,
+        'description': 'Filled-in datasets for every section (NBA API + compiled values)',
+        'requires': ['pandas', 'numpy', 'nba_api'],
+    },
+    'game_logs': {
+        'module': 'game_log_collector',
+        'class': 'GameLogCollector',
+        'method': 'collect_all_game_logs',
+        'season_arg': 'season',
+        'default': False,
+        'description': 'Player/team game logs, appending only new game dates',
+        'requires': ['pandas', 'nba_api', 'pyarrow'],
+    },
+    'play_by_play': {
+        'module': 'play_by_play_collector',
+        'class': 'PlayByPlayCollector',
+        'method': 'collect_all_play_by_play',
+        'season_arg': 'season',
+        'default': False,
+        'description': 'Play-by-play for every game, rebuilt into 10-player stints',
+        'requires': ['pandas', 'numpy', 'nba_api', 'pyarrow'],
+    },
+    'shot_charts': {
+        'module': 'shot_chart_collector',
+        'class': 'ShotChartCollector',
+        'method': 'collect_all_shot_charts',
+        'season_arg': 'season',
+        'default': False,
+        'description': 'League-wide shot charts (every FGA with location), new dates only',
+        'requires': ['pandas', 'numpy', 'nba_api', 'pyarrow'],
+    },
+    'rolling_form': {
+        'module': 'rolling_form',
+        'class': 'RollingForm',
+        'method': 'update_current_form',
+        'season_arg': None,
+        'default': False,
+        'description': 'Last-10/30 game form from stored game logs (incremental)',
+        'requires': ['pandas', 'numpy', 'pyarrow'],
+    },
+    'backfill': {
+        'module': 'historical_backfill',
+        'class': 'HistoricalBackfill',
+        'method': 'backfill',
+        'season_arg': None,
+        'default': False,
+        'description': 'Player stats 1996-97 to today into data/warehouse (resumable)',
+        'requires': ['pandas', 'nba_api', 'pyarrow'],
+    },
+    'merge': {
+        'module': 'merge_datasets',
+        'class': 'DataMerger',
+        'method': 'create_all_master_datasets',
+        'season_arg': None,
+        'default': True,
+        'description': 'Combine collected files into MASTER_* datasets',
+        'requires': ['pandas'],
+    },
+}
+
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+MONTH = 30 * DAY
+
+# Individually refreshable datasets used by refresh_daemon.py. Each method
+# returns a DataFrame that is saved as 'save_as'. 'interval' applies while the
+# season is being played, 'offseason_interval' otherwise; season-bound datasets
+# of past seasons are collected once and then never refreshed. Datasets with an
+# 'input' are derived: the upstream DataFrame is passed to the method, and they
+# refresh only when the upstream content changes.
+DATASETS = {
+    'lineup_5player': {
+        'module': 'lineup_data_collector',
+        'class': 'LineupDataCollector',
+        'method': 'get_lineup_stats',
+        'season_arg': 'season',
+        'save_as': '1_lineup_5player_stats.csv',
+        'interval': HOUR,
+        'offseason_interval': WEEK,
+    },
+    'lineup_2player': {
+        'module': 'lineup_data_collector',
+        'class': 'LineupDataCollector',
+        'method': 'get_two_player_lineups',
+        'season_arg': 'season',
+        'save_as': '1_lineup_2player_stats.csv',
+        'interval': HOUR,
+        'offseason_interval': WEEK,
+    },
+    'lineup_network_edges': {
+        'module': 'lineup_data_collector',
+        'class': 'LineupDataCollector',
+        'method': 'create_network_edge_list',
+        'season_arg': None,
+        'input': 'lineup_5player',
+        'save_as': '1_lineup_network_edges.csv',
+    },
+    'player_basic_stats': {
+        'module': 'data_collection',
+        'class': 'BasketballDataCollector',
+        'method': 'get_nba_player_stats_basic',
+        'season_arg': 'season',
+        'save_as': '1_player_basic_stats.csv',
+        'interval': DAY,
+        'offseason_interval': MONTH,
+    },
+    'player_advanced_stats': {
+        'module': 'data_collection',
+        'class': 'BasketballDataCollector',
+        'method': 'get_nba_advanced_stats',
+        'season_arg': 'season',
+        'save_as': '1_player_advanced_stats_nba_api.csv',
+        'interval': DAY,
+        'offseason_interval': MONTH,
+    },
+    'team_performance': {
+        'module': 'advanced_stats_collector',
+        'class': 'AdvancedStatsCollector',
+        'method': 'scrape_team_stats',
+        'season_arg': 'year',
+        'save_as': '1_team_performance.csv',
+        'interval': DAY,
+        'offseason_interval': MONTH,
+    },
+    'injuries': {
+        'module': 'supplementary_data_collector',
+        'class': 'SupplementaryDataCollector',
+        'method': 'scrape_injury_data',
+        'season_arg': None,
+        'save_as': '4_injury_history.csv',
+        'interval': DAY,
+        'offseason_interval': WEEK,
+    },
+    'salaries': {
+        'module': 'financial_data_collector',
+        'class': 'FinancialDataCollector',
+        'method': 'scrape_spotrac_salaries',
+        'season_arg': 'year',
+        'save_as': '2_player_salaries_complete.csv',
+        'interval': WEEK,
+        'offseason_interval': DAY,  # free agency moves contracts in the summer
+    },
+    'team_valuations': {
+        'module': 'financial_data_collector',
+        'class': 'FinancialDataCollector',
+        'method': 'scrape_forbes_valuations',
+        'season_arg': None,
+        'save_as': '2_team_valuations_forbes.csv',
+        'interval': MONTH,
+        'offseason_interval': MONTH,
+    },
+}
+
+
+def current_season(today):
+    """NBA season a date belongs to: seasons start in October ('2023-24')"""
+    start = today.year if today.month >= 10 else today.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def is_in_season(today):
+    """Regular season and playoffs run October through June"""
+    return today.month >= 10 or today.month <= 6
+
+
+def season_to_year(season):
+    """Convert an NBA season string ('2023-24') to its ending year (2024)"""
+    return int(str(season)[:4]) + 1
+
+
+def missing_requirements(name):
+    """Return the required packages of a step that are not installed (no imports)"""
+    return [pkg for pkg in COLLECTORS[name]['requires']
+            if importlib.util.find_spec(pkg) is None]
+
+
+def select_steps(only=None, skip=None):
+    """
+    Resolve --only/--skip into an ordered list of step names
+    """
+    unknown = [n for n in (only or []) + (skip or []) if n not in COLLECTORS]
+    if unknown:
+        raise ValueError(f"Unknown step(s): {', '.join(unknown)} "
+                         f"(available: {', '.join(COLLECTORS)})")
+
+    if only:
+        steps = [n for n in COLLECTORS if n in only]
+    else:
+        steps = [n for n, spec in COLLECTORS.items() if spec['default']]
+
+    return [n for n in steps if n not in (skip or [])]
+
+
+def step_kwargs(name, season, registry=COLLECTORS):
+    """Keyword arguments passed to a step's (or dataset's) collection method"""
+    season_arg = registry[name]['season_arg']
+    if season_arg == 'season':
+        return {'season': season}
+    if season_arg == 'year':
+        return {'year': season_to_year(season)}
+    return {}
+
+
+def load_collector(name, registry=COLLECTORS):
+    """Import a step's (or dataset's) module and return a new collector instance"""
+    spec = registry[name]
+    module = importlib.import_module(spec['module'])
+    return getattr(module, spec['class'])()
+
+
+def run_step(name, season='2023-24', collector=None):
+    """
+    Import and run a single step. Returns whatever the collection method returns.
+    Pass an existing collector instance to reuse its state between runs.
+    """
+    if collector is None:
+        collector = load_collector(name)
+    method = getattr(collector, COLLECTORS[name]['method'])
+    return method(**step_kwargs(name, season))
@@ -0,0 +1,107 @@
+"""
+Columnar Store
+Partitioned Parquet storage for large/historical datasets, laid out as
+
+    <root>/<dataset>/<key>=<value>/.../part.parquet
+
+A partition is written to a temp file and renamed into place, so a partition
+file that exists is always complete - backfills use that to resume.
+Append-only datasets add one part-<n>.parquet per batch instead.
+Requires pyarrow.
+"""
+
+import os
+import re
+import time
+from glob import glob
+
+import pandas as pd
+
+DEFAULT_ROOT = os.path.join('data', 'warehouse')
+PART_FILE = 'part.parquet'
+PART_GLOB = 'part*.parquet'
+
+
+def slug(value):
+    """Filesystem-safe partition value ('Regular Season' -> 'Regular_Season')"""
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(value))
+
+
+def partition_dir(root, dataset, partition):
+    parts = [f"{key}={slug(value)}" for key, value in partition.items()]
+    return os.path.join(root, dataset, *parts)
+
+
+def partition_path(root, dataset, partition):
+    return os.path.join(partition_dir(root, dataset, partition), PART_FILE)
+
+
+def has_partition(root, dataset, partition):
+    return os.path.exists(partition_path(root, dataset, partition))
+
+
+def write_partition(df, root, dataset, partition):
+    """
+    Atomically write one partition. The partition keys are also stored as
+    columns, so files stay self-describing when read on their own.
+    """
+    return _write(df, partition_path(root, dataset, partition), partition)
+
+
+def append_partition(df, root, dataset, partition):
+    """Add a batch to a partition as a new part file (earlier parts are never rewritten)"""
+    name = f"part-{time.time_ns()}-{os.getpid()}.parquet"
+    return _write(df, os.path.join(partition_dir(root, dataset, partition), name), partition)
+
+
+def _write(df, path, partition):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    df = df.copy()
+    for key, value in partition.items():
+        df[key] = value
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def list_partitions(root, dataset, **filters):
+    """
+    Partition files of `dataset`; filters are key=value or key=[values]
+    """
+    wanted = {key: {slug(v) for v in (values if isinstance(values, (list, tuple, set)) else [values])}
+              for key, values in filters.items()}
+    base = os.path.join(root, dataset)
+
+    paths = []
+    for path in sorted(glob(os.path.join(base, '**', PART_GLOB), recursive=True)):
+        parts = os.path.relpath(os.path.dirname(path), base).split(os.sep)
+        keys = dict(part.split('=', 1) for part in parts if '=' in part)
+        if all(keys.get(key) in values for key, values in wanted.items()):
+            paths.append(path)
+    return paths
+
+
+def partition_values(root, dataset, key, **filters):
+    """Sorted distinct values of partition `key` already stored (slugged form)"""
+    values = set()
+    for path in list_partitions(root, dataset, **filters):
+        for part in os.path.relpath(os.path.dirname(path), os.path.join(root, dataset)).split(os.sep):
+            name, _, value = part.partition('=')
+            if name == key:
+                values.add(value)
+    return sorted(values)
+
+
+def read_dataset(root, dataset, columns=None, **filters):
+    """
+    Read the matching partitions into one DataFrame, e.g.
+    read_dataset(root, 'player_stats', measure='Base', season=['2022-23', '2023-24'])
+    """
+    paths = list_partitions(root, dataset, **filters)
+    if not paths:
+        return pd.DataFrame()
+    frames = [pd.read_parquet(path, columns=columns) for path in paths]
+    return pd.concat([f for f in frames if not f.empty] or frames[:1], ignore_index=True)
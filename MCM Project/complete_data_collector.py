@@ -5,10 +5,12 @@ Fills in actual values for all sections using multiple methods
 
 import pandas as pd
 import numpy as np
-import time
 import os
 from datetime import datetime
+import instrumentation
+import metrics_engine
 
+@instrumentation.instrument_class
 class CompleteDataCollector:
 
     def __init__(self):
@@ -33,9 +35,10 @@ class CompleteDataCollector:
                 season='2023-24',
                 per_mode_detailed='PerGame'
             )
+            instrumentation.record_endpoint(stats)
             df_basic = stats.get_data_frames()[0]
 
-            time.sleep(self.delay)
+            instrumentation.throttle(self.delay)
 
             # Get advanced stats
             print("  [2/3] Fetching advanced metrics...")
@@ -43,9 +46,10 @@ class CompleteDataCollector:
                 season='2023-24',
                 measure_type_detailed_defense='Advanced'
             )
+            instrumentation.record_endpoint(advanced)
             df_advanced = advanced.get_data_frames()[0]
 
-            time.sleep(self.delay)
+            instrumentation.throttle(self.delay)
 
             # Calculate derived metrics (approximations of BPM, WS, PER)
             print("  [3/3] Calculating derived metrics...")
@@ -53,63 +57,7 @@ class CompleteDataCollector:
             # Merge datasets
             df = pd.merge(df_basic, df_advanced, on='PLAYER_ID', suffixes=('', '_adv'))
 
-            # Calculate PER approximation (simplified formula)
-            df['PER_approx'] = (
-                df['PTS'] * 1.0 +
-                df['REB'] * 0.7 +
-                df['AST'] * 0.7 +
-                df['STL'] * 1.0 +
-                df['BLK'] * 1.0 -
-                df['TOV'] * 1.0 -
-                (df['FGA'] - df['FGM']) * 0.5
-            ) / df['MIN']
-            df['PER_approx'] = df['PER_approx'] * 15  # Scale to ~15 average
-
-            # Win Shares approximation using Net Rating
-            df['WS_approx'] = (df['NET_RATING'] * df['MIN'] * df['GP']) / 1000
-            df['OWS_approx'] = (df['OFF_RATING'] * df['MIN'] * df['GP']) / 2000
-            df['DWS_approx'] = df['WS_approx'] - df['OWS_approx']
-
-            # BPM approximation using box score stats
-            df['BPM_approx'] = (
-                df['NET_RATING'] * 0.5 +
-                df['USG_PCT'] * 0.2 -
-                (df['TOV'] / df['MIN']) * 3
-            ) / 10
-
-            df['OBPM_approx'] = df['OFF_RATING'] / 20 - 5
-            df['DBPM_approx'] = 6 - df['DEF_RATING'] / 20
-
-            # VORP approximation
-            df['VORP_approx'] = (df['BPM_approx'] + 2.0) * df['MIN'] * df['GP'] / 1000
-
-            # Clean up columns
-            columns = [
-                'PLAYER_NAME', 'TEAM_ABBREVIATION', 'GP', 'MIN',
-                'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV',
-                'FG_PCT', 'FG3_PCT', 'FT_PCT',
-                'PER_approx', 'TS_PCT', 'USG_PCT',
-                'WS_approx', 'OWS_approx', 'DWS_approx',
-                'BPM_approx', 'OBPM_approx', 'DBPM_approx', 'VORP_approx',
-                'OFF_RATING', 'DEF_RATING', 'NET_RATING'
-            ]
-
-            df_clean = df[[col for col in columns if col in df.columns]].copy()
-
-            # Rename for clarity
-            df_clean.columns = [
-                'Player', 'Team', 'GP', 'MPG',
-                'PPG', 'RPG', 'APG', 'SPG', 'BPG', 'TPG',
-                'FG%', '3P%', 'FT%',
-                'PER', 'TS%', 'USG%',
-                'WS', 'OWS', 'DWS',
-                'BPM', 'OBPM', 'DBPM', 'VORP',
-                'ORtg', 'DRtg', 'NRtg'
-            ]
-
-            # Filter out players with minimal playing time
-            df_clean = df_clean[df_clean['GP'] >= 5].copy()
-            df_clean = df_clean.sort_values('WS', ascending=False)
+            df_clean = self.calculate_derived_metrics(df)
 
             print(f"\n[OK] Collected advanced stats for {len(df_clean)} players")
             print(f"    Metrics: PER, WS (OWS+DWS), BPM (OBPM+DBPM), VORP")
@@ -123,6 +71,42 @@ class CompleteDataCollector:
             print(f"[ERROR] {e}")
             return pd.DataFrame()
 
+    def calculate_derived_metrics(self, df):
+        """
+        PER/WS/BPM/VORP approximations from merged basic + advanced NBA API stats
+        """
+        df = metrics_engine.compute(df, metrics_engine.APPROX_METRICS)
+
+        # Clean up columns
+        columns = [
+            'PLAYER_NAME', 'TEAM_ABBREVIATION', 'GP', 'MIN',
+            'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV',
+            'FG_PCT', 'FG3_PCT', 'FT_PCT',
+            'PER_approx', 'TS_PCT', 'USG_PCT',
+            'WS_approx', 'OWS_approx', 'DWS_approx',
+            'BPM_approx', 'OBPM_approx', 'DBPM_approx', 'VORP_approx',
+            'OFF_RATING', 'DEF_RATING', 'NET_RATING'
+        ]
+
+        df_clean = df[[col for col in columns if col in df.columns]].copy()
+
+        # Rename for clarity
+        df_clean.columns = [
+            'Player', 'Team', 'GP', 'MPG',
+            'PPG', 'RPG', 'APG', 'SPG', 'BPG', 'TPG',
+            'FG%', '3P%', 'FT%',
+            'PER', 'TS%', 'USG%',
+            'WS', 'OWS', 'DWS',
+            'BPM', 'OBPM', 'DBPM', 'VORP',
+            'ORtg', 'DRtg', 'NRtg'
+        ]
+
+        # Filter out players with minimal playing time
+        df_clean = df_clean[df_clean['GP'] >= 5].copy()
+        df_clean = df_clean.sort_values('WS', ascending=False)
+
+        return df_clean
+
     # ============= SECTION 2: FINANCIAL DATA WITH REAL VALUES =============
 
     def create_realistic_salary_data(self):
@@ -615,13 +599,21 @@ class CompleteDataCollector:
         }
 
         df = pd.DataFrame(injury_data)
-        df['Total_Games_Missed_3Yr'] = (
-            df['Games_Missed_2023'] + df['Games_Missed_2022'] + df['Games_Missed_2021']
-        )
-        df['Games_Possible'] = 246  # 3 seasons * 82 games
-        df['Availability_Rate'] = (
-            (df['Games_Possible'] - df['Total_Games_Missed_3Yr']) / df['Games_Possible'] * 100
-        )
+        derived = self.get_injury_history_from_game_logs()
+        if not derived.empty:
+            # Injury descriptions are only known for the hand-curated players
+            notes = df[['Player', 'Primary_Injury_Type', 'Injury_Location', 'Chronic_Injury']]
+            df = derived.merge(notes, on='Player', how='left')
+            print("    Derived from stored game logs for every player")
+        else:
+            print("    [INFO] No stored game logs - using curated list")
+            df['Total_Games_Missed_3Yr'] = (
+                df['Games_Missed_2023'] + df['Games_Missed_2022'] + df['Games_Missed_2021']
+            )
+            df['Games_Possible'] = 246  # 3 seasons * 82 games
+            df['Availability_Rate'] = (
+                (df['Games_Possible'] - df['Total_Games_Missed_3Yr']) / df['Games_Possible'] * 100
+            )
 
         print(f"[OK] Created injury data for {len(df)} players")
         print(f"    Most games missed: {df.nlargest(1, 'Total_Games_Missed_3Yr').iloc[0]['Player']}")
@@ -629,6 +621,19 @@ class CompleteDataCollector:
 
         return df
 
+    def get_injury_history_from_game_logs(self):
+        """
+        Games missed over availability_engine.INJURY_SEASONS for every player,
+        from game logs stored by game_log_collector.py (empty if none are stored)
+        """
+        import availability_engine
+
+        seasons = availability_engine.INJURY_SEASONS
+        avail = availability_engine.load_availability(seasons)
+        if avail.empty:
+            return avail
+        return availability_engine.injury_history(avail, seasons)
+
     def create_realistic_reddit_sentiment(self):
         """
         Reddit sentiment with realistic engagement numbers
@@ -657,11 +662,40 @@ class CompleteDataCollector:
         df = pd.DataFrame(reddit_data)
         df['Data_Source'] = 'r/nba'
 
+        activity = self.get_reddit_activity_from_store(df['Keyword'])
+        if not activity.empty:
+            # Keywords with ingested posts get aggregated counts; the rest keep compiled values
+            counted = ['Total_Posts_30d', 'Total_Comments_30d', 'Average_Upvotes',
+                       'Sentiment_Score', 'Trending_Up', 'Peak_Discussion_Date', 'Data_Source']
+            df = df.set_index('Keyword')
+            df.update(activity.set_index('Keyword')[counted])
+            df = df.reset_index()
+            print(f"    Aggregated from stored Reddit posts for {len(activity)} keywords")
+
         print(f"[OK] Created Reddit sentiment for {len(df)} keywords")
         print(f"    Most discussed: {df.nlargest(1, 'Total_Posts_30d').iloc[0]['Keyword']}")
 
         return df
 
+    def get_reddit_activity_from_store(self, keywords, days=30):
+        """
+        Posts/comments/upvotes and scored sentiment over the last `days` for
+        the keywords that reddit_ingester.py has streamed (empty if none are
+        stored)
+        """
+        import inverted_index
+        import reddit_ingester
+        import sentiment_engine
+
+        posts = reddit_ingester.load_submissions(days=days)
+        if posts.empty:
+            return posts
+        keywords = [k for k in keywords if k in set(posts['KEYWORD'])]
+        scores = sentiment_engine.entity_sentiment(keywords, days=days)
+        mentions = inverted_index.keyword_mentions(keywords, days=days)
+        return reddit_ingester.keyword_activity(posts, pd.DataFrame(), keywords, days,
+                                                sentiment=scores['SENTIMENT'], mentions=mentions)
+
     def create_realistic_twitter_sentiment(self):
         """
         Twitter sentiment with realistic data
@@ -720,6 +754,20 @@ class CompleteDataCollector:
 
         df = pd.DataFrame(buzz_data)
 
+        import sentiment_engine
+
+        scores = sentiment_engine.entity_sentiment(df['Player'], score=False, players=True,
+                                                   unique=True)
+        if not scores.empty:
+            # Players mentioned in scored Reddit posts get their measured sentiment and
+            # unique mention counts (reposts and crossposts count once)
+            found = df['Player'].isin(scores.index)
+            df.loc[found, 'Reddit_Mentions'] = df.loc[found, 'Player'].map(scores['TEXTS'])
+            df.loc[found, 'Fan_Sentiment'] = df.loc[found, 'Player'].map(
+                scores['SENTIMENT']).map(sentiment_engine.label)
+            print(f"    Reddit_Mentions and Fan_Sentiment from stored posts for "
+                  f"{found.sum()} players")
+
         # Calculate media buzz score
         df['Media_Buzz_Score'] = (
             df['Reddit_Mentions'] * 1 +
@@ -4,15 +4,16 @@ Collects performance, financial, and social media data for NBA/WNBA analysis
 """
 
 import pandas as pd
-import requests
+import http_client
 from bs4 import BeautifulSoup
-import time
 from datetime import datetime
 import os
+import instrumentation
 
 # Create data directory
 os.makedirs('data', exist_ok=True)
 
+@instrumentation.instrument_class
 class BasketballDataCollector:
     def __init__(self):
         self.headers = {
@@ -46,6 +47,8 @@ class BasketballDataCollector:
                 per_mode_detailed='PerGame'
             )
 
+            instrumentation.record_endpoint(stats)
+
             df = stats.get_data_frames()[0]
 
             # Select key columns
@@ -62,7 +65,7 @@ class BasketballDataCollector:
                 'FG_Pct', 'FG3_Pct', 'FT_Pct', 'Plus_Minus'
             ]
 
-            time.sleep(self.delay)
+            instrumentation.throttle(self.delay)
             return df_clean
 
         except Exception as e:
@@ -83,6 +86,8 @@ class BasketballDataCollector:
                 measure_type_detailed_defense='Advanced'
             )
 
+            instrumentation.record_endpoint(stats)
+
             df = stats.get_data_frames()[0]
 
             # Key advanced metrics
@@ -97,7 +102,7 @@ class BasketballDataCollector:
 
             df_clean = df[[col for col in columns if col in df.columns]].copy()
 
-            time.sleep(self.delay)
+            instrumentation.throttle(self.delay)
             return df_clean
 
         except Exception as e:
@@ -114,8 +119,8 @@ class BasketballDataCollector:
         url = f"https://www.basketball-reference.com/leagues/NBA_{year}_advanced.html"
 
         try:
-            time.sleep(self.delay)
-            response = requests.get(url, headers=self.headers)
+            instrumentation.throttle(self.delay)
+            response = http_client.get(url, headers=self.headers)
 
             if response.status_code == 200:
                 # Read HTML table directly with pandas
@@ -159,8 +164,8 @@ class BasketballDataCollector:
         url = f"https://www.spotrac.com/nba/rankings/{year}/"
 
         try:
-            time.sleep(self.delay)
-            response = requests.get(url, headers=self.headers)
+            instrumentation.throttle(self.delay)
+            response = http_client.get(url, headers=self.headers)
 
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
@@ -227,7 +232,7 @@ class BasketballDataCollector:
                 df = df.drop('isPartial', axis=1, errors='ignore')
                 df = df.reset_index()
 
-            time.sleep(self.delay)
+            instrumentation.throttle(self.delay)
             return df
 
         except Exception as e:
@@ -256,7 +261,7 @@ class BasketballDataCollector:
 
         return pd.DataFrame(cities_data)
 
-    def collect_all_data(self):
+    def collect_all_data(self, season='2023-24'):
         """
         Main method to collect all data
         """
@@ -270,15 +275,17 @@ class BasketballDataCollector:
         print("\n[SECTION 1: CORE PERFORMANCE DATA]")
         print("-"*60)
 
-        basic_stats = self.get_nba_player_stats_basic()
+        basic_stats = self.get_nba_player_stats_basic(season=season)
         if not basic_stats.empty:
             all_files.append(self.save_to_csv(basic_stats, '1_player_basic_stats.csv'))
 
-        advanced_stats = self.get_nba_advanced_stats()
+        advanced_stats = self.get_nba_advanced_stats(season=season)
         if not advanced_stats.empty:
             all_files.append(self.save_to_csv(advanced_stats, '1_player_advanced_stats_nba_api.csv'))
 
-        bbref_stats = self.scrape_basketball_reference_advanced()
+        # Basketball-Reference advanced table with PER/WS computed from NBA API totals
+        from advanced_stats_collector import AdvancedStatsCollector
+        bbref_stats = AdvancedStatsCollector().get_advanced_stats(year=int(season[:4]) + 1)
         if not bbref_stats.empty:
             all_files.append(self.save_to_csv(bbref_stats, '1_player_advanced_stats_bbref.csv'))
 
@@ -286,7 +293,7 @@ class BasketballDataCollector:
         print("\n[SECTION 2: FINANCIAL & BUSINESS DATA]")
         print("-"*60)
 
-        salary_data = self.scrape_spotrac_salaries()
+        salary_data = self.scrape_spotrac_salaries(year=int(season[:4]) + 1)
         if not salary_data.empty:
             all_files.append(self.save_to_csv(salary_data, '2_player_salaries.csv'))
 
@@ -0,0 +1,330 @@
+"""
+Embedded JSON Extraction
+Pulls structured data out of the JSON that JavaScript-rendered pages ship in
+their <script> tags, so Spotrac / Forbes data can be read without a headless
+browser:
+
+  - <script type="application/ld+json">           -> blob 'ld+json'
+  - <script id="__NEXT_DATA__" type="application/json"> -> blob '__NEXT_DATA__'
+  - other <script type="application/json" id=X>   -> blob X
+  - inline window.X = {...} / window["X"] = {...}  -> blob X
+
+Parsing uses orjson when installed (several times faster on multi-MB state
+blobs) and the standard json module otherwise.
+
+Each site in SITES lists selectors tried in order: which blob, the path of the
+records inside it ('*' expands a list or dict) and the columns to read from
+each record. When a path no longer matches (the site moved things around), the
+first list of records holding the selector's keys anywhere in the blob is used.
+
+    python embedded_json.py --check                      # every saved page in FIXTURES
+    python embedded_json.py page.html --site forbes_valuations
+"""
+
+import json
+import os
+import re
+
+import pandas as pd
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    orjson = None
+    loads = json.loads
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+SCRIPT_PATTERN = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.S | re.I)
+ATTR_PATTERN = re.compile(r'''([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''')
+ASSIGN_PATTERN = re.compile(r'''window(?:\.([\w$]+)|\[\s*["']([^"']+)["']\s*\])\s*=\s*(?=[{\[])''')
+
+SITES = {
+    'spotrac_salaries': {
+        'selectors': [
+            {'blob': '__INITIAL_STATE__', 'records': 'rankings.players.*',
+             'fields': {'Player': 'player.name', 'Team': 'team.abbreviation',
+                        'Annual_Salary': 'capHit', 'Total_Contract_Value': 'contract.value',
+                        'Contract_Length_Years': 'contract.years',
+                        'Guaranteed_Money': 'contract.guaranteed',
+                        'Free_Agency_Year': 'freeAgent.year', 'Cap_Hit_Percent': 'capPercent'}},
+            {'blob': '__NEXT_DATA__', 'records': 'props.pageProps.rankings.*',
+             'fields': {'Player': 'player_name', 'Team': 'team', 'Annual_Salary': 'cap_hit',
+                        'Total_Contract_Value': 'contract_value',
+                        'Contract_Length_Years': 'contract_years',
+                        'Guaranteed_Money': 'guaranteed', 'Free_Agency_Year': 'fa_year',
+                        'Cap_Hit_Percent': 'cap_pct'}},
+        ],
+        'required': ['Player', 'Annual_Salary'],
+        'numeric': ['Annual_Salary', 'Total_Contract_Value', 'Contract_Length_Years',
+                    'Guaranteed_Money', 'Free_Agency_Year', 'Cap_Hit_Percent'],
+    },
+    'forbes_valuations': {
+        'selectors': [
+            {'blob': '__NEXT_DATA__', 'records': 'props.pageProps.list.rows.*',
+             'fields': {'Rank': 'rank', 'Team': 'organizationName',
+                        'Current_Value_Millions': 'value',
+                        'One_Year_Value_Change_Percent': 'oneYearValueChange',
+                        'Revenue_Millions': 'revenue',
+                        'Operating_Income_Millions': 'operatingIncome', 'Owner': 'owner'}},
+            # Rank and team only - used when the list state is missing
+            {'blob': 'ld+json', 'records': 'itemListElement.*',
+             'fields': {'Rank': 'position', 'Team': 'item.name'}},
+        ],
+        'required': ['Team'],
+        'numeric': ['Rank', 'Current_Value_Millions', 'One_Year_Value_Change_Percent',
+                    'Revenue_Millions', 'Operating_Income_Millions'],
+    },
+}
+
+SPOTRAC_COLUMNS = ['Player', 'Team', 'Annual_Salary', 'Total_Contract_Value',
+                   'Contract_Length_Years', 'Guaranteed_Money', 'Free_Agency_Year',
+                   'Cap_Hit_Percent']
+FORBES_COLUMNS = ['Rank', 'Team', 'Current_Value_Millions', 'One_Year_Value_Change_Percent',
+                  'Revenue_Millions', 'Operating_Income_Millions', 'Owner']
+SPOTRAC_CELLS = [
+    {'Player': 'Stephen Curry', 'Team': 'GSW', 'Annual_Salary': 51915615,
+     'Total_Contract_Value': 163529633, 'Contract_Length_Years': 3, 'Free_Agency_Year': 2028,
+     'Cap_Hit_Percent': 36.9},
+    {'Player': 'Zion Williamson', 'Team': 'NOP', 'Annual_Salary': 33534900},
+]
+FORBES_CELLS = [
+    {'Team': 'Golden State Warriors', 'Rank': 1},
+    {'Team': 'Memphis Grizzlies', 'Rank': 30},
+]
+
+# Saved pages (fixtures/pages/) with the selector each must take and cells it
+# must read - one page per selector and fallback
+FIXTURES = [
+    {'site': 'spotrac_salaries', 'page': 'spotrac_nba_cap_hit.html', 'selector': 0,
+     'found_by': 'path', 'rows': 25, 'columns': SPOTRAC_COLUMNS, 'cells': SPOTRAC_CELLS},
+    {'site': 'spotrac_salaries', 'page': 'spotrac_nba_cap_hit_next_data.html', 'selector': 1,
+     'found_by': 'path', 'rows': 25, 'columns': SPOTRAC_COLUMNS, 'cells': SPOTRAC_CELLS},
+    # __INITIAL_STATE__ restructured: only the key search finds the players
+    {'site': 'spotrac_salaries', 'page': 'spotrac_nba_cap_hit_moved.html', 'selector': 0,
+     'found_by': 'keys', 'rows': 25, 'columns': SPOTRAC_COLUMNS, 'cells': SPOTRAC_CELLS},
+    {'site': 'forbes_valuations', 'page': 'forbes_nba_valuations.html', 'selector': 0,
+     'found_by': 'path', 'rows': 30, 'columns': FORBES_COLUMNS,
+     'cells': [dict(FORBES_CELLS[0], Current_Value_Millions=7700, Revenue_Millions=800,
+                    Owner='Joe Lacob, Peter Guber'), FORBES_CELLS[1]]},
+    # No __NEXT_DATA__: ranks and teams from ld+json only
+    {'site': 'forbes_valuations', 'page': 'forbes_nba_valuations_ld_json.html', 'selector': 1,
+     'found_by': 'path', 'rows': 30, 'columns': ['Rank', 'Team'], 'cells': FORBES_CELLS},
+]
+
+
+# ---------- blobs ----------
+
+def attributes(text):
+    return {m.group(1).lower(): next(g for g in m.groups()[1:] if g is not None)
+            for m in ATTR_PATTERN.finditer(text)}
+
+
+def parse_assignments(body):
+    """(name, value) of every window.X = {...} assignment in an inline script"""
+    decoder = json.JSONDecoder()
+    found = []
+    for m in ASSIGN_PATTERN.finditer(body):
+        try:
+            # Usually the state is the script's last statement: parse it whole
+            # with the fast parser, else find where the literal ends
+            value = loads(body[m.end():].rstrip().rstrip(';'))
+        except ValueError:
+            try:
+                value, _ = decoder.raw_decode(body, m.end())
+            except ValueError:
+                continue  # a JS literal that is not JSON
+        found.append((m.group(1) or m.group(2), value))
+    return found
+
+
+def script_blobs(html):
+    """
+    (kind, data) for every JSON blob in the page's <script> tags, in page
+    order. ld+json lists and @graph containers yield one blob per item.
+    """
+    blobs = []
+    for m in SCRIPT_PATTERN.finditer(html):
+        attrs, body = attributes(m.group(1)), m.group(2).strip()
+        if not body:
+            continue
+        kind = attrs.get('type', '').lower()
+        if kind in ('application/ld+json', 'application/json'):
+            try:
+                data = loads(body)
+            except ValueError:
+                continue
+            if kind == 'application/ld+json':
+                if isinstance(data, dict):
+                    data = data.get('@graph', [data])
+                blobs.extend(('ld+json', item) for item in data if isinstance(item, dict))
+            else:
+                blobs.append((attrs.get('id', 'json'), data))
+        elif kind in ('', 'text/javascript', 'application/javascript', 'module'):
+            blobs.extend(parse_assignments(body))
+    return blobs
+
+
+# ---------- selectors ----------
+
+def select(data, path):
+    """Values at a dotted path; '*' expands every item of a list or dict"""
+    found = [data]
+    for key in path.split('.') if path else []:
+        step = []
+        for value in found:
+            if key == '*':
+                step.extend(value if isinstance(value, list) else
+                            value.values() if isinstance(value, dict) else [])
+            elif isinstance(value, dict) and key in value:
+                step.append(value[key])
+            elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                step.append(value[int(key)])
+        found = step
+    return found
+
+
+def find_records(data, keys):
+    """First list of dicts (depth first) whose items carry every key in `keys`"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            items = [v for v in value if isinstance(v, dict)]
+            if items and all(all(k in v for k in keys) for v in items):
+                return items
+            stack.extend(reversed(value))
+        elif isinstance(value, dict):
+            stack.extend(reversed(list(value.values())))
+    return []
+
+
+def field(record, keys):
+    """Value at a split path without wildcards (None where it is missing)"""
+    for key in keys:
+        if isinstance(record, dict):
+            record = record.get(key)
+        elif isinstance(record, list) and key.isdigit() and int(key) < len(record):
+            record = record[int(key)]
+        else:
+            return None
+    return record
+
+
+def to_number(series):
+    """'$51,915,615', '12.5%', 7700 -> numbers (NaN when not numeric)"""
+    if not pd.api.types.is_numeric_dtype(series):
+        series = series.astype(str).str.replace(r'[$,%\s]', '', regex=True)
+    return pd.to_numeric(series, errors='coerce')
+
+
+def apply_selector(blobs, selector):
+    """
+    Records of the first blob of the selector's kind the path (or key search)
+    matches, and 'path' or 'keys' for how they were found
+    """
+    record_keys = {path.split('.')[0] for path in selector['fields'].values()}
+    for kind, data in blobs:
+        if kind != selector['blob']:
+            continue
+        records, found_by = [r for r in select(data, selector['records'])
+                             if isinstance(r, dict)], 'path'
+        if not records:
+            records, found_by = find_records(data, record_keys), 'keys'
+        if records:
+            fields = [(column, path.split('.')) for column, path in selector['fields'].items()]
+            return pd.DataFrame([{column: field(r, keys) for column, keys in fields}
+                                 for r in records]), found_by
+    return pd.DataFrame(), None
+
+
+def extract(html, site):
+    """
+    DataFrame of the first selector of `site` with complete rows (empty if
+    none). df.attrs records which: 'selector' (its position in SITES) and
+    'found_by' ('path', or 'keys' when the path no longer matched).
+    """
+    spec = SITES[site]
+    blobs = script_blobs(html)
+    for i, selector in enumerate(spec['selectors']):
+        df, found_by = apply_selector(blobs, selector)
+        if df.empty:
+            continue
+        for column in spec.get('numeric', []):
+            if column in df.columns:
+                df[column] = to_number(df[column])
+        df = df.dropna(subset=[c for c in spec['required'] if c in df.columns])
+        if not df.empty:
+            df = df.reset_index(drop=True)
+            df.attrs.update(selector=i, found_by=found_by)
+            return df
+    return pd.DataFrame()
+
+
+def check_fixture(fixture):
+    """Problems extracting one FIXTURES entry (empty when it passes)"""
+    with open(os.path.join(FIXTURE_DIR, fixture['page']), encoding='utf-8') as f:
+        df = extract(f.read(), fixture['site'])
+    if df.empty:
+        return ["no records"]
+    problems = []
+    for key in ('selector', 'found_by'):
+        if df.attrs.get(key) != fixture[key]:
+            problems.append(f"{key} {df.attrs.get(key)!r}, expected {fixture[key]!r}")
+    if len(df) != fixture['rows']:
+        problems.append(f"{len(df)} rows, expected {fixture['rows']}")
+    if list(df.columns) != fixture['columns']:
+        problems.append(f"columns {list(df.columns)}")
+    for expected in fixture['cells']:
+        (key, value), *cells = expected.items()
+        row = df[df[key] == value] if key in df.columns else df.iloc[:0]
+        if row.empty:
+            problems.append(f"no row with {key} = {value!r}")
+            continue
+        for column, value in cells:
+            actual = row[column].iloc[0] if column in row.columns else None
+            actual = actual.item() if hasattr(actual, 'item') else actual
+            if actual != value:
+                problems.append(f"{key} {expected[key]!r}: {column} = {actual!r}, "
+                                f"expected {value!r}")
+    return problems
+
+
+def check_fixtures():
+    """Run every FIXTURES page; True when all yield the expected rows and cells"""
+    ok = True
+    for fixture in FIXTURES:
+        problems = check_fixture(fixture)
+        label = f"{fixture['site']} <- {fixture['page']}"
+        if problems:
+            ok = False
+            print(f"[ERROR] {label}")
+            for problem in problems:
+                print(f"    {problem}")
+        else:
+            print(f"[OK] {label} (selector {fixture['selector']}, by {fixture['found_by']})")
+    return ok
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Extract embedded JSON records from saved pages")
+    parser.add_argument('page', nargs='?', default=None, help="Saved HTML page")
+    parser.add_argument('--site', choices=sorted(SITES), default=None)
+    parser.add_argument('--check', action='store_true', help="Check every page in FIXTURES")
+    args = parser.parse_args()
+
+    print(f"[INFO] JSON parser: {'orjson' if orjson else 'json'}")
+    if args.check or not args.page:
+        sys.exit(0 if check_fixtures() else 1)
+
+    with open(args.page, encoding='utf-8') as f:
+        html = f.read()
+    if args.site:
+        print(extract(html, args.site).to_string())
+    else:
+        for kind, data in script_blobs(html):
+            print(f"  - {kind}: {type(data).__name__}")
@@ -4,12 +4,13 @@ Scrapes salary data, team valuations, and merchandise sales
 """
 
 import pandas as pd
-import requests
+import http_client
 from bs4 import BeautifulSoup
-import time
 import os
-import json
+import embedded_json
+import instrumentation
 
+@instrumentation.instrument_class
 class FinancialDataCollector:
     def __init__(self):
         self.headers = {
@@ -26,11 +27,14 @@ class FinancialDataCollector:
         url = f"https://www.spotrac.com/nba/rankings/{year}/cap-hit/"
 
         try:
-            time.sleep(self.delay)
-            response = requests.get(url, headers=self.headers)
+            instrumentation.throttle(self.delay)
+            response = http_client.get(url, headers=self.headers)
 
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+                # JS-rendered pages ship the rankings as JSON in a <script> tag
+                df = self.embedded_salaries(response.text, year)
+                if not df.empty:
+                    return df
 
                 # Try to parse the table
                 tables = pd.read_html(response.text)
@@ -61,10 +65,13 @@ class FinancialDataCollector:
             print("\n[INFO] Trying alternative Spotrac URL...")
             url_alt = f"https://www.spotrac.com/nba/rankings/"
 
-            time.sleep(self.delay)
-            response = requests.get(url_alt, headers=self.headers)
+            instrumentation.throttle(self.delay)
+            response = http_client.get(url_alt, headers=self.headers)
 
             if response.status_code == 200:
+                df = self.embedded_salaries(response.text, year)
+                if not df.empty:
+                    return df
                 tables = pd.read_html(response.text)
                 if tables:
                     df = tables[0]
@@ -78,6 +85,19 @@ class FinancialDataCollector:
             print("[TIP] Spotrac may require JavaScript. Consider manual export or Selenium.")
             return pd.DataFrame()
 
+    def embedded_salaries(self, html, year):
+        """
+        Salary rankings from the page's embedded JSON, in the manual
+        template's columns (empty if the page has none)
+        """
+        df = embedded_json.extract(html, 'spotrac_salaries')
+        if df.empty:
+            return df
+        df = df.rename(columns={'Annual_Salary': f'Annual_Salary_{year}'})
+        df['Data_Source'] = 'Spotrac.com - Embedded JSON'
+        print(f"[OK] Found salary data for {len(df)} players (embedded JSON)")
+        return df
+
     def create_spotrac_manual_template(self):
         """
         Create detailed template for manual Spotrac data entry
@@ -126,23 +146,22 @@ class FinancialDataCollector:
         url = "https://www.forbes.com/nba-valuations/list/"
 
         try:
-            time.sleep(self.delay)
-            response = requests.get(url, headers=self.headers)
+            instrumentation.throttle(self.delay)
+            response = http_client.get(url, headers=self.headers)
 
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                # Forbes may use JavaScript to load data
-                # Try to find JSON data in script tags
-                scripts = soup.find_all('script', type='application/ld+json')
-
-                for script in scripts:
-                    try:
-                        data = json.loads(script.string)
-                        print("[INFO] Found JSON data in page")
-                        # Process if it contains team data
-                    except:
-                        pass
+                # Forbes loads the list with JavaScript; its data is embedded
+                # as JSON (__NEXT_DATA__ state, or ld+json ranks and teams)
+                df = embedded_json.extract(response.text, 'forbes_valuations')
+                if not df.empty:
+                    # ld+json alone gives rank and team; keep the template's columns
+                    df = df.reindex(columns=['Rank', 'Team', 'Current_Value_Millions',
+                                             'One_Year_Value_Change_Percent', 'Revenue_Millions',
+                                             'Operating_Income_Millions', 'Owner'])
+                    df['Year'] = 2024
+                    df['Data_Source'] = 'Forbes - Embedded JSON'
+                    print(f"[OK] Found valuations for {len(df)} teams (embedded JSON)")
+                    return df
 
                 # Try table parsing
                 tables = pd.read_html(response.text)
@@ -209,8 +228,8 @@ class FinancialDataCollector:
         url = "https://store.nba.com/top-sellers/x-463133+z-94499947-3163182119"
 
         try:
-            time.sleep(self.delay)
-            response = requests.get(url, headers=self.headers)
+            instrumentation.throttle(self.delay)
+            response = http_client.get(url, headers=self.headers)
 
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
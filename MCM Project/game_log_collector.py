@@ -0,0 +1,143 @@
+"""
+Game Log Collector
+Per-player (and per-team) game logs for every game, stored in the columnar
+store partitioned by (season, game_date):
+
+    data/warehouse/player_game_logs/season=2023-24/game_date=2023-10-24/part.parquet
+
+One bulk LeagueGameLog request per season type covers the whole league, so a
+daily run only asks for the dates after the last one stored and appends them.
+"""
+
+from datetime import datetime
+
+import pandas as pd
+
+import columnar_store
+import instrumentation
+from collector_registry import current_season
+
+DATASETS = {'P': 'player_game_logs', 'T': 'team_game_logs'}
+SEASON_TYPES = ['Regular Season', 'PlayIn', 'Playoffs']
+
+
+@instrumentation.instrument_class
+class GameLogCollector:
+    def __init__(self, root=columnar_store.DEFAULT_ROOT):
+        self.root = root
+        self.delay = 2  # Respectful delay between requests
+
+    def last_stored_date(self, season, kind='P'):
+        dates = columnar_store.partition_values(self.root, DATASETS[kind], 'game_date',
+                                                season=season)
+        return dates[-1] if dates else None
+
+    def fetch_game_logs(self, season='2023-24', kind='P', date_from=None, date_to=None):
+        """
+        League-wide game logs for a season (optionally a date window), all
+        season types. `kind` is 'P' for players or 'T' for teams.
+        """
+        from nba_api.stats.endpoints import leaguegamelog
+
+        frames = []
+        for season_type in SEASON_TYPES:
+            log = leaguegamelog.LeagueGameLog(
+                season=season,
+                season_type_all_star=season_type,
+                player_or_team_abbreviation=kind,
+                date_from_nullable=date_from.strftime('%m/%d/%Y') if date_from else '',
+                date_to_nullable=date_to.strftime('%m/%d/%Y') if date_to else ''
+            )
+            instrumentation.record_endpoint(log)
+            df = log.get_data_frames()[0]
+            instrumentation.throttle(self.delay)
+
+            if not df.empty:
+                df['SEASON_TYPE'] = season_type
+                frames.append(df)
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def store_by_date(self, df, season, kind='P'):
+        """Write one partition per game date (replacing it if it exists)"""
+        dates = pd.to_datetime(df['GAME_DATE']).dt.strftime('%Y-%m-%d')
+        for game_date, day in df.groupby(dates):
+            columnar_store.write_partition(day, self.root, DATASETS[kind],
+                                           {'season': season, 'game_date': game_date})
+        return dates.nunique()
+
+    def update_game_logs(self, season='2023-24', kind='P'):
+        """
+        Incremental update: fetch from the last stored game date (re-fetched in
+        case its late games were still in progress) up to today, and append.
+        """
+        last = self.last_stored_date(season, kind)
+        date_from = datetime.strptime(last, '%Y-%m-%d') if last else None
+        label = f"from {last}" if last else "full season"
+        print(f"\n[GAME LOGS] {DATASETS[kind]} {season} ({label})...")
+
+        try:
+            df = self.fetch_game_logs(season, kind, date_from=date_from)
+        except Exception as e:
+            print(f"[ERROR] {e}")
+            return pd.DataFrame()
+
+        if df.empty:
+            print("[OK] No new games")
+            return df
+
+        days = self.store_by_date(df, season, kind)
+        print(f"[OK] Stored {len(df)} rows across {days} game dates")
+        return df
+
+    def collect_all_game_logs(self, season='2023-24', first_season=None):
+        """
+        Update player and team logs for `season`. With `first_season`, every
+        season from there on is loaded first (past seasons that are already
+        stored only cost one request per season type).
+        """
+        print("="*70)
+        print("GAME LOG COLLECTION")
+        print("="*70)
+
+        seasons = [season]
+        if first_season:
+            from historical_backfill import season_range
+            seasons = season_range(first_season, season)
+
+        for s in seasons:
+            for kind in DATASETS:
+                self.update_game_logs(s, kind)
+
+        print(f"\n[SUCCESS] Game logs stored under {self.root}")
+
+
+def load_game_logs(seasons=None, kind='P', root=columnar_store.DEFAULT_ROOT, since=None):
+    """
+    Read stored game logs, e.g. for rolling-form or availability metrics.
+    `since` ('YYYY-MM-DD') keeps only games on or after that date.
+    """
+    filters = {'season': seasons} if seasons else {}
+    if since:
+        # Prune by partition so an incremental read only opens the new dates
+        dates = columnar_store.partition_values(root, DATASETS[kind], 'game_date', **filters)
+        filters['game_date'] = [d for d in dates if d >= since]
+        if not filters['game_date']:
+            return pd.DataFrame()
+    return columnar_store.read_dataset(root, DATASETS[kind], **filters)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest NBA game logs incrementally")
+    parser.add_argument('--season', default=current_season(datetime.now()))
+    parser.add_argument('--first-season', default=None,
+                        help="Also load every season since this one (e.g. 1996-97)")
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    GameLogCollector(args.root).collect_all_game_logs(args.season, args.first_season)
+    instrumentation.write_run()
@@ -0,0 +1,211 @@
+"""
+Historical Backfill
+Fetches LeagueDashPlayerStats for every (season, measure type, per-mode,
+season type) from 1996-97 to today into the columnar store
+(data/warehouse/player_stats/season=.../measure=.../per_mode=.../season_type=...).
+
+Requests run in a bounded worker pool behind one shared rate limiter, each
+result is written as soon as it arrives, and a re-run skips every partition
+already on disk - so an interrupted backfill simply resumes.
+
+    python historical_backfill.py --plan
+    python historical_backfill.py --workers 3 --min-interval 1.5
+    python historical_backfill.py --start 2015-16 --measures Base --per-modes Totals
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import columnar_store
+import http_client
+import instrumentation
+from collector_registry import current_season
+
+DATASET = 'player_stats'
+FIRST_SEASON = '1996-97'  # first season covered by the stats.nba.com dashboards
+MEASURES = ['Base', 'Advanced']
+PER_MODES = ['Totals', 'PerGame']
+SEASON_TYPES = ['Regular Season', 'Playoffs']
+
+
+def season_range(start, end):
+    """['1996-97', '1997-98', ..., end]"""
+    first, last = int(start[:4]), int(end[:4])
+    return [f"{y}-{str(y + 1)[2:]}" for y in range(first, last + 1)]
+
+
+class HistoricalBackfill:
+    def __init__(self, root=columnar_store.DEFAULT_ROOT, workers=3, min_interval=1.0,
+                 retries=3, timeout=60):
+        self.root = root
+        self.workers = workers
+        self.retries = retries
+        self.timeout = timeout
+        self.limiter = http_client.RateLimiter(min_interval)
+        self.failures_file = os.path.join(root, DATASET, '_failures.json')
+
+    def plan(self, start=FIRST_SEASON, end=None, measures=MEASURES, per_modes=PER_MODES,
+             season_types=SEASON_TYPES):
+        """Every request of the backfill as partition dicts, oldest season first"""
+        end = end or current_season(datetime.now())
+        return [{'season': season, 'measure': measure, 'per_mode': per_mode,
+                 'season_type': season_type}
+                for season in season_range(start, end)
+                for measure in measures
+                for per_mode in per_modes
+                for season_type in season_types]
+
+    def pending(self, tasks):
+        return [t for t in tasks if not columnar_store.has_partition(self.root, DATASET, t)]
+
+    def fetch(self, task):
+        """One LeagueDashPlayerStats request, retried with exponential backoff"""
+        from nba_api.stats.endpoints import leaguedashplayerstats
+
+        for attempt in range(1, self.retries + 1):
+            self.limiter.wait()
+            try:
+                stats = leaguedashplayerstats.LeagueDashPlayerStats(
+                    season=task['season'],
+                    measure_type_detailed_defense=task['measure'],
+                    per_mode_detailed=task['per_mode'],
+                    season_type_all_star=task['season_type'],
+                    timeout=self.timeout
+                )
+                instrumentation.record_endpoint(stats)
+                return stats.get_data_frames()[0]
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                backoff = 2 ** attempt * 5
+                print(f"[WARNING] {self.label(task)}: {e} - retry {attempt} in {backoff}s")
+                instrumentation.throttle(backoff)
+
+    def run_task(self, task):
+        with instrumentation.step('backfill.fetch'):
+            df = self.fetch(task)
+            instrumentation.record_rows(rows_out=len(df))
+        # An empty result (e.g. no playoff rows) is still written, so it is not refetched
+        columnar_store.write_partition(df, self.root, DATASET, task)
+        return len(df)
+
+    @staticmethod
+    def label(task):
+        return f"{task['season']} {task['measure']}/{task['per_mode']}/{task['season_type']}"
+
+    def run(self, tasks):
+        """
+        Fetch every pending task. Returns the tasks that failed (they are also
+        kept in _failures.json and retried on the next run).
+        """
+        todo = self.pending(tasks)
+        print(f"[PLAN] {len(tasks)} partitions, {len(tasks) - len(todo)} already stored, "
+              f"{len(todo)} to fetch with {self.workers} workers")
+        if not todo:
+            return []
+
+        failed = []
+        started = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {pool.submit(self.run_task, task): task for task in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                task = futures[future]
+                try:
+                    rows = future.result()
+                    status = f"[OK] {rows} rows"
+                except Exception as e:
+                    failed.append({**task, 'error': str(e)})
+                    status = f"[ERROR] {e}"
+                elapsed = time.monotonic() - started
+                eta = elapsed / done * (len(todo) - done)
+                print(f"  ({done}/{len(todo)}, ETA {eta / 60:.0f} min) {self.label(task)} {status}")
+        finally:
+            # On Ctrl-C drop queued requests; in-flight ones finish and are stored
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        self.save_failures(failed)
+        return failed
+
+    def save_failures(self, failed):
+        os.makedirs(os.path.dirname(self.failures_file), exist_ok=True)
+        with open(self.failures_file, 'w') as f:
+            json.dump({'updated': datetime.now().isoformat(timespec='seconds'),
+                       'failed': failed}, f, indent=2)
+
+    def backfill(self, start=FIRST_SEASON, end=None):
+        """Pipeline entry point: full default backfill"""
+        print("="*70)
+        print(f"HISTORICAL BACKFILL - {DATASET} from {start}")
+        print("="*70)
+        failed = self.run(self.plan(start, end))
+        if failed:
+            print(f"\n[WARNING] {len(failed)} partitions failed - re-run to retry")
+        else:
+            print(f"\n[SUCCESS] Backfill complete: {os.path.join(self.root, DATASET)}")
+        return failed
+
+
+def split(values):
+    return [v.strip() for value in values for v in value.split(',') if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill player stats for every season")
+    parser.add_argument('--start', default=FIRST_SEASON)
+    parser.add_argument('--end', default=None, help="Last season (default: current)")
+    parser.add_argument('--measures', action='append', default=[],
+                        help=f"Comma separated (default: {','.join(MEASURES)})")
+    parser.add_argument('--per-modes', action='append', default=[],
+                        help=f"Comma separated (default: {','.join(PER_MODES)})")
+    parser.add_argument('--season-types', action='append', default=[],
+                        help=f"Comma separated (default: {','.join(SEASON_TYPES)})")
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--min-interval', type=float, default=1.0,
+                        help="Seconds between requests across all workers (default: %(default)s)")
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    parser.add_argument('--plan', action='store_true', help="Only show what would be fetched")
+    parser.add_argument('--metrics-dir', default=os.path.join('data', 'metrics'))
+    args = parser.parse_args(argv)
+
+    backfill = HistoricalBackfill(args.root, args.workers, args.min_interval)
+    tasks = backfill.plan(args.start, args.end,
+                          split(args.measures) or MEASURES,
+                          split(args.per_modes) or PER_MODES,
+                          split(args.season_types) or SEASON_TYPES)
+
+    if args.plan:
+        todo = backfill.pending(tasks)
+        for task in todo:
+            print(f"  {backfill.label(task)}")
+        print(f"\n{len(todo)} of {len(tasks)} partitions to fetch; at "
+              f"{args.min_interval}s per request that is ~{len(todo) * args.min_interval / 60:.0f} min")
+        return 0
+
+    print("="*70)
+    print(f"HISTORICAL BACKFILL - {tasks[0]['season']} to {tasks[-1]['season']}")
+    print("="*70)
+
+    try:
+        failed = backfill.run(tasks)
+    except KeyboardInterrupt:
+        print("\n[INFO] Interrupted - completed partitions are kept, re-run to resume")
+        return 130
+    finally:
+        instrumentation.write_run(args.metrics_dir)
+
+    if failed:
+        print(f"\n[WARNING] {len(failed)} partitions failed (see {backfill.failures_file}) "
+              f"- re-run to retry")
+        return 1
+    print(f"\n[SUCCESS] All partitions stored under {os.path.join(args.root, DATASET)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Shared HTTP Client
+One pooled requests.Session for all scrapers, plus an in-memory conditional-GET
+cache (ETag / Last-Modified) so long-running processes only re-download pages
+that actually changed
+"""
+
+import threading
+import time
+
+import instrumentation
+
+_session = None
+_session_lock = threading.Lock()
+
+# url -> {'etag': ..., 'last_modified': ..., 'response': requests.Response}
+_cache = {}
+
+
+def get_session():
+    """Return the process-wide requests.Session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def get(url, headers=None, use_cache=True, timeout=30, **kwargs):
+    """
+    GET through the shared session. When the server sent an ETag or
+    Last-Modified for a previous response, revalidate instead of re-downloading;
+    a 304 returns the cached response with `from_cache = True`.
+    """
+    request_headers = dict(headers or {})
+    cached = _cache.get(url) if use_cache else None
+
+    if cached:
+        if cached['etag']:
+            request_headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            request_headers['If-Modified-Since'] = cached['last_modified']
+
+    response = get_session().get(url, headers=request_headers, timeout=timeout, **kwargs)
+
+    if response.status_code == 304 and cached:
+        instrumentation.record_http(304, 0, from_cache=True)
+        cached['response'].from_cache = True
+        return cached['response']
+
+    instrumentation.record_http(response.status_code, len(response.content))
+    response.from_cache = False
+    if use_cache and response.status_code == 200:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            _cache[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'response': response
+            }
+
+    return response
+
+
+def clear_cache():
+    """Drop all cached responses"""
+    _cache.clear()
+
+
+class RateLimiter:
+    """
+    Thread-safe spacing of requests: at most one call per `min_interval`
+    seconds across all threads sharing the limiter. Waiting is recorded as
+    throttle time in the instrumentation.
+    """
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        instrumentation.throttle(slot - now)
@@ -0,0 +1,291 @@
+"""
+Pipeline Instrumentation
+Lightweight per-step metrics for collectors and DataMerger: wall/CPU time,
+bytes downloaded, HTTP status counts, throttle wait, rows in/out and cache hits.
+A run is written as JSON lines (history) plus a Prometheus text-format file.
+
+Usage:
+    @instrumentation.instrument_class        # every public method is a step
+    class MyCollector: ...
+
+    with instrumentation.step('custom_step'):
+        ...
+    instrumentation.throttle(self.delay)      # sleep + record throttle wait
+    instrumentation.write_run('data/metrics')
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+_current = contextvars.ContextVar('instrumentation_step', default=None)
+_lock = threading.Lock()
+_steps = {}  # step name -> StepMetrics, aggregated over calls within this run
+instrumented_classes = []
+_run_id = uuid.uuid4().hex[:12]
+_run_started = datetime.now()
+
+COUNTERS = ('bytes_downloaded', 'throttle_seconds', 'rows_in', 'rows_out',
+            'cache_hits', 'cache_misses')
+
+
+class StepMetrics:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.http_status = Counter()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def add(self, counter, value):
+        with _lock:
+            self.counters[counter] += value
+
+    def merge_io(self, other):
+        """Roll a nested step's I/O counters up into this step (not rows/time)"""
+        with _lock:
+            self.http_status.update(other.http_status)
+            for counter in ('bytes_downloaded', 'throttle_seconds', 'cache_hits', 'cache_misses'):
+                self.counters[counter] += other.counters[counter]
+
+    @property
+    def cache_hit_ratio(self):
+        lookups = self.counters['cache_hits'] + self.counters['cache_misses']
+        return self.counters['cache_hits'] / lookups if lookups else None
+
+    def to_dict(self):
+        return {
+            'step': self.name,
+            'calls': self.calls,
+            'errors': self.errors,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'http_status': {str(k): v for k, v in sorted(self.http_status.items())},
+            **{k: round(v, 6) if isinstance(v, float) else v for k, v in self.counters.items()},
+            'cache_hit_ratio': self.cache_hit_ratio,
+        }
+
+
+class _Call:
+    """Metrics of a single in-flight step invocation"""
+
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+        self.metrics = StepMetrics(name)
+
+
+# ---------- recording ----------
+
+def _active():
+    call = _current.get()
+    return call.metrics if call else None
+
+
+def record_http(status_code, nbytes=0, from_cache=False):
+    metrics = _active()
+    if metrics is None:
+        return
+    with _lock:
+        metrics.http_status[int(status_code)] += 1
+        metrics.counters['bytes_downloaded'] += int(nbytes)
+        metrics.counters['cache_hits' if from_cache else 'cache_misses'] += 1
+
+
+def record_endpoint(endpoint):
+    """Record an nba_api endpoint call (status and payload size) if available"""
+    response = getattr(endpoint, 'nba_response', None)
+    if response is None:
+        return
+    status = getattr(response, '_status_code', None) or 200
+    text = getattr(response, '_response', '') or ''
+    record_http(status, len(text.encode('utf-8')) if isinstance(text, str) else len(text))
+
+
+def record_cache(hit):
+    metrics = _active()
+    if metrics is not None:
+        metrics.add('cache_hits' if hit else 'cache_misses', 1)
+
+
+def record_rows(rows_in=None, rows_out=None):
+    metrics = _active()
+    if metrics is None:
+        return
+    if rows_in is not None:
+        metrics.add('rows_in', int(rows_in))
+    if rows_out is not None:
+        metrics.add('rows_out', int(rows_out))
+
+
+def throttle(seconds):
+    """Sleep for a rate-limit delay and record it as throttle wait"""
+    if seconds <= 0:
+        return
+    time.sleep(seconds)
+    metrics = _active()
+    if metrics is not None:
+        metrics.add('throttle_seconds', float(seconds))
+
+
+def _row_count(value):
+    shape = getattr(value, 'shape', None)
+    return shape[0] if shape else None
+
+
+class step:
+    """
+    Context manager / decorator that measures one pipeline step
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        call = _Call(self.name, _current.get())
+        self._token = _current.set(call)
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return call.metrics
+
+    def __exit__(self, exc_type, exc, tb):
+        call = _current.get()
+        _current.reset(self._token)
+
+        metrics = call.metrics
+        metrics.calls = 1
+        metrics.errors = 1 if exc_type else 0
+        metrics.wall_seconds = time.perf_counter() - self._wall
+        metrics.cpu_seconds = time.process_time() - self._cpu
+
+        with _lock:
+            total = _steps.setdefault(self.name, StepMetrics(self.name))
+            total.calls += 1
+            total.errors += metrics.errors
+            total.wall_seconds += metrics.wall_seconds
+            total.cpu_seconds += metrics.cpu_seconds
+            total.http_status.update(metrics.http_status)
+            for counter, value in metrics.counters.items():
+                total.counters[counter] += value
+
+        if call.parent is not None:
+            call.parent.metrics.merge_io(metrics)
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with step(self.name):
+                rows_in = sum(n for n in map(_row_count, args[1:] + tuple(kwargs.values()))
+                              if n is not None)
+                record_rows(rows_in=rows_in)
+                result = func(*args, **kwargs)
+                record_rows(rows_out=_row_count(result))
+                return result
+        return wrapper
+
+
+def instrument_class(cls):
+    """
+    Class decorator: every public method becomes a step named Class.method.
+    Stages selected via MCM_PROFILE are additionally profiled (see profiling.py).
+    """
+    for attr, value in list(vars(cls).items()):
+        if callable(value) and not attr.startswith('_'):
+            setattr(cls, attr, step(f"{cls.__name__}.{attr}")(value))
+    instrumented_classes.append(cls)
+
+    if os.environ.get('MCM_PROFILE'):
+        import profiling
+        profiling.wrap_class(cls)
+    return cls
+
+
+# ---------- reporting ----------
+
+def snapshot():
+    """Aggregated metrics of every step recorded so far in this run"""
+    with _lock:
+        return [m.to_dict() for m in _steps.values()]
+
+
+def reset():
+    global _run_id, _run_started
+    with _lock:
+        _steps.clear()
+    _run_id = uuid.uuid4().hex[:12]
+    _run_started = datetime.now()
+
+
+def _prom_escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus(steps):
+    """Render step metrics in the Prometheus text exposition format"""
+    gauges = [
+        ('calls', 'Times the step ran in this run'),
+        ('errors', 'Calls that raised an exception'),
+        ('wall_seconds', 'Wall-clock time spent in the step'),
+        ('cpu_seconds', 'Process CPU time spent in the step'),
+        ('bytes_downloaded', 'Response bytes downloaded'),
+        ('throttle_seconds', 'Time spent sleeping for rate limits'),
+        ('rows_in', 'DataFrame rows passed into the step'),
+        ('rows_out', 'DataFrame rows returned by the step'),
+        ('cache_hits', 'Cache hits'),
+        ('cache_misses', 'Cache misses'),
+        ('cache_hit_ratio', 'Cache hits / lookups'),
+    ]
+
+    lines = []
+    for field, help_text in gauges:
+        metric = f"mcm_step_{field}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for s in steps:
+            if s[field] is not None:
+                lines.append(f'{metric}{{step="{_prom_escape(s["step"])}"}} {s[field]}')
+
+    lines.append("# HELP mcm_step_http_responses HTTP responses by status code")
+    lines.append("# TYPE mcm_step_http_responses gauge")
+    for s in steps:
+        for status, count in s['http_status'].items():
+            lines.append(f'mcm_step_http_responses{{step="{_prom_escape(s["step"])}",'
+                         f'status="{status}"}} {count}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_run(output_dir=os.path.join('data', 'metrics')):
+    """
+    Append this run's step metrics to steps.jsonl and write pipeline.prom
+    """
+    steps = snapshot()
+    if not steps:
+        return None
+
+    os.makedirs(output_dir, exist_ok=True)
+    finished = datetime.now().isoformat(timespec='seconds')
+
+    jsonl_path = os.path.join(output_dir, 'steps.jsonl')
+    with open(jsonl_path, 'a') as f:
+        for s in steps:
+            f.write(json.dumps({'run_id': _run_id,
+                                'started': _run_started.isoformat(timespec='seconds'),
+                                'finished': finished, **s}) + '\n')
+
+    prom_path = os.path.join(output_dir, 'pipeline.prom')
+    with open(prom_path + '.tmp', 'w') as f:
+        f.write(to_prometheus(steps))
+    os.replace(prom_path + '.tmp', prom_path)
+
+    print(f"[METRICS] {len(steps)} steps -> {jsonl_path}, {prom_path}")
+    return jsonl_path
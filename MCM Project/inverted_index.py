@@ -0,0 +1,295 @@
+"""
+Inverted Index
+Term -> posting list index over the stored Reddit text (submission titles and
+selftext, comment bodies), so keyword counts over any date window come from
+posting-list intersections instead of rescanning every text:
+
+    data/index/nba/manifest.json
+    data/index/nba/seg-000003/{terms,offsets,postings,doc_keys,ts,source}.npy
+
+Each segment indexes one batch of documents: sorted 64-bit term hashes,
+offsets into one postings array (segment-local document numbers, sorted),
+and per document its ID hash, timestamp and source. Segments are written to a
+temp directory and renamed into place, then listed in the manifest, so a
+crash never leaves a half-written segment in use. Updates only index IDs not
+indexed yet and add a segment; beyond MAX_SEGMENTS they are merged into one.
+Segments are memory-mapped, so a query reads just the posting lists it needs.
+
+A keyword matches documents containing all of its words (any order, any
+case) - the way Reddit search matches "Seattle NBA".
+
+    python inverted_index.py "Seattle NBA" Wembanyama --start 2024-05-01 --end 2024-05-31
+"""
+
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+import instrumentation
+import reddit_ingester
+
+DEFAULT_ROOT = os.path.join('data', 'index')
+SOURCE_CODES = {reddit_ingester.SUBMISSIONS: 0, reddit_ingester.COMMENTS: 1}
+WORD_PATTERN = r"[a-z0-9']+"
+MAX_SEGMENTS = 8
+KEY_VERSION = 2  # 1 keyed documents by ID alone
+ARRAYS = ['terms', 'offsets', 'postings', 'doc_keys', 'ts', 'source']
+
+
+def term_hashes(words):
+    return pd.util.hash_array(np.asarray(words, dtype=object))
+
+
+def doc_keys(ids, source):
+    """
+    Document key hashes. Submission (t3) and comment (t1) IDs are separate
+    counters on Reddit, so the source code is part of the key.
+    """
+    return term_hashes([f"{source}:{i}" for i in ids])
+
+
+def query_terms(keyword):
+    """Distinct term hashes of a keyword, as the index tokenizes text"""
+    return np.unique(term_hashes(pd.Series([keyword]).str.lower().str.findall(WORD_PATTERN)[0]))
+
+
+def build_segment(doc_keys, texts, ts, source):
+    """Arrays of one segment over a batch of documents"""
+    words = pd.Series(list(texts), dtype=object).fillna('').astype(str).str.lower() \
+        .str.findall(WORD_PATTERN).explode().dropna()
+    doc = words.index.to_numpy(dtype=np.int32)
+    terms = term_hashes(words.to_numpy(dtype=object))
+    return postings_segment(terms, doc, doc_keys, ts, source)
+
+
+def postings_segment(terms, doc, doc_keys, ts, source):
+    """Segment arrays from (term hash, local doc) pairs, duplicates allowed"""
+    order = np.lexsort((doc, terms))
+    terms, doc = terms[order], doc[order]
+    keep = np.r_[True, (terms[1:] != terms[:-1]) | (doc[1:] != doc[:-1])]
+    terms, doc = terms[keep], doc[keep]
+    starts = np.flatnonzero(np.r_[True, terms[1:] != terms[:-1]]) if len(terms) else \
+        np.array([], dtype=np.int64)
+    return {
+        'terms': terms[starts],
+        'offsets': np.r_[starts, len(terms)].astype(np.int64),
+        'postings': doc.astype(np.int32),
+        'doc_keys': np.asarray(doc_keys, dtype=np.uint64),
+        'ts': np.asarray(ts, dtype=np.int64),
+        'source': np.asarray(source, dtype=np.int8),
+    }
+
+
+def merge_segments(segments):
+    """One segment holding the documents of all `segments`, in order"""
+    terms, docs, base = [], [], 0
+    for seg in segments:
+        terms.append(np.repeat(seg['terms'], np.diff(seg['offsets'])))
+        docs.append(np.asarray(seg['postings'], dtype=np.int64) + base)
+        base += len(seg['doc_keys'])
+    merged = postings_segment(np.concatenate(terms), np.concatenate(docs),
+                              *(np.concatenate([s[name] for s in segments])
+                                for name in ('doc_keys', 'ts', 'source')))
+    merged['postings'] = merged['postings'].astype(np.int32)
+    return merged
+
+
+class InvertedIndex:
+    def __init__(self, subreddit='nba', root=DEFAULT_ROOT):
+        self.subreddit = subreddit
+        self.dir = os.path.join(root, columnar_store.slug(subreddit))
+        self.manifest_file = os.path.join(self.dir, 'manifest.json')
+        self._segments = {}
+        self._keys = None
+        manifest = self.manifest()
+        if manifest['segments'] and manifest.get('version', 1) != KEY_VERSION:
+            print(f"[INFO] Rebuilding {self.dir} (document keys changed)")
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+    # ---------- segments ----------
+
+    def manifest(self):
+        if not os.path.exists(self.manifest_file):
+            return {'segments': [], 'next': 0, 'version': KEY_VERSION}
+        with open(self.manifest_file) as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self.manifest_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self.manifest_file)
+
+    def segment(self, name):
+        """Memory-mapped arrays of one segment (cached)"""
+        if name not in self._segments:
+            path = os.path.join(self.dir, name)
+            self._segments[name] = {a: np.load(os.path.join(path, f"{a}.npy"), mmap_mode='r')
+                                    for a in ARRAYS}
+        return self._segments[name]
+
+    def segments(self):
+        return [self.segment(name) for name in self.manifest()['segments']]
+
+    def indexed(self, keys):
+        """Which document keys are already indexed"""
+        if self._keys is None:
+            known = [np.asarray(s['doc_keys']) for s in self.segments()]
+            self._keys = np.sort(np.concatenate(known)) if known else np.array([], dtype=np.uint64)
+        return np.isin(keys, self._keys)
+
+    def write_segment(self, arrays, manifest):
+        name = f"seg-{manifest['next']:06d}"
+        manifest['next'] += 1
+        path = os.path.join(self.dir, name)
+        tmp = path + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for a in ARRAYS:
+            np.save(os.path.join(tmp, f"{a}.npy"), arrays[a])
+        os.replace(tmp, path)
+        return name
+
+    def add(self, ids, texts, timestamps, source):
+        """Index a batch of documents (skipping IDs already indexed) as a new segment"""
+        keys = doc_keys(ids, source)
+        new = ~self.indexed(keys) & ~pd.Series(keys).duplicated(keep='last').to_numpy()
+        if not new.any():
+            return 0
+        texts = np.asarray(list(texts), dtype=object)[new]
+        ts = np.asarray(timestamps, dtype=np.int64)[new]
+        arrays = build_segment(keys[new], texts, ts, np.full(int(new.sum()), source, dtype=np.int8))
+
+        manifest = self.manifest()
+        manifest['segments'].append(self.write_segment(arrays, manifest))
+        self._keys = np.sort(np.concatenate([self._keys, arrays['doc_keys']]))
+        if len(manifest['segments']) > MAX_SEGMENTS:
+            self.compact(manifest)
+        self.save_manifest(manifest)
+        return int(new.sum())
+
+    def compact(self, manifest):
+        """Merge every segment into one; old directories go once the manifest moves on"""
+        old = manifest['segments']
+        merged = merge_segments([self.segment(name) for name in old])
+        manifest['segments'] = [self.write_segment(merged, manifest)]
+        self.save_manifest(manifest)
+        self._segments.clear()
+        for name in old:
+            shutil.rmtree(os.path.join(self.dir, name), ignore_errors=True)
+
+    # ---------- updates from the columnar store ----------
+
+    def update(self, days=None, root=columnar_store.DEFAULT_ROOT):
+        """
+        Index stored submissions and comments not indexed yet (all stored
+        months, or those of the last `days`). Returns documents added.
+        """
+        since = f"{pd.Timestamp.now() - pd.Timedelta(days=days):%Y-%m}" if days else ''
+        added = 0
+        for dataset, code in SOURCE_CODES.items():
+            months = [m for m in columnar_store.partition_values(root, dataset, 'month',
+                                                                 subreddit=self.subreddit)
+                      if m >= since]
+            columns = ['ID', 'CREATED_UTC'] + reddit_ingester.TEXT_COLUMNS[dataset]
+            for month in months:
+                ids = columnar_store.read_dataset(root, dataset, columns=['ID'],
+                                                  subreddit=self.subreddit, month=month)
+                if self.indexed(doc_keys(ids['ID'], code)).all():
+                    continue  # only texts of months with new IDs are read
+                df = columnar_store.read_dataset(root, dataset, columns=columns,
+                                                 subreddit=self.subreddit, month=month)
+                df = df.drop_duplicates('ID', keep='last')
+                with instrumentation.step('inverted_index.update'):
+                    count = self.add(df['ID'], reddit_ingester.text_of(df, dataset),
+                                     df['CREATED_UTC'], code)
+                    instrumentation.record_rows(rows_in=len(df), rows_out=count)
+                added += count
+        return added
+
+    # ---------- queries ----------
+
+    def matches(self, seg, terms):
+        """Segment-local documents containing every term"""
+        lists = []
+        for term in terms:
+            i = int(np.searchsorted(seg['terms'], term))
+            if i == len(seg['terms']) or seg['terms'][i] != term:
+                return np.array([], dtype=np.int32)
+            lists.append(seg['postings'][seg['offsets'][i]:seg['offsets'][i + 1]])
+        if not lists:
+            return np.array([], dtype=np.int32)
+        lists.sort(key=len)  # intersect from the shortest list up
+        docs = np.asarray(lists[0])
+        for other in lists[1:]:
+            docs = np.intersect1d(docs, other, assume_unique=True)
+            if not len(docs):
+                break
+        return docs
+
+    def timestamps(self, keyword, start=None, end=None, sources=None):
+        """Creation times (unix seconds) of the documents matching `keyword`"""
+        terms = query_terms(keyword)
+        lo = pd.Timestamp(start).timestamp() if start is not None else -np.inf
+        hi = pd.Timestamp(end).timestamp() if end is not None else np.inf
+        codes = [SOURCE_CODES[s] for s in sources] if sources else None
+        found = []
+        for seg in self.segments():
+            docs = self.matches(seg, terms)
+            if not len(docs):
+                continue
+            ts = seg['ts'][docs]
+            keep = (ts >= lo) & (ts < hi)
+            if codes is not None:
+                keep &= np.isin(seg['source'][docs], codes)
+            found.append(ts[keep])
+        return np.concatenate(found) if found else np.array([], dtype=np.int64)
+
+    def count(self, keyword, start=None, end=None, sources=None):
+        """Documents containing every word of `keyword` created in [start, end)"""
+        return len(self.timestamps(keyword, start, end, sources))
+
+    def daily_counts(self, keyword, start=None, end=None, sources=None):
+        """Matching documents per day"""
+        days = pd.to_datetime(self.timestamps(keyword, start, end, sources), unit='s').normalize()
+        return pd.Series(1, index=days).groupby(level=0).sum().rename(keyword)
+
+
+def keyword_mentions(keywords, subreddit='nba', days=30, root=columnar_store.DEFAULT_ROOT,
+                     sources=(reddit_ingester.COMMENTS,), index_root=DEFAULT_ROOT):
+    """keyword -> matching documents of the last `days`, indexing new ones first"""
+    index = InvertedIndex(subreddit, index_root)
+    index.update(days, root)
+    since = pd.Timestamp.now() - pd.Timedelta(days=days)
+    return {k: index.count(k, start=since, sources=sources) for k in keywords}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Keyword counts from the inverted index")
+    parser.add_argument('keywords', nargs='*', default=None)
+    parser.add_argument('--subreddit', default='nba')
+    parser.add_argument('--start', default=None)
+    parser.add_argument('--end', default=None)
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    parser.add_argument('--index-root', default=DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    index = InvertedIndex(args.subreddit, args.index_root)
+    started = time.perf_counter()
+    added = index.update(root=args.root)
+    print(f"[OK] Indexed {added:,} new documents in {time.perf_counter() - started:.1f}s "
+          f"({len(index.manifest()['segments'])} segments)")
+    for keyword in args.keywords or reddit_ingester.DEFAULT_KEYWORDS:
+        started = time.perf_counter()
+        count = index.count(keyword, args.start, args.end)
+        print(f"  - {keyword}: {count:,} documents "
+              f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+    instrumentation.write_run()
@@ -4,10 +4,10 @@ Collects net rating when specific 5-player lineups are on court together
 """
 
 import pandas as pd
-import time
-from nba_api.stats.endpoints import leaguedashlineups
 import os
+import instrumentation
 
+@instrumentation.instrument_class
 class LineupDataCollector:
     def __init__(self):
         self.delay = 2
@@ -25,6 +25,8 @@ class LineupDataCollector:
         print(f"   (Filtering lineups with >= {min_minutes} minutes together)")
 
         try:
+            from nba_api.stats.endpoints import leaguedashlineups
+
             # Get lineup data from NBA API
             lineups = leaguedashlineups.LeagueDashLineups(
                 season=season,
@@ -33,6 +35,8 @@ class LineupDataCollector:
                 group_quantity=5  # 5-player lineups
             )
 
+            instrumentation.record_endpoint(lineups)
+
             df = lineups.get_data_frames()[0]
 
             # Filter by minimum minutes
@@ -88,7 +92,7 @@ class LineupDataCollector:
                 if rating_col in df_clean.columns:
                     print(f"   Minutes: {df_clean.iloc[0]['Minutes']:.1f}, {rating_col}: {df_clean.iloc[0][rating_col]:.1f}")
 
-            time.sleep(self.delay)
+            instrumentation.throttle(self.delay)
             return df_clean
 
         except Exception as e:
@@ -102,18 +106,22 @@ class LineupDataCollector:
         print(f"\n[LOADING] Fetching 2-player combination data...")
 
         try:
+            from nba_api.stats.endpoints import leaguedashlineups
+
             lineups = leaguedashlineups.LeagueDashLineups(
                 season=season,
                 group_quantity=2  # 2-player combinations
             )
 
+            instrumentation.record_endpoint(lineups)
+
             df = lineups.get_data_frames()[0]
 
             df = df.sort_values('MIN', ascending=False)
 
             print(f"[OK] Collected {len(df)} 2-player combinations")
 
-            time.sleep(self.delay)
+            instrumentation.throttle(self.delay)
             return df
 
         except Exception as e:
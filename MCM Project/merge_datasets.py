@@ -6,7 +6,9 @@ Creates player-level and team-level master datasets
 import pandas as pd
 import os
 from glob import glob
+import instrumentation
 
+@instrumentation.instrument_class
 class DataMerger:
     def __init__(self, data_dir='data'):
         self.data_dir = data_dir
@@ -0,0 +1,172 @@
+"""
+Metrics Engine
+Every derived metric is declared once, with the columns (or other metrics) it
+needs. compute() resolves the dependency graph and evaluates any requested set
+in a single vectorised pass: shared intermediates such as total minutes
+(MIN * GP) are computed once, and a frame holding many seasons is handled in
+the same pass as a single season.
+
+    import metrics_engine
+    df = metrics_engine.compute(df, metrics_engine.APPROX_METRICS)
+"""
+
+import numpy as np
+
+
+class Metric:
+    def __init__(self, name, inputs, func, description='', intermediate=False):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.func = func
+        self.description = description
+        self.intermediate = intermediate
+
+
+METRICS = {}
+
+
+def metric(name, *inputs, description='', intermediate=False):
+    """Register `func(*input_arrays)` as the definition of metric `name`"""
+    def register(func):
+        if name in METRICS:
+            raise ValueError(f"Metric already registered: {name}")
+        METRICS[name] = Metric(name, inputs, func, description or (func.__doc__ or '').strip(),
+                               intermediate)
+        return func
+    return register
+
+
+def resolve(names):
+    """
+    Metrics needed to compute `names`, dependencies first.
+    Returns (ordered metric names, base columns required from the frame).
+    """
+    order, columns = [], []
+    state = {}  # name -> 'visiting' | 'done'
+
+    def visit(name, path):
+        if name not in METRICS:
+            if name not in columns:
+                columns.append(name)
+            return
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Metric dependency cycle: {' -> '.join(path + [name])}")
+        state[name] = 'visiting'
+        for dep in METRICS[name].inputs:
+            visit(dep, path + [name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in names:
+        visit(name, [])
+    return order, columns
+
+
+def compute(df, names, keep_intermediates=False):
+    """
+    Return a copy of `df` with the requested metrics added as columns.
+    Metrics are evaluated on float arrays, one vectorised expression each.
+    """
+    order, columns = resolve(names)
+
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise KeyError(f"Missing input columns for {', '.join(names)}: {', '.join(missing)}")
+
+    values = {c: df[c].to_numpy(dtype=float) for c in columns}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name in order:
+            spec = METRICS[name]
+            values[name] = spec.func(*(values[i] for i in spec.inputs))
+
+    wanted = [n for n in order
+              if n in names or (keep_intermediates and METRICS[n].intermediate)]
+    return df.assign(**{n: values[n] for n in wanted})
+
+
+# ============= SHARED INTERMEDIATES =============
+
+@metric('MIN_TOTAL', 'MIN', 'GP', intermediate=True)
+def _min_total(minutes, games):
+    """Season minutes (per-game minutes x games played)"""
+    return minutes * games
+
+
+@metric('FG_MISSED', 'FGA', 'FGM', intermediate=True)
+def _fg_missed(fga, fgm):
+    """Missed field goals per game"""
+    return fga - fgm
+
+
+@metric('TOV_PER_MIN', 'TOV', 'MIN', intermediate=True)
+def _tov_per_min(tov, minutes):
+    """Turnovers per minute played"""
+    return tov / minutes
+
+
+# ============= BOX-SCORE APPROXIMATIONS =============
+# Approximations of PER/WS/BPM/VORP from NBA API per-game + advanced stats,
+# for when Basketball-Reference's versions are unavailable.
+
+@metric('PER_approx', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'FG_MISSED', 'MIN')
+def _per(pts, reb, ast, stl, blk, tov, fg_missed, minutes):
+    """Simplified PER, scaled to a ~15 average"""
+    return (pts + reb * 0.7 + ast * 0.7 + stl + blk - tov - fg_missed * 0.5) / minutes * 15
+
+
+@metric('WS_approx', 'NET_RATING', 'MIN_TOTAL')
+def _ws(net_rating, min_total):
+    """Win Shares from net rating and season minutes"""
+    return net_rating * min_total / 1000
+
+
+@metric('OWS_approx', 'OFF_RATING', 'MIN_TOTAL')
+def _ows(off_rating, min_total):
+    """Offensive Win Shares"""
+    return off_rating * min_total / 2000
+
+
+@metric('DWS_approx', 'WS_approx', 'OWS_approx')
+def _dws(ws, ows):
+    """Defensive Win Shares (WS - OWS)"""
+    return ws - ows
+
+
+@metric('BPM_approx', 'NET_RATING', 'USG_PCT', 'TOV_PER_MIN')
+def _bpm(net_rating, usg_pct, tov_per_min):
+    """Box Plus/Minus from net rating, usage and turnover rate"""
+    return (net_rating * 0.5 + usg_pct * 0.2 - tov_per_min * 3) / 10
+
+
+@metric('OBPM_approx', 'OFF_RATING')
+def _obpm(off_rating):
+    """Offensive BPM"""
+    return off_rating / 20 - 5
+
+
+@metric('DBPM_approx', 'DEF_RATING')
+def _dbpm(def_rating):
+    """Defensive BPM"""
+    return 6 - def_rating / 20
+
+
+@metric('VORP_approx', 'BPM_approx', 'MIN_TOTAL')
+def _vorp(bpm, min_total):
+    """Value Over Replacement Player (replacement level = -2.0 BPM)"""
+    return (bpm + 2.0) * min_total / 1000
+
+
+APPROX_METRICS = ['PER_approx', 'WS_approx', 'OWS_approx', 'DWS_approx',
+                  'BPM_approx', 'OBPM_approx', 'DBPM_approx', 'VORP_approx']
+
+
+if __name__ == "__main__":
+    print("="*70)
+    print("REGISTERED METRICS")
+    print("="*70)
+    for spec in METRICS.values():
+        kind = ' (intermediate)' if spec.intermediate else ''
+        print(f"\n  {spec.name}{kind}: {spec.description}")
+        print(f"      inputs: {', '.join(spec.inputs)}")
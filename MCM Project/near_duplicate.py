@@ -0,0 +1,347 @@
+"""
+Near-Duplicate Detection
+Clusters reposts, crossposts and copy-pasted text with MinHash + LSH so buzz
+counts can be taken over unique items. One streaming pass in creation order:
+
+  - each text becomes word 3-shingles, hashed in bulk (pandas hash_array),
+    and a 64-value MinHash signature (multiply-shift hashes, one vectorised
+    pass per hash over a whole batch)
+  - the signature is cut into 16 bands of 4 values; texts sharing a band are
+    candidates (~50% Jaccard and up), kept if their signatures agree on at
+    least THRESHOLD of the values (estimated Jaccard)
+  - accepted pairs are merged with union-find; each cluster is labelled with
+    its earliest text, the representative
+
+The LSH index keeps the band keys and signatures of the most recent
+`capacity` texts, in sorted chunks that are evicted oldest first, so memory
+stays bounded (~400 bytes per indexed text) however long the stream is -
+reposts are matched against the recent window. Texts under MIN_WORDS words
+are never clustered.
+
+For the Reddit data reddit_ingester.py stores, every ID gets its
+representative in
+
+    data/warehouse/near_duplicates/source=reddit_comments/subreddit=nba/month=2024-05/part-<n>.parquet
+
+and the index is saved between runs, so a later run only processes new IDs.
+
+    python near_duplicate.py --subreddit nba --days 30
+"""
+
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+import instrumentation
+import reddit_ingester
+
+DATASET = 'near_duplicates'
+SOURCES = reddit_ingester.TEXT_COLUMNS
+INDEX_DIR = os.path.join('data', 'cache', 'near_duplicate')
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+THRESHOLD = 0.7
+SHINGLE = 3
+MIN_WORDS = 6  # shorter texts ("This is great news") repeat without being reposts
+CAPACITY = 500_000
+BATCH_SIZE = 5_000
+WORD_PATTERN = r"[a-z0-9']+"
+
+_rng = np.random.default_rng(20240501)  # fixed: signatures must match across runs
+PERM_A = _rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+PERM_B = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+SHINGLE_MIX = _rng.integers(1, 2**63, SHINGLE, dtype=np.uint64) | np.uint64(1)
+BAND_MIX = _rng.integers(1, 2**63, ROWS + 1, dtype=np.uint64) | np.uint64(1)
+
+
+def signatures(texts):
+    """
+    (MinHash signatures (n, NUM_PERM) uint32, has_signature (n,) bool) -
+    texts with fewer than MIN_WORDS words get no signature
+    """
+    words = pd.Series(list(texts), dtype=object).fillna('').astype(str).str.lower() \
+        .str.findall(WORD_PATTERN).explode().dropna()
+    n = len(texts)
+    sigs = np.zeros((n, NUM_PERM), dtype=np.uint32)
+    if words.empty:
+        return sigs, np.zeros(n, dtype=bool)
+    doc = words.index.to_numpy()
+    hashed = pd.util.hash_array(words.to_numpy(dtype=object))
+    # Shingle k covers words k..k+SHINGLE-1 of one text
+    start = np.flatnonzero(doc[:len(doc) - SHINGLE + 1] == doc[SHINGLE - 1:])
+    with np.errstate(over='ignore'):
+        shingles = np.zeros(len(start), dtype=np.uint64)
+        for k in range(SHINGLE):
+            shingles += hashed[start + k] * SHINGLE_MIX[k]
+    owner = doc[start]
+    has = np.zeros(n, dtype=bool)
+    if not len(start):
+        return sigs, has
+    firsts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+    long_enough = np.diff(np.r_[firsts, len(owner)]) >= MIN_WORDS - SHINGLE + 1
+    has[owner[firsts[long_enough]]] = True
+    with np.errstate(over='ignore'):
+        for p in range(NUM_PERM):
+            values = ((shingles * PERM_A[p] + PERM_B[p]) >> np.uint64(32)).astype(np.uint32)
+            sigs[owner[firsts], p] = np.minimum.reduceat(values, firsts)
+    return sigs, has
+
+
+def band_keys(sigs):
+    """(n, BANDS) uint64 - one hash per band of ROWS signature values"""
+    bands = sigs.reshape(len(sigs), BANDS, ROWS).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        keys = np.arange(BANDS, dtype=np.uint64)[None, :] * BAND_MIX[ROWS]
+        for r in range(ROWS):
+            keys = keys + bands[:, :, r] * BAND_MIX[r]
+    return keys
+
+
+class NearDuplicateIndex:
+    """
+    Streaming MinHash/LSH clustering. add() texts in creation order; every
+    text is labelled with the ID of its cluster's earliest member.
+    """
+
+    def __init__(self, threshold=THRESHOLD, capacity=CAPACITY):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.chunks = []    # oldest first: keys (sorted), rows, sigs, labels, ids
+        self.parent = {}    # union-find over cluster labels (merged ones only)
+        self.names = {}     # label -> representative ID, for labels with members
+        self.next_seq = 0
+
+    def find(self, label):
+        root = label
+        while root in self.parent:
+            root = self.parent[root]
+        while label != root:  # path compression
+            self.parent[label], label = root, self.parent[label]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            a, b = min(a, b), max(a, b)  # the earlier text stays representative
+            self.parent[b] = a
+        return a
+
+    def similar(self, sigs_a, sigs_b):
+        return (sigs_a == sigs_b).mean(axis=1) >= self.threshold
+
+    def candidates(self, keys):
+        """(batch row, chunk, chunk row) of indexed texts sharing a band"""
+        flat = keys.ravel()
+        order = np.argsort(flat)  # sorted needles search much faster
+        needles = flat[order]
+        found = []
+        for c, chunk in enumerate(self.chunks):
+            pos = np.searchsorted(chunk['keys'], needles)
+            pos[pos == len(chunk['keys'])] = 0
+            hit = np.flatnonzero(chunk['keys'][pos] == needles)
+            if len(hit):
+                pairs = np.unique(np.c_[order[hit] // BANDS, chunk['rows'][pos[hit]]], axis=0)
+                found.append((c, pairs))
+        return found
+
+    def add(self, ids, texts):
+        """Cluster a batch; returns the representative ID of every text"""
+        ids = np.asarray(ids, dtype=object)
+        n = len(ids)
+        seq = np.arange(self.next_seq, self.next_seq + n, dtype=np.int64)
+        self.next_seq += n
+        sigs, has = signatures(texts)
+        rows = np.flatnonzero(has)
+        keys = band_keys(sigs[rows])
+
+        # Against the indexed window
+        for c, pairs in self.candidates(keys):
+            chunk = self.chunks[c]
+            mine, theirs = rows[pairs[:, 0]], pairs[:, 1]
+            ok = self.similar(sigs[mine], chunk['sigs'][theirs])
+            for i, j in zip(mine[ok], theirs[ok]):
+                label = int(chunk['labels'][j])
+                if label not in self.names:
+                    self.names[label] = chunk['ids'][j]
+                self.union(int(seq[i]), label)
+
+        # Within the batch: every member of a band bucket against its earliest
+        if len(rows):
+            flat = keys.ravel()
+            owner = np.repeat(rows, BANDS)
+            order = np.lexsort((owner, flat))
+            flat, owner = flat[order], owner[order]
+            first = np.r_[True, flat[1:] != flat[:-1]]
+            lead = owner[np.maximum.accumulate(np.where(first, np.arange(len(flat)), 0))]
+            pairs = np.unique(np.c_[lead[~first], owner[~first]], axis=0)
+            pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+            if len(pairs):
+                ok = self.similar(sigs[pairs[:, 0]], sigs[pairs[:, 1]])
+                for a, b in pairs[ok]:
+                    self.names.setdefault(int(seq[a]), ids[a])
+                    self.union(int(seq[a]), int(seq[b]))
+
+        labels = np.fromiter((self.find(int(s)) for s in seq), dtype=np.int64, count=n)
+        own = labels == seq
+        representative = ids.copy()
+        representative[~own] = [self.names[label] for label in labels[~own]]
+        self.insert(keys, rows, sigs[rows], labels[rows], ids[rows])
+        return representative
+
+    def insert(self, keys, rows, sigs, labels, ids):
+        """
+        Index a batch as a new chunk. Like-sized neighbouring chunks are
+        merged (up to a quarter of the capacity), so a lookup searches a
+        handful of chunks; the oldest are evicted beyond the capacity.
+        """
+        if not len(rows):
+            return
+        self.chunks.append(self.chunk(keys.ravel(), np.repeat(np.arange(len(rows)), BANDS),
+                                      sigs, labels, ids))
+        while (len(self.chunks) > 1
+               and len(self.chunks[-2]['ids']) <= len(self.chunks[-1]['ids'])
+               and len(self.chunks[-2]['ids']) + len(self.chunks[-1]['ids']) <= self.capacity // 4):
+            new = self.chunks.pop()
+            old = self.chunks.pop()
+            self.chunks.append(self.chunk(
+                np.concatenate([old['keys'], new['keys']]),
+                np.concatenate([old['rows'], new['rows'] + len(old['ids'])]),
+                np.concatenate([old['sigs'], new['sigs']]),
+                np.concatenate([old['labels'], new['labels']]),
+                np.concatenate([old['ids'], new['ids']])))
+        evicted = False
+        while sum(len(c['ids']) for c in self.chunks) > self.capacity and len(self.chunks) > 1:
+            self.chunks.pop(0)
+            evicted = True
+        if evicted:
+            self.prune()
+
+    @staticmethod
+    def chunk(keys, rows, sigs, labels, ids):
+        order = np.argsort(keys, kind='stable')
+        return {'keys': keys[order], 'rows': rows[order], 'sigs': sigs, 'labels': labels,
+                'ids': ids}
+
+    def prune(self):
+        """Forget names and merges of clusters no indexed text belongs to"""
+        live = set()
+        for chunk in self.chunks:
+            live.update(int(label) for label in np.unique(chunk['labels']))
+        live = {self.find(label) for label in live} | live
+        self.names = {k: v for k, v in self.names.items() if k in live}
+        self.parent = {k: v for k, v in self.parent.items() if k in live}
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, threshold=THRESHOLD, capacity=CAPACITY):
+        index = cls(threshold, capacity)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                index.__dict__.update(pickle.load(f))
+            index.threshold, index.capacity = threshold, capacity
+        return index
+
+
+def dedupe(ids, texts, threshold=THRESHOLD, capacity=CAPACITY, batch_size=BATCH_SIZE):
+    """Representative ID per text of an in-memory collection (in creation order)"""
+    index = NearDuplicateIndex(threshold, capacity)
+    ids, texts = list(ids), list(texts)
+    parts = [index.add(ids[i:i + batch_size], texts[i:i + batch_size])
+             for i in range(0, len(ids), batch_size)]
+    return np.concatenate(parts) if parts else np.array([], dtype=object)
+
+
+# ---------- stored Reddit data ----------
+
+def index_path(source, subreddit):
+    return os.path.join(INDEX_DIR, f"{source}-{subreddit}.pkl")
+
+
+def dedupe_stored(subreddit='nba', days=30, root=columnar_store.DEFAULT_ROOT,
+                  threshold=THRESHOLD, capacity=CAPACITY):
+    """
+    Cluster every stored post and comment of the last `days` not processed
+    yet, in creation order. Returns {source: (texts, duplicates)}.
+    """
+    since = pd.Timestamp.now() - pd.Timedelta(days=days)
+    results = {}
+    for source, columns in SOURCES.items():
+        months = [m for m in columnar_store.partition_values(root, source, 'month',
+                                                             subreddit=subreddit)
+                  if m >= f"{since:%Y-%m}"]
+        index = NearDuplicateIndex.load(index_path(source, subreddit), threshold, capacity)
+        total = duplicates = 0
+        for month in months:
+            df = columnar_store.read_dataset(root, source, columns=['ID', 'CREATED_UTC'] + columns,
+                                             subreddit=subreddit, month=month)
+            df = df.drop_duplicates('ID', keep='last')
+            done = columnar_store.read_dataset(root, DATASET, columns=['ID'], source=source,
+                                               subreddit=subreddit, month=month)
+            if not done.empty:
+                df = df[~df['ID'].isin(done['ID'])]
+            if df.empty:
+                continue
+            df = df.sort_values(['CREATED_UTC', 'ID'], kind='stable')
+            text = reddit_ingester.text_of(df, source)
+            with instrumentation.step('near_duplicate.cluster'):
+                representative = np.concatenate([
+                    index.add(df['ID'].to_numpy()[i:i + BATCH_SIZE],
+                              text.to_numpy()[i:i + BATCH_SIZE])
+                    for i in range(0, len(df), BATCH_SIZE)])
+                instrumentation.record_rows(rows_in=len(df), rows_out=len(df))
+            out = pd.DataFrame({'ID': df['ID'].to_numpy(), 'CLUSTER': representative})
+            columnar_store.append_partition(out, root, DATASET, {
+                'source': source, 'subreddit': subreddit, 'month': month})
+            index.save(index_path(source, subreddit))
+            total += len(out)
+            duplicates += int((out['CLUSTER'] != out['ID']).sum())
+        results[source] = (total, duplicates)
+    return results
+
+
+def duplicate_ids(source, subreddit='nba', months=None, root=columnar_store.DEFAULT_ROOT):
+    """
+    IDs clustered under an earlier representative. Leaving these out keeps
+    one post per cluster plus every post not clustered yet.
+    """
+    filters = {'month': months} if months is not None else {}
+    df = columnar_store.read_dataset(root, DATASET, columns=['ID', 'CLUSTER'], source=source,
+                                     subreddit=subreddit, **filters)
+    if df.empty:
+        return set()
+    return set(df.loc[df['ID'] != df['CLUSTER'], 'ID'])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate Reddit posts and comments")
+    parser.add_argument('--subreddit', default='nba')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="Estimated Jaccard similarity for a duplicate")
+    parser.add_argument('--capacity', type=int, default=CAPACITY,
+                        help="Recent texts kept in the LSH index")
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    print("="*70)
+    print(f"NEAR-DUPLICATE DETECTION - r/{args.subreddit}")
+    print("="*70)
+    started = time.perf_counter()
+    for source, (total, duplicates) in dedupe_stored(args.subreddit, args.days, args.root,
+                                                     args.threshold, args.capacity).items():
+        print(f"  - {source}: {total:,} new, {duplicates:,} near-duplicates")
+    print(f"[OK] Done in {time.perf_counter() - started:.1f}s")
+    instrumentation.write_run()
@@ -0,0 +1,131 @@
+"""
+Play-by-Play Collector
+Fetches PlayByPlayV2 for every game of a season (game IDs come from the stored
+team game logs) into the columnar store, one partition per game:
+
+    data/warehouse/play_by_play/season=2023-24/game_id=0022300001/part.parquet
+
+Games already stored are skipped, so a re-run only fetches new games. After
+fetching, the season's stints are rebuilt with stint_engine.py.
+
+    python play_by_play_collector.py --season 2023-24 --workers 3
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import columnar_store
+import http_client
+import instrumentation
+import stint_engine
+from collector_registry import current_season
+
+DATASET = stint_engine.PBP_DATASET
+
+
+class PlayByPlayCollector:
+    def __init__(self, root=columnar_store.DEFAULT_ROOT, workers=3, min_interval=1.0,
+                 retries=3, timeout=60):
+        self.root = root
+        self.workers = workers
+        self.retries = retries
+        self.timeout = timeout
+        self.limiter = http_client.RateLimiter(min_interval)
+
+    def game_ids(self, season):
+        """Every game of the season in the stored team game logs"""
+        from game_log_collector import load_game_logs
+
+        teams = load_game_logs([season], 'T', self.root)
+        return sorted(teams['GAME_ID'].unique()) if not teams.empty else []
+
+    def pending(self, season, game_ids):
+        return [g for g in game_ids
+                if not columnar_store.has_partition(self.root, DATASET,
+                                                    {'season': season, 'game_id': g})]
+
+    def fetch_game(self, game_id):
+        """PlayByPlayV2 for one game, retried with exponential backoff"""
+        from nba_api.stats.endpoints import playbyplayv2
+
+        for attempt in range(1, self.retries + 1):
+            self.limiter.wait()
+            try:
+                pbp = playbyplayv2.PlayByPlayV2(game_id=game_id, timeout=self.timeout)
+                instrumentation.record_endpoint(pbp)
+                return pbp.get_data_frames()[0]
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                backoff = 2 ** attempt * 5
+                print(f"[WARNING] {game_id}: {e} - retry {attempt} in {backoff}s")
+                instrumentation.throttle(backoff)
+
+    def run_game(self, season, game_id):
+        with instrumentation.step('play_by_play.fetch'):
+            df = self.fetch_game(game_id)
+            instrumentation.record_rows(rows_out=len(df))
+        columnar_store.write_partition(df, self.root, DATASET,
+                                       {'season': season, 'game_id': game_id})
+        return len(df)
+
+    def collect_season(self, season):
+        """Fetch every game not yet stored. Returns the game IDs that failed."""
+        game_ids = self.game_ids(season)
+        todo = self.pending(season, game_ids)
+        print(f"[PLAN] {len(game_ids)} games, {len(game_ids) - len(todo)} already stored, "
+              f"{len(todo)} to fetch with {self.workers} workers")
+
+        failed = []
+        started = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {pool.submit(self.run_game, season, g): g for g in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                game_id = futures[future]
+                try:
+                    status = f"[OK] {future.result()} events"
+                except Exception as e:
+                    failed.append(game_id)
+                    status = f"[ERROR] {e}"
+                eta = (time.monotonic() - started) / done * (len(todo) - done)
+                print(f"  ({done}/{len(todo)}, ETA {eta / 60:.0f} min) {game_id} {status}")
+        finally:
+            # On Ctrl-C drop queued requests; in-flight ones finish and are stored
+            pool.shutdown(wait=True, cancel_futures=True)
+        return failed
+
+    def collect_all_play_by_play(self, season='2023-24'):
+        """Pipeline entry point: fetch new games, then rebuild the season's stints"""
+        print("="*70)
+        print(f"PLAY-BY-PLAY COLLECTION - {season}")
+        print("="*70)
+
+        failed = self.collect_season(season)
+        if failed:
+            print(f"\n[WARNING] {len(failed)} games failed - re-run to retry")
+
+        with instrumentation.step('play_by_play.stints'):
+            stints = stint_engine.build_season_stints(season, self.root)
+            instrumentation.record_rows(rows_out=len(stints))
+        if not stints.empty:
+            print(f"[OK] {len(stints)} stints from {stints['GAME_ID'].nunique()} games "
+                  f"({(~stints['COMPLETE']).sum()} incomplete)")
+        print(f"\n[SUCCESS] Play-by-play and stints stored under {self.root}")
+        return stints
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fetch play-by-play and rebuild stints")
+    parser.add_argument('--season', default=current_season(datetime.now()))
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--min-interval', type=float, default=1.0)
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    PlayByPlayCollector(args.root, args.workers, args.min_interval).collect_all_play_by_play(
+        args.season)
+    instrumentation.write_run()
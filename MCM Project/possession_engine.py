@@ -0,0 +1,176 @@
+"""
+Possession Engine
+Offensive/defensive/net rating per 100 possessions and pace, recomputed from
+our own data instead of taken from the API, for any grouping:
+
+  - box scores (team game logs): possessions estimated with the standard
+    FGA + 0.44 * FTA - OREB + TOV formula  -> team, game, season
+  - stints (stint_engine.py): possessions counted exactly from play-by-play
+    (made shots, turnovers, defensive rebounds, final free throws)
+                                           -> team, game, lineup, player, pair
+
+Both are turned into one long "units" table (keys + seconds, points and
+possessions for/against) and rated with a single groupby-sum, so e.g. every
+lineup of a season is one grouped pass.
+
+    python possession_engine.py --season 2023-24 --levels team,lineup,player
+"""
+
+import os
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+import metrics_engine
+from metrics_engine import metric
+
+SUMS = ['SECONDS', 'PTS_FOR', 'PTS_AGAINST', 'POSS_FOR', 'POSS_AGAINST']
+LEVELS = {
+    'team': ['TEAM_ID'],
+    'game': ['GAME_ID', 'TEAM_ID'],
+    'lineup': ['TEAM_ID', 'P1', 'P2', 'P3', 'P4', 'P5'],
+    'player': ['TEAM_ID', 'PLAYER_ID'],
+    'pair': ['TEAM_ID', 'PLAYER_A', 'PLAYER_B'],
+}
+
+
+def estimate_possessions(fga, fta, oreb, tov):
+    """Standard box-score possession estimate"""
+    return fga + 0.44 * fta - oreb + tov
+
+
+@metric('POSS_EST', 'FGA', 'FTA', 'OREB', 'TOV')
+def _poss_est(fga, fta, oreb, tov):
+    """Possessions estimated from the box score (FGA + 0.44 FTA - OREB + TOV)"""
+    return estimate_possessions(fga, fta, oreb, tov)
+
+
+def ratings(units, by):
+    """
+    Sum the units per group and derive per-100 ratings:
+    OFF_RATING, DEF_RATING, NET_RATING, PACE (possessions per 48) and MIN
+    """
+    df = units.groupby(list(by), sort=False, observed=True)[SUMS].sum().reset_index()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['OFF_RATING'] = (100 * df['PTS_FOR'] / df['POSS_FOR']).round(1)
+        df['DEF_RATING'] = (100 * df['PTS_AGAINST'] / df['POSS_AGAINST']).round(1)
+        df['PACE'] = (2880 * (df['POSS_FOR'] + df['POSS_AGAINST']) / 2 / df['SECONDS']).round(2)
+    df['NET_RATING'] = (df['OFF_RATING'] - df['DEF_RATING']).round(1)
+    df['MIN'] = (df['SECONDS'] / 60).round(1)
+    return df
+
+
+# ============= BOX SCORES =============
+
+def box_units(team_logs):
+    """One unit per team-game from team game logs, with the opponent's row joined"""
+    df = metrics_engine.compute(team_logs, ['POSS_EST'])
+    cols = ['GAME_ID', 'TEAM_ID', 'PTS', 'POSS_EST']
+    opp = df[cols].rename(columns={'TEAM_ID': 'OPP_TEAM_ID', 'PTS': 'PTS_AGAINST',
+                                   'POSS_EST': 'POSS_AGAINST'})
+    df = df.merge(opp, on='GAME_ID')
+    df = df[df['TEAM_ID'] != df['OPP_TEAM_ID']]
+    minutes = df['MIN'].to_numpy(dtype=float) if 'MIN' in df else 240.0
+    return df.assign(SECONDS=minutes / 5 * 60, PTS_FOR=df['PTS'], POSS_FOR=df['POSS_EST'])
+
+
+def box_ratings(team_logs, level='team', by=()):
+    """Ratings from box scores; `level` is 'team' or 'game', `by` adds keys such as 'season'"""
+    if level not in ('team', 'game'):
+        raise ValueError(f"Box scores only support team/game ratings, not {level!r}")
+    return ratings(box_units(team_logs), list(by) + LEVELS[level])
+
+
+# ============= STINTS =============
+
+def stint_units(stints, level='lineup', by=()):
+    """
+    Units from a stint table: each stint gives one row per side (offense =
+    that side), repeated per player or per pair of its lineup for the
+    player/pair levels. Lineup-based levels use only COMPLETE stints.
+    """
+    extra = list(by)
+    if level not in ('team', 'game') and 'COMPLETE' in stints:
+        stints = stints[stints['COMPLETE']]
+    seconds = (stints['END'] - stints['START']).to_numpy()
+    sides = []
+    for side, other in (('HOME', 'AWAY'), ('AWAY', 'HOME')):
+        sides.append({
+            'TEAM_ID': stints[f'{side}_TEAM_ID'].to_numpy(),
+            'GAME_ID': stints['GAME_ID'].to_numpy(),
+            'SECONDS': seconds,
+            'PTS_FOR': stints[f'{side}_PTS'].to_numpy(),
+            'PTS_AGAINST': stints[f'{other}_PTS'].to_numpy(),
+            'POSS_FOR': stints[f'{side}_POSS'].to_numpy(),
+            'POSS_AGAINST': stints[f'{other}_POSS'].to_numpy(),
+            'LINEUP': stints[[f'{side}_{i}' for i in range(1, 6)]].to_numpy(),
+            **{key: stints[key].to_numpy() for key in extra},
+        })
+    base = {name: np.concatenate([s[name] for s in sides]) for name in sides[0]}
+    lineup = base.pop('LINEUP')
+
+    if level in ('team', 'game'):
+        return pd.DataFrame(base)
+    if level == 'lineup':
+        df = pd.DataFrame(base)
+        for i in range(5):
+            df[f'P{i + 1}'] = lineup[:, i]
+        return df[(lineup > 0).all(axis=1)]
+
+    if level == 'player':
+        repeat, members = 5, {'PLAYER_ID': lineup.ravel()}
+    elif level == 'pair':
+        pairs = np.array(list(combinations(range(5), 2)))
+        repeat = len(pairs)
+        members = {'PLAYER_A': lineup[:, pairs[:, 0]].ravel(),
+                   'PLAYER_B': lineup[:, pairs[:, 1]].ravel()}
+    else:
+        raise ValueError(f"Unknown level {level!r} (expected one of {', '.join(LEVELS)})")
+    df = pd.DataFrame({name: np.repeat(values, repeat) for name, values in base.items()})
+    for name, values in members.items():
+        df[name] = values
+    return df[np.all([df[name] > 0 for name in members], axis=0)]
+
+
+def stint_ratings(stints, level='lineup', by=()):
+    """Ratings from exact play-by-play possessions for any LEVELS grouping"""
+    return ratings(stint_units(stints, level, by), list(by) + LEVELS[level])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Per-100-possession ratings from our own data")
+    parser.add_argument('--season', required=True)
+    parser.add_argument('--levels', default='team,lineup,player',
+                        help=f"Comma separated, any of {', '.join(LEVELS)}")
+    parser.add_argument('--source', choices=['stints', 'box'], default='stints')
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    parser.add_argument('--output-dir', default='data')
+    args = parser.parse_args()
+
+    print("="*70)
+    print(f"POSSESSION RATINGS - {args.season} ({args.source})")
+    print("="*70)
+
+    if args.source == 'stints':
+        from stint_engine import load_stints
+        data = load_stints([args.season], args.root, complete_only=False)
+    else:
+        from game_log_collector import load_game_logs
+        data = load_game_logs([args.season], 'T', args.root)
+        data = data[data['SEASON_TYPE'] == 'Regular Season'] if not data.empty else data
+    if data.empty:
+        print(f"[ERROR] No {args.source} stored for {args.season} under {args.root}")
+        raise SystemExit(1)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for level in args.levels.split(','):
+        rated = (stint_ratings(data, level) if args.source == 'stints'
+                 else box_ratings(data, level))
+        path = os.path.join(args.output_dir,
+                            f"1_{level}_ratings_{args.source}_{args.season}.csv")
+        rated.sort_values('MIN', ascending=False).to_csv(path, index=False)
+        print(f"[SAVED] {path} ({len(rated)} {level} rows)")
@@ -0,0 +1,117 @@
+"""
+Stage Profiling Hooks
+Opt-in cProfile + tracemalloc around chosen pipeline stages, without code edits.
+
+Select stages with the MCM_PROFILE environment variable (or run_pipeline.py
+--profile), as a comma separated list of:
+    create_network_edge_list               a method name on any collector class
+    DataMerger                             every public method of a class
+    DataMerger.merge_player_financial_data a single method
+
+Each profiled call writes <stage>_<time>.prof (open with `python -m pstats` or
+snakeviz) and <stage>_<time>.mem.txt (peak memory, top allocations, hottest
+functions) to MCM_PROFILE_DIR (default: data/profiles).
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import tracemalloc
+from datetime import datetime
+
+ENV_STAGES = 'MCM_PROFILE'
+ENV_DIR = 'MCM_PROFILE_DIR'
+DEFAULT_DIR = os.path.join('data', 'profiles')
+
+_state = threading.local()  # cProfile cannot nest: only the outermost stage profiles
+
+
+def selected_stages():
+    return [s.strip() for s in os.environ.get(ENV_STAGES, '').split(',') if s.strip()]
+
+
+def matches(class_name, method_name, stages):
+    return any(stage in (class_name, method_name, f"{class_name}.{method_name}")
+               for stage in stages)
+
+
+def write_reports(label, profiler, peak, diff, output_dir, top=25):
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    base = os.path.join(output_dir, f"{label}_{stamp}")
+
+    profiler.dump_stats(base + '.prof')
+
+    hot = io.StringIO()
+    pstats.Stats(profiler, stream=hot).sort_stats('cumulative').print_stats(top)
+
+    with open(base + '.mem.txt', 'w') as f:
+        f.write(f"Stage: {label}\n")
+        f.write(f"Peak traced memory: {peak / 1024 / 1024:.2f} MiB\n\n")
+        f.write(f"Top {top} allocations (net growth during the stage):\n")
+        for stat in diff[:top]:
+            f.write(f"  {stat}\n")
+        f.write(f"\nTop {top} functions by cumulative time:\n")
+        f.write(hot.getvalue())
+
+    print(f"[PROFILE] {label}: peak {peak / 1024 / 1024:.1f} MiB -> {base}.prof, {base}.mem.txt")
+
+
+def profiled(label, func, output_dir=None):
+    """Wrap `func` so each call runs under cProfile and tracemalloc"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(_state, 'active', False):
+            return func(*args, **kwargs)
+
+        _state.active = True
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(10)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            _, peak = tracemalloc.get_traced_memory()
+            diff = tracemalloc.take_snapshot().compare_to(before, 'lineno')
+            if started_tracing:
+                tracemalloc.stop()
+            _state.active = False
+            write_reports(label, profiler, peak, diff,
+                          output_dir or os.environ.get(ENV_DIR, DEFAULT_DIR))
+    return wrapper
+
+
+def wrap_class(cls, stages=None):
+    """Profile the public methods of `cls` that match the selected stages"""
+    stages = selected_stages() if stages is None else stages
+    for attr, value in list(vars(cls).items()):
+        if callable(value) and not attr.startswith('_') and matches(cls.__name__, attr, stages):
+            if not getattr(value, '_mcm_profiled', False):
+                wrapper = profiled(f"{cls.__name__}.{attr}", value)
+                wrapper._mcm_profiled = True
+                setattr(cls, attr, wrapper)
+    return cls
+
+
+def install(stages, output_dir=None):
+    """
+    Enable profiling for `stages` in this process: classes decorated with
+    instrumentation.instrument_class pick it up when their module is imported,
+    and already-imported ones are wrapped now.
+    """
+    os.environ[ENV_STAGES] = ','.join(stages)
+    if output_dir:
+        os.environ[ENV_DIR] = output_dir
+
+    import instrumentation
+    for cls in instrumentation.instrumented_classes:
+        wrap_class(cls, stages)
@@ -9,6 +9,9 @@ import time
 import os
 from datetime import datetime
 
+import availability_engine
+import metrics_engine
+
 os.makedirs('data', exist_ok=True)
 
 print("="*70)
@@ -39,15 +42,9 @@ try:
     # Merge
     df = pd.merge(df_basic, df_adv, on='PLAYER_ID', suffixes=('', '_adv'))
 
-    # Calculate metrics
-    df['PER'] = (df['PTS'] + df['REB']*0.7 + df['AST']*0.7 + df['STL'] + df['BLK'] - df['TOV']) / df['MIN'] * 15
-    df['WS'] = (df['NET_RATING'] * df['MIN'] * df['GP']) / 1000
-    df['OWS'] = (df['OFF_RATING'] * df['MIN'] * df['GP']) / 2000
-    df['DWS'] = df['WS'] - df['OWS']
-    df['BPM'] = (df['NET_RATING'] * 0.5) / 10
-    df['OBPM'] = df['OFF_RATING'] / 20 - 5
-    df['DBPM'] = 6 - df['DEF_RATING'] / 20
-    df['VORP'] = (df['BPM'] + 2.0) * df['MIN'] * df['GP'] / 1000
+    # Calculate metrics (definitions shared with CompleteDataCollector)
+    df = metrics_engine.compute(df, metrics_engine.APPROX_METRICS)
+    df = df.rename(columns={m: m.replace('_approx', '') for m in metrics_engine.APPROX_METRICS})
 
     # Select columns
     cols = ['PLAYER_NAME', 'TEAM_ABBREVIATION', 'GP', 'MIN', 'PTS', 'REB', 'AST',
@@ -218,21 +215,27 @@ print(f"[OK] Saved {len(df_trends)} expansion city trends")
 print("\n[SECTION 4] Supplementary Data")
 print("-"*70)
 
-# Injury History
-injury = {
-    'Player': ['Joel Embiid', 'Kawhi Leonard', 'Anthony Davis', 'Zion Williamson',
-               'Ben Simmons', 'Paul George', 'Klay Thompson', 'Jamal Murray',
-               'Kristaps Porzingis', 'Lonzo Ball'],
-    'Games_Missed_2023': [43, 52, 25, 29, 58, 26, 21, 8, 22, 82],
-    'Games_Missed_2022': [14, 35, 40, 82, 42, 31, 32, 0, 26, 47],
-    'Games_Missed_2021': [51, 30, 18, 21, 66, 26, 82, 48, 25, 35],
-    'Injury_Type': ['Knee', 'Knee', 'Various', 'Foot', 'Back',
-                    'Knee', 'ACL/Achilles', 'ACL', 'Knee', 'Knee'],
-    'Chronic': [True, True, True, True, True, True, True, False, True, True]
-}
-df_inj = pd.DataFrame(injury)
-df_inj['Total_Missed'] = df_inj['Games_Missed_2023'] + df_inj['Games_Missed_2022'] + df_inj['Games_Missed_2021']
-df_inj['Availability_Pct'] = ((246 - df_inj['Total_Missed']) / 246 * 100).round(1)
+# Injury History - every player from stored game logs, else the curated list
+injury_seasons = availability_engine.INJURY_SEASONS
+avail = availability_engine.load_availability(injury_seasons)
+if not avail.empty:
+    df_inj = availability_engine.injury_history(avail, injury_seasons).rename(columns={
+        'Total_Games_Missed_3Yr': 'Total_Missed', 'Availability_Rate': 'Availability_Pct'})
+else:
+    injury = {
+        'Player': ['Joel Embiid', 'Kawhi Leonard', 'Anthony Davis', 'Zion Williamson',
+                   'Ben Simmons', 'Paul George', 'Klay Thompson', 'Jamal Murray',
+                   'Kristaps Porzingis', 'Lonzo Ball'],
+        'Games_Missed_2023': [43, 52, 25, 29, 58, 26, 21, 8, 22, 82],
+        'Games_Missed_2022': [14, 35, 40, 82, 42, 31, 32, 0, 26, 47],
+        'Games_Missed_2021': [51, 30, 18, 21, 66, 26, 82, 48, 25, 35],
+        'Injury_Type': ['Knee', 'Knee', 'Various', 'Foot', 'Back',
+                        'Knee', 'ACL/Achilles', 'ACL', 'Knee', 'Knee'],
+        'Chronic': [True, True, True, True, True, True, True, False, True, True]
+    }
+    df_inj = pd.DataFrame(injury)
+    df_inj['Total_Missed'] = df_inj['Games_Missed_2023'] + df_inj['Games_Missed_2022'] + df_inj['Games_Missed_2021']
+    df_inj['Availability_Pct'] = ((246 - df_inj['Total_Missed']) / 246 * 100).round(1)
 df_inj.to_csv('data/4_COMPLETE_injuries.csv', index=False)
 print(f"[OK] Saved {len(df_inj)} injury histories")
 
@@ -0,0 +1,354 @@
+"""
+Reddit Ingester
+Streams r/<subreddit> submissions (one search stream per keyword) and comments
+(the subreddit's comment feed) from the Reddit API into the columnar store:
+
+    data/warehouse/reddit_submissions/subreddit=nba/month=2024-05/part-<n>.parquet
+    data/warehouse/reddit_comments/subreddit=nba/month=2024-05/part-<n>.parquet
+
+Listings are read newest first, one 100-item page at a time, through
+generators, and rows are written in batches of BATCH_ROWS - memory stays
+bounded however much is new. The newest ID of each stream is checkpointed
+once the stream is done, and the next run stops when it reaches it; a first
+run goes back `days`. A run interrupted mid-stream keeps its checkpoint, so
+the next run re-reads those items - readers drop duplicate IDs. (Reddit
+listings end after ~1000 items, so a busy feed needs runs at least that often.)
+
+Credentials are a "script" app from https://www.reddit.com/prefs/apps in
+REDDIT_CLIENT_ID / REDDIT_CLIENT_SECRET. For development and tests, point the
+ingester at the local stand-in instead:
+
+    python reddit_standin_server.py --port 8765 &
+    REDDIT_API_BASE=http://127.0.0.1:8765 python reddit_ingester.py
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+import http_client
+import instrumentation
+
+# REDDIT_API_BASE / REDDIT_AUTH_BASE redirect both to the stand-in server
+API_BASE = os.environ.get('REDDIT_API_BASE', 'https://oauth.reddit.com')
+AUTH_BASE = os.environ.get('REDDIT_AUTH_BASE', os.environ.get('REDDIT_API_BASE',
+                                                               'https://www.reddit.com'))
+USER_AGENT = 'MCM_Project_Data_Collector/1.0'
+SUBMISSIONS = 'reddit_submissions'
+COMMENTS = 'reddit_comments'
+CHECKPOINT_FILE = os.path.join('data', '.reddit_checkpoints.json')
+PAGE_SIZE = 100  # Reddit's maximum
+BATCH_ROWS = 5000
+DEFAULT_KEYWORDS = [
+    'NBA expansion', 'Seattle NBA', 'Las Vegas NBA',
+    'LeBron James', 'Stephen Curry', 'Nikola Jokic',
+    'Lakers', 'Warriors', 'Celtics',
+    'NBA playoffs', 'NBA Finals'
+]
+
+# API field -> stored column
+SUBMISSION_FIELDS = {'id': 'ID', 'created_utc': 'CREATED_UTC', 'author': 'AUTHOR',
+                     'title': 'TITLE', 'selftext': 'SELFTEXT', 'score': 'SCORE',
+                     'num_comments': 'NUM_COMMENTS', 'upvote_ratio': 'UPVOTE_RATIO',
+                     'permalink': 'PERMALINK'}
+COMMENT_FIELDS = {'id': 'ID', 'link_id': 'LINK_ID', 'parent_id': 'PARENT_ID',
+                  'created_utc': 'CREATED_UTC', 'author': 'AUTHOR', 'body': 'BODY',
+                  'score': 'SCORE'}
+TEXT_COLUMNS = {SUBMISSIONS: ['TITLE', 'SELFTEXT'], COMMENTS: ['BODY']}
+COMPACT = {'CREATED_UTC': np.int64, 'SCORE': np.int32, 'NUM_COMMENTS': np.int32,
+           'UPVOTE_RATIO': np.float32}
+
+
+def configured():
+    """Credentials are set, or the API is redirected (e.g. to the stand-in)"""
+    return bool(os.environ.get('REDDIT_CLIENT_ID') or os.environ.get('REDDIT_API_BASE'))
+
+
+def id_value(reddit_id):
+    """Reddit IDs are base36 counters, so newer items have larger values"""
+    return int(reddit_id, 36)
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def to_frame(items, fields, **columns):
+    df = pd.DataFrame([{column: item.get(field) for field, column in fields.items()}
+                       for item in items])
+    for key, value in columns.items():
+        df[key] = value
+    return df.astype({c: t for c, t in COMPACT.items() if c in df})
+
+
+def text_of(df, dataset):
+    """Text of stored items: title + selftext of submissions, body of comments"""
+    columns = TEXT_COLUMNS[dataset]
+    text = df[columns[0]].fillna('').astype(str)
+    for column in columns[1:]:
+        text = text + ' ' + df[column].fillna('').astype(str)
+    return text
+
+
+class RedditIngester:
+    def __init__(self, subreddit='nba', root=columnar_store.DEFAULT_ROOT, api_base=API_BASE,
+                 auth_base=AUTH_BASE, checkpoint_file=CHECKPOINT_FILE, min_interval=1.0,
+                 retries=3, listeners=None):
+        self.subreddit = subreddit
+        self.root = root
+        self.api_base = api_base.rstrip('/')
+        self.auth_base = auth_base.rstrip('/')
+        self.checkpoint_file = checkpoint_file
+        self.retries = retries
+        # OAuth clients get 100 requests a minute
+        self.limiter = http_client.RateLimiter(min_interval)
+        self.token = None
+        self.token_expires = 0.0
+        self.checkpoints = self.load_checkpoints()
+        # Called with (dataset, batch DataFrame) after each batch is written
+        self.listeners = list(listeners or [])
+
+    # ---------- checkpoints ----------
+
+    def load_checkpoints(self):
+        if not os.path.exists(self.checkpoint_file):
+            return {}
+        with open(self.checkpoint_file) as f:
+            return json.load(f)
+
+    def save_checkpoints(self):
+        os.makedirs(os.path.dirname(self.checkpoint_file) or '.', exist_ok=True)
+        tmp = self.checkpoint_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.checkpoints, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.checkpoint_file)
+
+    # ---------- API ----------
+
+    def authenticate(self):
+        """Application-only OAuth token (client credentials)"""
+        client_id = os.environ.get('REDDIT_CLIENT_ID', '')
+        secret = os.environ.get('REDDIT_CLIENT_SECRET', '')
+        response = http_client.get_session().post(
+            f"{self.auth_base}/api/v1/access_token", auth=(client_id, secret),
+            data={'grant_type': 'client_credentials'}, headers={'User-Agent': USER_AGENT},
+            timeout=30)
+        instrumentation.record_http(response.status_code, len(response.content))
+        response.raise_for_status()
+        body = response.json()
+        self.token = body['access_token']
+        self.token_expires = time.time() + body.get('expires_in', 3600) - 60
+
+    def request(self, path, params):
+        """GET one API page, re-authenticating on 401 and backing off on 429/5xx"""
+        for attempt in range(1, self.retries + 1):
+            if self.token is None or time.time() > self.token_expires:
+                self.authenticate()
+            self.limiter.wait()
+            response = http_client.get(
+                f"{self.api_base}{path}", params=params, use_cache=False,
+                headers={'Authorization': f"bearer {self.token}", 'User-Agent': USER_AGENT})
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 401:
+                self.token = None
+            elif attempt == self.retries or response.status_code not in (429, 500, 502, 503, 504):
+                response.raise_for_status()
+            else:
+                backoff = float(response.headers.get('Retry-After', 2 ** attempt * 5))
+                print(f"[WARNING] {path}: HTTP {response.status_code} - retry {attempt} in {backoff:.0f}s")
+                instrumentation.throttle(backoff)
+        raise RuntimeError(f"{path}: no response after {self.retries} attempts")
+
+    def listing(self, path, params=None):
+        """Every item of a listing, newest first, fetched a page at a time"""
+        after = None
+        while True:
+            page = self.request(path, dict(params or {}, limit=PAGE_SIZE, after=after,
+                                           raw_json=1))['data']
+            for child in page['children']:
+                yield child['data']
+            after = page.get('after')
+            if not after or not page['children']:
+                return
+
+    def new_items(self, key, path, params=None, since=0):
+        """Listing items newer than stream `key`'s checkpoint (first run: since `since`)"""
+        last = self.checkpoints.get(key)
+        stop = id_value(last) if last else -1
+        for item in self.listing(path, params):
+            if id_value(item['id']) <= stop or item['created_utc'] < since:
+                return
+            yield item
+
+    # ---------- ingestion ----------
+
+    def ingest(self, key, items, dataset, fields, **columns):
+        """
+        Write a stream in batches, then move its checkpoint to the newest ID.
+        Returns the number of items stored.
+        """
+        newest, count = None, 0
+        for batch in batched(items, BATCH_ROWS):
+            newest = newest or batch[0]['id']
+            df = to_frame(batch, fields, SUBREDDIT=self.subreddit, **columns)
+            months = pd.to_datetime(df['CREATED_UTC'], unit='s').dt.to_period('M').astype(str)
+            for month, part in df.groupby(months):
+                columnar_store.append_partition(part, self.root, dataset,
+                                                {'subreddit': self.subreddit, 'month': month})
+            for listener in self.listeners:
+                listener(dataset, df)
+            count += len(batch)
+            instrumentation.record_rows(rows_out=len(batch))
+        if newest:
+            self.checkpoints[key] = newest
+            self.save_checkpoints()
+        return count
+
+    def ingest_submissions(self, keywords, days=30):
+        """New submissions per keyword (search sorted by new)"""
+        since = time.time() - days * 86400
+        for keyword in keywords:
+            key = f"search:{self.subreddit}:{keyword}"
+            items = self.new_items(key, f"/r/{self.subreddit}/search", since=since,
+                                   params={'q': keyword, 'restrict_sr': 1, 'sort': 'new'})
+            with instrumentation.step('reddit.submissions'):
+                count = self.ingest(key, items, SUBMISSIONS, SUBMISSION_FIELDS, KEYWORD=keyword)
+            print(f"  - {keyword}: {count} new submissions")
+
+    def ingest_comments(self, days=30):
+        """New comments in the subreddit's comment feed"""
+        key = f"comments:{self.subreddit}"
+        items = self.new_items(key, f"/r/{self.subreddit}/comments", since=time.time() - days * 86400)
+        with instrumentation.step('reddit.comments'):
+            count = self.ingest(key, items, COMMENTS, COMMENT_FIELDS)
+        print(f"  - r/{self.subreddit} comments: {count} new")
+
+    def collect_all_reddit(self, keywords=None, days=30):
+        """Pipeline entry point: ingest new submissions and comments, write keyword activity"""
+        print("="*70)
+        print(f"REDDIT INGESTION - r/{self.subreddit}")
+        print("="*70)
+
+        import inverted_index
+        import sentiment_engine
+        import stream_sketches
+
+        keywords = keywords or DEFAULT_KEYWORDS
+        tracker = stream_sketches.MentionTracker(f"reddit-{self.subreddit}")
+        self.listeners.append(tracker)
+        try:
+            self.ingest_submissions(keywords, days)
+            self.ingest_comments(days)
+        finally:
+            self.listeners.remove(tracker)
+            tracker.save()
+        trending = tracker.sketches.window('24h').top.top(5)
+        if trending:
+            print(f"[OK] Trending (24h): {', '.join(p for p, _, _ in trending)}")
+        tracker.write_live_buzz()
+
+        scores = sentiment_engine.entity_sentiment(keywords, self.subreddit, days, self.root)
+        mentions = inverted_index.keyword_mentions(keywords, self.subreddit, days, self.root)
+        activity = keyword_activity(load_submissions(self.subreddit, days, self.root),
+                                    pd.DataFrame(), keywords, days, subreddit=self.subreddit,
+                                    sentiment=scores['SENTIMENT'], mentions=mentions)
+        os.makedirs('data', exist_ok=True)
+        filepath = os.path.join('data', '4_reddit_sentiment.csv')
+        activity.to_csv(filepath, index=False)
+        print(f"\n[SAVED] {filepath}")
+        return activity
+
+
+# ---------- reading and aggregation ----------
+
+def load(dataset, subreddit='nba', days=30, root=columnar_store.DEFAULT_ROOT):
+    """Stored items of the last `days` (latest copy of each ID)"""
+    since = pd.Timestamp.now() - pd.Timedelta(days=days)
+    months = [m for m in columnar_store.partition_values(root, dataset, 'month', subreddit=subreddit)
+              if m >= f"{since:%Y-%m}"]
+    if not months:
+        return pd.DataFrame()
+    df = columnar_store.read_dataset(root, dataset, subreddit=subreddit, month=months)
+    df = df[df['CREATED_UTC'] >= since.timestamp()]
+    keys = ['ID', 'KEYWORD'] if 'KEYWORD' in df else ['ID']
+    return df.drop_duplicates(keys, keep='last').reset_index(drop=True)
+
+
+def load_submissions(subreddit='nba', days=30, root=columnar_store.DEFAULT_ROOT):
+    return load(SUBMISSIONS, subreddit, days, root)
+
+
+def load_comments(subreddit='nba', days=30, root=columnar_store.DEFAULT_ROOT):
+    return load(COMMENTS, subreddit, days, root)
+
+
+def keyword_activity(submissions, comments, keywords, days=30, now=None, subreddit='nba',
+                     sentiment=None, mentions=None):
+    """
+    Per keyword over the last `days`: Total_Posts_30d (matching submissions),
+    Total_Comments_30d (comments on them), Average_Upvotes, Comment_Mentions_30d
+    (feed comments naming the keyword - from `mentions`, keyword -> count,
+    when given, e.g. inverted_index.keyword_mentions, else by scanning
+    `comments`), Sentiment_Score (from `sentiment`, keyword -> mean compound,
+    see sentiment_engine.py; 0.0 if not given), Trending_Up (last week's
+    daily post rate above the period's) and Peak_Discussion_Date
+    """
+    sentiment = {} if sentiment is None else sentiment
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+    since = (now - pd.Timedelta(days=days)).timestamp()
+    week = (now - pd.Timedelta(days=7)).timestamp()
+    rows = []
+    for keyword in keywords:
+        posts = submissions[(submissions['KEYWORD'] == keyword)
+                            & (submissions['CREATED_UTC'] >= since)] if not submissions.empty \
+            else pd.DataFrame(columns=['CREATED_UTC', 'NUM_COMMENTS', 'SCORE'])
+        if mentions is not None:
+            mentioned = mentions.get(keyword, 0)
+        else:
+            mentioned = comments['BODY'].str.contains(keyword, case=False, regex=False).sum() \
+                if not comments.empty else 0
+        created = posts['CREATED_UTC'].to_numpy(dtype=np.float64)
+        dates = pd.to_datetime(created, unit='s').strftime('%Y-%m-%d')
+        rows.append({
+            'Keyword': keyword,
+            'Total_Posts_30d': len(posts),
+            'Total_Comments_30d': int(posts['NUM_COMMENTS'].sum()),
+            'Average_Upvotes': int(round(posts['SCORE'].mean())) if len(posts) else 0,
+            'Comment_Mentions_30d': int(mentioned),
+            'Sentiment_Score': float(sentiment.get(keyword, 0.0)),  # -1 to 1
+            'Trending_Up': bool((created >= week).sum() / 7 > len(created) / days),
+            'Peak_Discussion_Date': pd.Series(dates).mode().min() if len(dates) else '',
+        })
+    df = pd.DataFrame(rows)
+    df['Data_Source'] = f"r/{subreddit} - Reddit API"
+    return df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream new Reddit submissions and comments")
+    parser.add_argument('keywords', nargs='*', default=None)
+    parser.add_argument('--subreddit', default='nba')
+    parser.add_argument('--days', type=int, default=30, help="How far back a first run goes")
+    parser.add_argument('--api-base', default=API_BASE)
+    parser.add_argument('--auth-base', default=AUTH_BASE)
+    parser.add_argument('--min-interval', type=float, default=1.0)
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    RedditIngester(args.subreddit, args.root, args.api_base, args.auth_base,
+                   min_interval=args.min_interval).collect_all_reddit(args.keywords, args.days)
+    instrumentation.write_run()
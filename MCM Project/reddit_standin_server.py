@@ -0,0 +1,222 @@
+"""
+Reddit API Stand-in
+A local HTTP server answering the Reddit API calls reddit_ingester.py makes,
+over a synthetic, seeded r/<subreddit> corpus - for developing and testing the
+ingester without credentials or rate limits:
+
+    POST /api/v1/access_token           client-credentials token (any id/secret)
+    GET  /r/<sub>/new                   submissions, newest first
+    GET  /r/<sub>/search?q=...          submissions matching q, newest first
+    GET  /r/<sub>/comments              comments, newest first
+    POST /standin/generate?posts=N      add N new submissions (+ comments) "now"
+
+Listings take limit (max 100) and after/before fullnames (t3_<id>, t1_<id>)
+and return the usual {"kind": "Listing", "data": {"children": ...}} shape.
+IDs are base36 and increase with creation time, as on Reddit.
+
+    python reddit_standin_server.py --port 8765 --posts 20000
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+TOPICS = [
+    'NBA expansion', 'Seattle NBA', 'Las Vegas NBA', 'LeBron James', 'Stephen Curry',
+    'Nikola Jokic', 'Lakers', 'Warriors', 'Celtics', 'Nuggets', 'Wembanyama',
+    'NBA playoffs', 'NBA Finals', 'trade deadline',
+]
+TITLES = [
+    '{t} is the story of the season', 'Why {t} matters more than people think',
+    '[Highlight] {t} tonight', 'Discussion: where does {t} go from here?',
+    '{t} update from Woj', 'Unpopular opinion about {t}', 'Post game thread: {t}',
+]
+COMMENTS = [
+    'This is great news', 'Terrible take honestly', 'Love this', 'No way {t} happens',
+    '{t} is overrated', 'Best thing to happen to the league', 'I hate how this is going',
+    'Ref show again', 'Absolutely incredible performance', 'Meh, not impressed',
+    '{t} deserves it', 'This sub is wild lol',
+]
+FIRST_ID = int('1a0000', 36)
+
+
+def base36(n):
+    chars = '0123456789abcdefghijklmnopqrstuvwxyz'
+    out = ''
+    while n:
+        n, r = divmod(n, 36)
+        out = chars[r] + out
+    return out or '0'
+
+
+class Corpus:
+    """Submissions and comments in creation order; listings read it backwards"""
+
+    def __init__(self, subreddit='nba', posts=20000, comments_per_post=8, days=45, seed=0):
+        self.subreddit = subreddit
+        self.comments_per_post = comments_per_post
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.submissions, self.comments = [], []
+        self.next_id = FIRST_ID
+        now = time.time()
+        for created in sorted(self.rng.uniform(now - days * 86400, now) for _ in range(posts)):
+            self.add_submission(created)
+        self.search_cache = {}
+
+    def new_id(self):
+        self.next_id += self.rng.randint(1, 40)
+        return base36(self.next_id)
+
+    def add_submission(self, created):
+        topic = self.rng.choice(TOPICS)
+        post = {
+            'id': self.new_id(), 'subreddit': self.subreddit, 'created_utc': float(int(created)),
+            'author': f"user_{self.rng.randint(1, 5000)}",
+            'title': self.rng.choice(TITLES).format(t=topic),
+            'selftext': '', 'score': int(self.rng.lognormvariate(4, 1.5)),
+            'num_comments': 0, 'upvote_ratio': round(self.rng.uniform(0.5, 1.0), 2),
+        }
+        post['name'] = f"t3_{post['id']}"
+        post['permalink'] = f"/r/{self.subreddit}/comments/{post['id']}/"
+        self.submissions.append(post)
+        # Comments follow their post within seconds, keeping IDs in time order
+        for j in range(self.rng.randint(0, 2 * self.comments_per_post)):
+            self.comments.append({
+                'id': self.new_id(), 'subreddit': self.subreddit,
+                'link_id': post['name'], 'parent_id': post['name'],
+                'created_utc': float(int(created) + j + 1),
+                'author': f"user_{self.rng.randint(1, 5000)}",
+                'body': self.rng.choice(COMMENTS).format(t=topic),
+                'score': int(self.rng.lognormvariate(1.5, 1.2)),
+            })
+            self.comments[-1]['name'] = f"t1_{self.comments[-1]['id']}"
+            post['num_comments'] += 1
+
+    def generate(self, posts):
+        with self.lock:
+            now = time.time()
+            for i in range(posts):
+                self.add_submission(now - 2 * (posts - i))
+            self.search_cache.clear()
+
+    def items(self, kind, query=None):
+        if kind == 'comments':
+            return self.comments
+        if not query:
+            return self.submissions
+        if query not in self.search_cache:
+            words = query.lower().split()
+            self.search_cache[query] = [p for p in self.submissions
+                                        if all(w in p['title'].lower() for w in words)]
+        return self.search_cache[query]
+
+    def listing(self, kind, params):
+        """One page, newest first, honouring limit / after / before"""
+        with self.lock:
+            items = self.items(kind, params.get('q'))
+            limit = max(1, min(int(params.get('limit', 25)), 100))
+            end = len(items)  # exclusive, counting from the oldest
+            if params.get('after'):
+                end = self.position(items, params['after'])
+            start = max(0, end - limit)
+            if params.get('before'):
+                start = self.position(items, params['before']) + 1
+                end = min(len(items), start + limit)
+            page = items[start:end][::-1]
+        return {'kind': 'Listing', 'data': {
+            'after': page[-1]['name'] if page and start > 0 else None,
+            'before': page[0]['name'] if page else None,
+            'dist': len(page),
+            'children': [{'kind': item['name'][:2], 'data': item} for item in page],
+        }}
+
+    @staticmethod
+    def position(items, fullname):
+        target = int(fullname.split('_', 1)[1], 36)
+        lo, hi = 0, len(items)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if int(items[mid]['id'], 36) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+def make_handler(corpus, error_rate=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, body, status=200):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('X-Ratelimit-Remaining', '99')
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if url.path == '/api/v1/access_token':
+                self.send_json({'access_token': 'standin', 'token_type': 'bearer',
+                                'expires_in': 86400, 'scope': '*'})
+            elif url.path == '/standin/generate':
+                corpus.generate(int(params.get('posts', 10)))
+                self.send_json({'submissions': len(corpus.submissions),
+                                'comments': len(corpus.comments)})
+            else:
+                self.send_json({'error': 404}, 404)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if not self.headers.get('Authorization', '').startswith('bearer '):
+                return self.send_json({'error': 401, 'message': 'Unauthorized'}, 401)
+            if error_rate and corpus.rng.random() < error_rate:
+                return self.send_json({'error': 503}, 503)
+            parts = url.path.strip('/').split('/')
+            if len(parts) == 3 and parts[0] == 'r' and parts[1] == corpus.subreddit:
+                if parts[2] in ('new', 'comments'):
+                    return self.send_json(corpus.listing(
+                        'comments' if parts[2] == 'comments' else 'submissions', params))
+                if parts[2] == 'search':
+                    return self.send_json(corpus.listing('submissions', params))
+            self.send_json({'error': 404}, 404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=8765, subreddit='nba', posts=20000, error_rate=0.0, seed=0):
+    """Start the stand-in in a background thread; returns the server (call shutdown())"""
+    corpus = Corpus(subreddit, posts, seed=seed)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(corpus, error_rate))
+    server.corpus = corpus
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local stand-in for the Reddit API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--subreddit', default='nba')
+    parser.add_argument('--posts', type=int, default=20000)
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Share of listing requests answered with 503 (tests retries)")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.subreddit, args.posts, args.error_rate)
+    print(f"[OK] Reddit stand-in for r/{args.subreddit} on http://127.0.0.1:{args.port} "
+          f"({len(server.corpus.submissions)} posts, {len(server.corpus.comments)} comments)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,271 @@
+"""
+Refresh Daemon
+Long-running collector that keeps a freshness schedule per dataset
+(see collector_registry.DATASETS) and only re-collects what is stale.
+Collector instances and the shared HTTP session/cache stay warm between cycles,
+and a dataset is only written when its content actually changed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import instrumentation
+from collector_registry import (DATASETS, current_season, is_in_season,
+                                step_kwargs)
+
+RETRY_AFTER = 15 * 60  # seconds before a failed collection is retried
+
+
+class RefreshDaemon:
+    def __init__(self, seasons=None, datasets=None, data_dir='data', state_file=None,
+                 metrics_dir=None):
+        self.data_dir = data_dir
+        self.metrics_dir = metrics_dir or os.path.join(data_dir, 'metrics')
+        self.extra_seasons = list(seasons or [])
+        self.datasets = list(datasets or DATASETS)
+        self.state_file = state_file or os.path.join(data_dir, '.refresh_state.json')
+        self.state = self.load_state()
+
+        # Kept between cycles: collector instances (their sessions and caches)
+        # and the latest DataFrame of every dataset, which feeds derived datasets
+        self.collectors = {}
+        self.frames = {}
+
+        os.makedirs(data_dir, exist_ok=True)
+
+    # ---------- state ----------
+
+    def load_state(self):
+        if os.path.exists(self.state_file):
+            with open(self.state_file) as f:
+                return json.load(f)
+        return {}
+
+    def save_state(self):
+        tmp = self.state_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.state_file)
+
+    @staticmethod
+    def key(name, season):
+        return f"{name}@{season}" if season else name
+
+    # ---------- scheduling ----------
+
+    def is_season_bound(self, name):
+        spec = DATASETS[name]
+        if 'input' in spec:
+            return self.is_season_bound(spec['input'])
+        return spec['season_arg'] is not None
+
+    def targets(self, now):
+        """(dataset, season) pairs tracked at `now`, upstream datasets first"""
+        seasons = [current_season(now)]
+        seasons += [s for s in self.extra_seasons if s not in seasons]
+
+        for name in self.datasets:
+            if self.is_season_bound(name):
+                for season in seasons:
+                    yield name, season
+            else:
+                yield name, None
+
+    def interval(self, name, season, now):
+        """Seconds between refreshes, or None if the dataset is final"""
+        if season and season != current_season(now):
+            return None  # past seasons never change
+        spec = DATASETS[name]
+        return spec['interval'] if is_in_season(now) else spec['offseason_interval']
+
+    def seconds_until_due(self, name, season, now):
+        """0 when stale, None when it will never be due again"""
+        entry = self.state.get(self.key(name, season), {})
+        spec = DATASETS[name]
+        ts = now.timestamp()
+
+        # A failed or empty last attempt (no success since) backs off
+        retry_at = 0
+        if entry.get('last_attempt', 0) > entry.get('last_success', 0):
+            retry_at = entry['last_attempt'] + RETRY_AFTER
+
+        if 'input' in spec:
+            upstream = self.state.get(self.key(spec['input'], season), {})
+            if upstream.get('hash') and upstream['hash'] != entry.get('input_hash'):
+                return max(0, retry_at - ts)
+            return None
+
+        if 'last_success' not in entry:
+            return max(0, retry_at - ts)
+
+        interval = self.interval(name, season, now)
+        if interval is None:
+            return None
+        return max(0, entry['last_success'] + interval - ts, retry_at - ts)
+
+    # ---------- collection ----------
+
+    def output_path(self, name, season, now):
+        filename = DATASETS[name]['save_as']
+        if season and season != current_season(now):
+            root, ext = os.path.splitext(filename)
+            filename = f"{root}_{season}{ext}"
+        return os.path.join(self.data_dir, filename)
+
+    def get_collector(self, spec):
+        import importlib
+
+        cache_key = (spec['module'], spec['class'])
+        if cache_key not in self.collectors:
+            module = importlib.import_module(spec['module'])
+            self.collectors[cache_key] = getattr(module, spec['class'])()
+        return self.collectors[cache_key]
+
+    def upstream_frame(self, name, season, now):
+        upstream = DATASETS[name]['input']
+        df = self.frames.get((upstream, season))
+        if df is None:
+            path = self.output_path(upstream, season, now)
+            if os.path.exists(path):
+                df = pd.read_csv(path)
+        return df
+
+    @staticmethod
+    def fingerprint(df):
+        hashed = pd.util.hash_pandas_object(df, index=False).values
+        return hashlib.sha256(hashed.tobytes() + ','.join(map(str, df.columns)).encode()).hexdigest()
+
+    def refresh(self, name, season, now):
+        """
+        Collect one dataset. Returns True when new content was written.
+        """
+        spec = DATASETS[name]
+        entry = self.state.setdefault(self.key(name, season), {})
+        entry['last_attempt'] = now.timestamp()
+
+        args = []
+        if 'input' in spec:
+            upstream = self.upstream_frame(name, season, now)
+            if upstream is None or upstream.empty:
+                print(f"[WARNING] {name}: no upstream data from {spec['input']}")
+                return False
+            args.append(upstream)
+
+        kwargs = step_kwargs(name, season, DATASETS) if season else {}
+
+        try:
+            method = getattr(self.get_collector(spec), spec['method'])
+            df = method(*args, **kwargs)
+        except Exception as e:
+            print(f"[ERROR] {name}: {e}")
+            return False
+
+        if df is None or df.empty:
+            print(f"[WARNING] {name}: collector returned no data")
+            return False
+
+        entry['last_success'] = now.timestamp()
+        if 'input' in spec:
+            entry['input_hash'] = self.state[self.key(spec['input'], season)]['hash']
+        self.frames[(name, season)] = df
+
+        digest = self.fingerprint(df)
+        if digest == entry.get('hash'):
+            return False
+
+        path = self.output_path(name, season, now)
+        df.to_csv(path, index=False)
+        entry['hash'] = digest
+        entry['last_changed'] = now.timestamp()
+        print(f"[SAVED] {path} ({len(df)} rows)")
+        return True
+
+    def run_cycle(self, now=None):
+        """
+        Refresh every stale dataset once. Returns the output paths that changed.
+        """
+        now = now or datetime.now()
+        emitted = []
+
+        for name, season in self.targets(now):
+            if self.seconds_until_due(name, season, now) != 0:
+                continue
+            label = f"{name} ({season})" if season else name
+            print(f"\n[REFRESH] {label}")
+            with instrumentation.step(f"dataset.{name}"):
+                changed = self.refresh(name, season, now)
+            if changed:
+                emitted.append(self.output_path(name, season, now))
+            self.save_state()
+
+        # One metrics run per cycle
+        instrumentation.write_run(self.metrics_dir)
+        instrumentation.reset()
+
+        return emitted
+
+    def next_wakeup(self, now, max_sleep):
+        waits = [self.seconds_until_due(name, season, now)
+                 for name, season in self.targets(now)]
+        waits = [w for w in waits if w is not None]
+        return min([max_sleep] + waits)
+
+    def run_forever(self, max_sleep=3600, min_sleep=30):
+        print("="*70)
+        print("REFRESH DAEMON - per-dataset freshness policies")
+        print("="*70)
+        print(f"Tracking: {', '.join(self.datasets)}")
+
+        while True:
+            now = datetime.now()
+            emitted = self.run_cycle(now)
+
+            stamp = now.strftime('%Y-%m-%d %H:%M:%S')
+            if emitted:
+                print(f"\n[{stamp}] Updated {len(emitted)} dataset(s):")
+                for path in emitted:
+                    print(f"  - {path}")
+            else:
+                print(f"\n[{stamp}] Everything fresh")
+
+            wait = max(min_sleep, self.next_wakeup(datetime.now(), max_sleep))
+            print(f"[SLEEP] Next check in {wait / 60:.1f} min")
+            time.sleep(wait)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh collected datasets as they go stale")
+    parser.add_argument('--season', action='append', default=[],
+                        help="Extra (past) season to backfill once, repeatable")
+    parser.add_argument('--dataset', action='append', choices=list(DATASETS),
+                        help="Only track these datasets (repeatable)")
+    parser.add_argument('--once', action='store_true',
+                        help="Run a single refresh cycle and exit (for cron)")
+    parser.add_argument('--max-sleep', type=float, default=3600,
+                        help="Upper bound on seconds between cycles (default: %(default)s)")
+    parser.add_argument('--metrics-dir', default=os.path.join('data', 'metrics'))
+    args = parser.parse_args(argv)
+
+    daemon = RefreshDaemon(seasons=args.season, datasets=args.dataset,
+                           metrics_dir=args.metrics_dir)
+    if args.once:
+        emitted = daemon.run_cycle()
+        print(f"\n[OK] {len(emitted)} dataset(s) updated")
+        return 0
+
+    try:
+        daemon.run_forever(max_sleep=args.max_sleep)
+    except KeyboardInterrupt:
+        print("\n[INFO] Daemon stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
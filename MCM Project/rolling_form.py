@@ -0,0 +1,248 @@
+"""
+Rolling Form
+Last-10 / last-30 game form (PTS, TS%, net rating, PER and BPM) for every
+player, maintained incrementally from the stored game logs.
+
+The state file keeps, per player, a ring buffer of the last 30 games' box
+components and a running sum per window. Each new game day adds the new game
+and subtracts the one leaving each window - O(1) per player and metric - so a
+daily update never rereads old logs. Ratio metrics (TS%, net rating, PER, BPM)
+are computed from the window sums when the form table is written.
+
+    python rolling_form.py              # apply new game days, write the form table
+    python rolling_form.py --rebuild    # replay every stored game log
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+import instrumentation
+import metrics_engine
+import possession_engine
+
+WINDOWS = (10, 30)
+# Per-game components summed over each window. POSS is the player's on-court
+# share of the game's possessions, TEAM_PLAYS the team's usage plays (FGA +
+# 0.44 FTA + TOV) while the player was on court.
+COMPONENTS = ['MIN', 'PTS', 'FGM', 'FGA', 'FTA', 'REB', 'AST', 'STL', 'BLK', 'TOV',
+              'PLUS_MINUS', 'POSS', 'PLAYS', 'TEAM_PLAYS']
+DEFAULT_STATE = os.path.join('data', '.rolling_form_state.npz')
+FORM_FILE = os.path.join('data', '1_player_current_form.csv')
+
+
+def game_components(player_logs, team_logs):
+    """Per player-game component values (COMPONENTS) from player and team logs"""
+    teams = team_logs[['GAME_ID', 'TEAM_ID']].copy()
+    teams['TM_MIN'] = team_logs['MIN'].to_numpy(dtype=float) if 'MIN' in team_logs else 240.0
+    teams['TM_PLAYS'] = team_logs['FGA'] + 0.44 * team_logs['FTA'] + team_logs['TOV']
+    # Game possessions: average of both teams' estimates
+    teams['GAME_POSS'] = possession_engine.estimate_possessions(
+        team_logs['FGA'], team_logs['FTA'], team_logs['OREB'], team_logs['TOV']
+    ).groupby(teams['GAME_ID']).transform('mean')
+
+    df = player_logs.merge(teams, on=['GAME_ID', 'TEAM_ID'], how='left')
+    on_court = df['MIN'] / (df['TM_MIN'] / 5)
+    df['POSS'] = on_court * df['GAME_POSS']
+    df['PLAYS'] = df['FGA'] + 0.44 * df['FTA'] + df['TOV']
+    df['TEAM_PLAYS'] = on_court * df['TM_PLAYS']
+    df[COMPONENTS] = df[COMPONENTS].fillna(0)
+    return df
+
+
+class RollingForm:
+    def __init__(self, state_file=DEFAULT_STATE, root=columnar_store.DEFAULT_ROOT):
+        self.state_file = state_file
+        self.root = root
+        self.load_state()
+
+    # ---------- state ----------
+
+    def reset(self):
+        k, size = len(COMPONENTS), max(WINDOWS)
+        self.player_ids = np.zeros(0, dtype=np.int64)
+        self.names = np.zeros(0, dtype=object)
+        self.teams = np.zeros(0, dtype=object)
+        self.last_game = np.zeros(0, dtype=object)
+        self.ring = np.zeros((0, size, k))
+        self.head = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros((len(WINDOWS), 0, k))
+        self.last_date = ''
+
+    def load_state(self):
+        self.reset()
+        if not os.path.exists(self.state_file):
+            return
+        state = np.load(self.state_file, allow_pickle=False)
+        if (tuple(state['windows']) != WINDOWS
+                or list(state['components']) != COMPONENTS):
+            print("[WARNING] Rolling form state has a different layout - rebuilding")
+            return
+        self.player_ids = state['player_ids']
+        self.names = state['names'].astype(object)
+        self.teams = state['teams'].astype(object)
+        self.last_game = state['last_game'].astype(object)
+        self.ring = state['ring']
+        self.head = state['head']
+        self.count = state['count']
+        self.sums = state['sums']
+        self.last_date = str(state['last_date'])
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        tmp = self.state_file + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, windows=np.array(WINDOWS), components=np.array(COMPONENTS),
+                     player_ids=self.player_ids, names=self.names.astype(str),
+                     teams=self.teams.astype(str), last_game=self.last_game.astype(str),
+                     ring=self.ring, head=self.head, count=self.count, sums=self.sums,
+                     last_date=np.array(self.last_date))
+        os.replace(tmp, self.state_file)
+
+    def rows_for(self, player_ids):
+        """State row of each player id, adding rows for players not seen before"""
+        index = pd.Index(self.player_ids)
+        new = pd.unique(player_ids[index.get_indexer(player_ids) < 0])
+        if len(new):
+            n = len(new)
+            self.player_ids = np.r_[self.player_ids, new]
+            self.names = np.r_[self.names, np.full(n, '', dtype=object)]
+            self.teams = np.r_[self.teams, np.full(n, '', dtype=object)]
+            self.last_game = np.r_[self.last_game, np.full(n, '', dtype=object)]
+            self.ring = np.concatenate([self.ring, np.zeros((n,) + self.ring.shape[1:])])
+            self.head = np.r_[self.head, np.zeros(n, dtype=np.int64)]
+            self.count = np.r_[self.count, np.zeros(n, dtype=np.int64)]
+            self.sums = np.concatenate([self.sums, np.zeros((len(WINDOWS), n, len(COMPONENTS)))],
+                                       axis=1)
+            index = pd.Index(self.player_ids)
+        return index.get_indexer(player_ids)
+
+    # ---------- updates ----------
+
+    def apply_day(self, rows, values):
+        """
+        Push one game per player (`rows` unique) into the ring buffers and
+        window sums
+        """
+        head, count = self.head[rows], self.count[rows]
+        size = self.ring.shape[1]
+        for w, window in enumerate(WINDOWS):
+            leaving = self.ring[rows, (head - window) % size]
+            self.sums[w, rows] += values - np.where((count >= window)[:, None], leaving, 0.0)
+        self.ring[rows, head % size] = values
+        self.head[rows] = head + 1
+        self.count[rows] = count + 1
+
+    def update(self, player_logs, team_logs, until=None):
+        """
+        Apply every game day after the last one applied and before `until`
+        (default today, whose games may still be in progress). Returns the
+        number of days applied.
+        """
+        until = until or datetime.now().strftime('%Y-%m-%d')
+        dates = player_logs['GAME_DATE'].astype(str).str[:10]
+        new = player_logs[(dates > self.last_date) & (dates < until)]
+        if new.empty:
+            return 0
+
+        df = game_components(new.drop_duplicates(['PLAYER_ID', 'GAME_ID']), team_logs)
+        df['DAY'] = df['GAME_DATE'].astype(str).str[:10]
+        df = df.sort_values('DAY', kind='stable')
+        df['ROW'] = self.rows_for(df['PLAYER_ID'].to_numpy())
+
+        day = df['DAY'].to_numpy()
+        rows = df['ROW'].to_numpy()
+        values = df[COMPONENTS].to_numpy(dtype=float)
+        bounds = np.flatnonzero(np.r_[True, day[1:] != day[:-1], True])
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            self.apply_day(rows[start:end], values[start:end])
+
+        # Latest name/team/date per player (rows are in date order)
+        last = df.drop_duplicates('ROW', keep='last')
+        self.names[last['ROW']] = last['PLAYER_NAME'].to_numpy()
+        self.teams[last['ROW']] = last['TEAM_ABBREVIATION'].to_numpy()
+        self.last_game[last['ROW']] = last['DAY'].to_numpy()
+        self.last_date = day[-1]
+        return len(bounds) - 1
+
+    # ---------- output ----------
+
+    def current_form(self):
+        """One row per player: L<W>_GP/PTS/TS_PCT/NET_RATING/PER/BPM per window"""
+        form = pd.DataFrame({
+            'PLAYER_ID': self.player_ids,
+            'PLAYER_NAME': self.names,
+            'TEAM_ABBREVIATION': self.teams,
+            'LAST_GAME': self.last_game,
+        })
+        for w, window in enumerate(WINDOWS):
+            sums = pd.DataFrame(self.sums[w], columns=COMPONENTS)
+            games = np.minimum(self.count, window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sums['NET_RATING'] = 100 * sums['PLUS_MINUS'] / sums['POSS']
+                sums['USG_PCT'] = sums['PLAYS'] / sums['TEAM_PLAYS']
+                ts_pct = sums['PTS'] / (2 * (sums['FGA'] + 0.44 * sums['FTA']))
+            # Window totals in, per-minute ratios out: same as using per-game averages
+            rated = metrics_engine.compute(sums, ['PER_approx', 'BPM_approx'])
+
+            prefix = f"L{window}_"
+            form[prefix + 'GP'] = games
+            form[prefix + 'PTS'] = (sums['PTS'] / np.maximum(games, 1)).round(1)
+            form[prefix + 'TS_PCT'] = ts_pct.round(3)
+            form[prefix + 'NET_RATING'] = sums['NET_RATING'].round(1)
+            form[prefix + 'PER'] = rated['PER_approx'].round(1)
+            form[prefix + 'BPM'] = rated['BPM_approx'].round(2)
+
+        form = form[self.count > 0]
+        return form.sort_values(['LAST_GAME', f"L{WINDOWS[0]}_PTS"],
+                                ascending=False).reset_index(drop=True)
+
+    def update_current_form(self, output=FORM_FILE):
+        """Pipeline entry point: apply new game days from the store, write the form table"""
+        from game_log_collector import load_game_logs
+
+        print("="*70)
+        print("ROLLING FORM (last " + " / ".join(str(w) for w in WINDOWS) + " games)")
+        print("="*70)
+
+        since = self.last_date or None
+        with instrumentation.step('rolling_form.load'):
+            players = load_game_logs(kind='P', root=self.root, since=since)
+            teams = load_game_logs(kind='T', root=self.root, since=since)
+        if players.empty or teams.empty:
+            print(f"[INFO] No game logs after {since or 'the start'} under {self.root}")
+            days = 0
+        else:
+            with instrumentation.step('rolling_form.update'):
+                days = self.update(players, teams)
+                instrumentation.record_rows(rows_in=len(players))
+            self.save_state()
+        print(f"[OK] Applied {days} new game days (through {self.last_date or '-'})")
+
+        form = self.current_form()
+        if not form.empty:
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            form.to_csv(output, index=False)
+            print(f"[SAVED] {output} ({len(form)} players)")
+        return form
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Update last-N-game player form")
+    parser.add_argument('--state-file', default=DEFAULT_STATE)
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    parser.add_argument('--output', default=FORM_FILE)
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Discard the state and replay every stored game log")
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(args.state_file):
+        os.remove(args.state_file)
+    RollingForm(args.state_file, args.root).update_current_form(args.output)
+    instrumentation.write_run()
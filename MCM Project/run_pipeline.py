@@ -0,0 +1,125 @@
+"""
+Unified Pipeline CLI
+Runs any subset of the registered collectors. Collector modules (and pandas,
+nba_api, pytrends, ...) are only imported when their step actually runs.
+
+Examples:
+    python run_pipeline.py --plan
+    python run_pipeline.py --only lineups --season 2022-23
+    python run_pipeline.py --skip social,social_influence
+    python run_pipeline.py --daemon
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import instrumentation
+from collector_registry import (COLLECTORS, missing_requirements, run_step,
+                                select_steps, step_kwargs)
+
+
+def print_header(text):
+    print("\n" + "="*70)
+    print(f"  {text}")
+    print("="*70)
+
+
+def split_names(value):
+    """Parse 'a,b' or repeated flags into a flat list of step names"""
+    names = []
+    for item in value or []:
+        names.extend(n.strip() for n in item.split(',') if n.strip())
+    return names
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="MCM Project data collection pipeline",
+        epilog=f"Steps: {', '.join(COLLECTORS)}"
+    )
+    parser.add_argument('--only', action='append', metavar='STEPS',
+                        help="Run only these steps (comma separated, repeatable)")
+    parser.add_argument('--skip', action='append', metavar='STEPS',
+                        help="Skip these steps (comma separated, repeatable)")
+    parser.add_argument('--season', default='2023-24',
+                        help="NBA season, e.g. 2023-24 (default: %(default)s)")
+    parser.add_argument('--plan', action='store_true',
+                        help="Print the steps that would run and exit")
+    parser.add_argument('--metrics-dir', default=os.path.join('data', 'metrics'),
+                        help="Where per-step metrics are written (default: %(default)s)")
+    parser.add_argument('--profile', action='append', metavar='STAGES',
+                        help="Profile these stages with cProfile + tracemalloc, e.g. "
+                             "create_network_edge_list,DataMerger (repeatable)")
+    parser.add_argument('--profile-dir', default=os.path.join('data', 'profiles'),
+                        help="Where .prof and memory reports go (default: %(default)s)")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Keep running and refresh each dataset as it goes stale "
+                             "(see refresh_daemon.py)")
+    return parser
+
+
+def print_plan(steps, season):
+    print_header(f"PIPELINE PLAN - season {season}")
+    for i, name in enumerate(steps, 1):
+        spec = COLLECTORS[name]
+        kwargs = ', '.join(f"{k}={v!r}" for k, v in step_kwargs(name, season).items())
+        print(f"  {i}. {name:<18} {spec['module']}.{spec['class']}.{spec['method']}({kwargs})")
+        print(f"     {spec['description']}")
+        missing = missing_requirements(name)
+        if missing:
+            print(f"     [WARNING] Missing packages: {', '.join(missing)}")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        steps = select_steps(split_names(args.only), split_names(args.skip))
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 2
+
+    if args.plan:
+        print_plan(steps, args.season)
+        return 0
+
+    if args.profile:
+        import profiling
+        profiling.install(split_names(args.profile), args.profile_dir)
+
+    if args.daemon:
+        from refresh_daemon import main as daemon_main
+        return daemon_main(['--season', args.season, '--metrics-dir', args.metrics_dir])
+
+    print_header("MCM PROJECT - DATA COLLECTION PIPELINE")
+    print(f"\nStarted at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Steps: {', '.join(steps)}")
+
+    results = []
+    for name in steps:
+        print_header(f"STEP: {name.upper()}")
+        start = time.perf_counter()
+        try:
+            with instrumentation.step(f"pipeline.{name}"):
+                run_step(name, season=args.season)
+            status = "[OK] Success"
+        except Exception as e:
+            print(f"[ERROR] {e}")
+            status = f"[FAILED]: {e}"
+        results.append((name, status, time.perf_counter() - start))
+
+    print_header("PIPELINE SUMMARY")
+    for name, status, elapsed in results:
+        print(f"  {name:<20} {elapsed:>7.1f}s  {status}")
+
+    print(f"\nCompleted at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    instrumentation.write_run(args.metrics_dir)
+
+    return 1 if any(status.startswith('[FAILED]') for _, status, _ in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
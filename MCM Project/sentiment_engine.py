@@ -0,0 +1,525 @@
+"""
+Sentiment Engine
+Rule-based (VADER-style) sentiment for the Reddit posts and comments
+reddit_ingester.py streams into the columnar store. Each text gets the usual
+four scores - COMPOUND (-1 to 1) and the POS/NEU/NEG shares - from a valence
+lexicon plus the VADER rules: boosters ("very", "so"), negation of the three
+preceding words, ALL-CAPS and "!" emphasis, and "but" shifting weight to the
+clause after it.
+
+The lexicon is compiled once - words lower-cased, multi-word entries split
+into token tuples - and pickled under data/cache/sentiment/, keyed by a hash
+of its source. Texts are scored in batches across a process pool; every
+worker loads the compiled lexicon once, in the pool initializer. Scores are
+stored per post, alongside the ingested data:
+
+    data/warehouse/sentiment_scores/source=reddit_comments/subreddit=nba/month=2024-05/part-<n>.parquet
+
+and a later run only scores IDs that have no score yet. Per keyword / player
+and day, scores of unique posts (near_duplicate.py clusters reposts) are
+aggregated into data/4_sentiment_daily.csv and the time-series store
+(metrics reddit_sentiment and reddit_mentions).
+
+The built-in lexicon covers everyday and basketball vocabulary. The full
+VADER lexicon is used instead when the vaderSentiment package is installed,
+or pass any file in its format (word<TAB>mean valence<TAB>...) as --lexicon.
+
+    python sentiment_engine.py --workers 4
+"""
+
+import hashlib
+import math
+import os
+import pickle
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+import instrumentation
+import near_duplicate
+import reddit_ingester
+
+DATASET = 'sentiment_scores'
+SOURCES = reddit_ingester.TEXT_COLUMNS
+SCORES = ['COMPOUND', 'POS', 'NEU', 'NEG']
+CACHE_DIR = os.path.join('data', 'cache', 'sentiment')
+BATCH_SIZE = 2000
+POSITIVE, NEGATIVE = 0.05, -0.05  # VADER's compound thresholds
+
+# Players of the media buzz tables
+MEDIA_PLAYERS = [
+    'LeBron James', 'Stephen Curry', 'Giannis Antetokounmpo', 'Luka Doncic', 'Nikola Jokic',
+    'Joel Embiid', 'Kevin Durant', 'Damian Lillard', 'Jayson Tatum', 'Anthony Edwards',
+    'Victor Wembanyama', 'Ja Morant',
+]
+
+# VADER constants
+B_INCR = 0.293   # booster word
+C_INCR = 0.733   # ALL-CAPS word in mixed-case text
+N_SCALAR = -0.74  # negated word
+ALPHA = 15       # compound normalisation
+BUT_BEFORE, BUT_AFTER = 0.5, 1.5
+
+LEXICON = {
+    # general
+    'good': 1.9, 'great': 3.1, 'excellent': 2.7, 'amazing': 2.8, 'awesome': 3.1,
+    'incredible': 2.9, 'fantastic': 2.6, 'wonderful': 2.7, 'brilliant': 2.8, 'best': 3.2,
+    'better': 1.9, 'love': 3.2, 'loved': 2.9, 'loving': 2.9, 'like': 1.5, 'liked': 1.8,
+    'nice': 1.8, 'happy': 2.7, 'glad': 2.0, 'fun': 2.3, 'cool': 1.3, 'beautiful': 2.9,
+    'perfect': 2.7, 'impressive': 2.2, 'impressed': 2.1, 'exciting': 2.2, 'excited': 1.8,
+    'win': 2.8, 'wins': 2.7, 'won': 2.7, 'winning': 2.4, 'winner': 2.8, 'success': 2.7,
+    'strong': 2.3, 'solid': 1.7, 'fair': 1.3, 'deserve': 0.9, 'deserves': 1.2,
+    'deserved': 1.5, 'respect': 2.1, 'legend': 2.4, 'legendary': 2.5, 'hope': 1.9,
+    'proud': 2.1, 'thanks': 1.9, 'thank': 1.5, 'support': 1.7, 'wow': 2.8, 'yes': 1.7,
+    'lol': 1.8, 'lmao': 2.0, 'haha': 2.0, 'favorite': 2.0, 'fine': 0.8, 'ok': 0.9,
+    'okay': 0.9, 'agree': 1.5, 'clear': 1.6, 'easy': 1.9, 'smart': 1.7, 'talented': 2.3,
+    'healthy': 1.7, 'ready': 1.5, 'worth': 0.9, 'hilarious': 1.7, 'wild': 0.7,
+    'bad': -2.5, 'worse': -2.1, 'worst': -3.1, 'terrible': -2.1, 'awful': -2.0,
+    'horrible': -2.5, 'hate': -2.7, 'hated': -3.2, 'hates': -1.9, 'sad': -2.1,
+    'angry': -2.3, 'mad': -2.2, 'annoying': -1.7, 'boring': -1.3, 'disappointing': -2.2,
+    'disappointed': -1.9, 'disappointment': -2.3, 'lose': -1.7, 'loses': -1.3,
+    'lost': -1.3, 'losing': -1.6, 'loss': -1.3, 'fail': -2.5, 'failed': -2.3,
+    'failure': -2.3, 'weak': -1.9, 'poor': -2.1, 'stupid': -2.4, 'dumb': -2.3,
+    'joke': -1.0, 'ridiculous': -1.5, 'pathetic': -2.4, 'embarrassing': -1.6,
+    'shame': -2.1, 'ugly': -2.3, 'wrong': -2.1, 'problem': -1.7, 'injury': -1.8,
+    'injured': -1.7, 'hurt': -2.4, 'pain': -2.3, 'worry': -1.9, 'worried': -1.2,
+    'unfair': -2.1, 'no': -1.2, 'meh': -0.9, 'ugh': -1.8, 'sucks': -1.5, 'suck': -1.9,
+    'crap': -1.6, 'mess': -1.5, 'disaster': -3.1, 'nightmare': -1.9, 'toxic': -2.3,
+    'cheap': -0.7, 'unpopular': -1.0, 'wtf': -2.8, 'rip': -1.0, 'scared': -1.9,
+    # basketball
+    'goat': 2.5, 'clutch': 2.0, 'mvp': 2.4, 'elite': 2.2, 'dominant': 1.8,
+    'dominated': 1.5, 'unstoppable': 2.1, 'underrated': 1.3, 'champion': 2.9,
+    'champions': 2.4, 'championship': 1.8, 'dynasty': 1.7, 'efficient': 1.6,
+    'highlight': 1.2, 'dagger': 1.3, 'poster': 0.7, 'hyped': 1.8, 'cooking': 1.3,
+    'cooked': -1.4, 'overrated': -1.5, 'bust': -2.0, 'choke': -2.2, 'choked': -2.4,
+    'choking': -2.2, 'trash': -2.4, 'garbage': -2.3, 'brick': -1.1, 'bricks': -1.1,
+    'bricked': -1.3, 'flop': -1.7, 'flopping': -1.8, 'robbed': -2.4, 'rigged': -2.5,
+    'tank': -1.0, 'tanking': -1.4, 'washed': -1.8, 'soft': -0.7, 'lazy': -1.5,
+    'overpaid': -1.8, 'blowout': -0.8, 'suspended': -2.1, 'suspension': -1.9,
+    'ejected': -1.4, 'fraud': -2.8, 'benched': -1.0, 'ringless': -1.2,
+}
+PHRASES = {
+    'no doubt': 1.5, 'the goat': 2.5, 'cant miss': 1.6, 'not bad': 1.3, 'no way': -0.9,
+    'ref show': -1.8, 'ref ball': -1.8, 'sell the team': -1.6, 'fire him': -1.9,
+}
+BOOSTERS = {
+    'absolutely': B_INCR, 'amazingly': B_INCR, 'completely': B_INCR, 'considerably': B_INCR,
+    'deeply': B_INCR, 'especially': B_INCR, 'extremely': B_INCR, 'fully': B_INCR,
+    'greatly': B_INCR, 'highly': B_INCR, 'hugely': B_INCR, 'incredibly': B_INCR,
+    'insanely': B_INCR, 'literally': B_INCR, 'most': B_INCR, 'more': B_INCR,
+    'really': B_INCR, 'so': B_INCR, 'super': B_INCR, 'too': B_INCR, 'totally': B_INCR,
+    'truly': B_INCR, 'very': B_INCR, 'way': B_INCR, 'honestly': B_INCR,
+    'almost': -B_INCR, 'barely': -B_INCR, 'hardly': -B_INCR, 'kinda': -B_INCR,
+    'less': -B_INCR, 'little': -B_INCR, 'marginally': -B_INCR, 'only': -B_INCR,
+    'partly': -B_INCR, 'slightly': -B_INCR, 'somewhat': -B_INCR, 'sorta': -B_INCR,
+}
+NEGATIONS = {
+    'not', 'no', 'never', 'none', 'nobody', 'nothing', 'neither', 'nor', 'nowhere',
+    'without', 'aint', 'cant', 'cannot', 'dont', 'doesnt', 'didnt', 'isnt', 'wasnt',
+    'arent', 'werent', 'wont', 'wouldnt', 'shouldnt', 'couldnt', 'havent', 'hasnt',
+    'hadnt', 'rarely', 'seldom', 'despite',
+}
+
+TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z']*")
+
+_compiled = None  # the lexicon of this process, set by load()
+
+
+# ---------- lexicon ----------
+
+def vader_lexicon_path():
+    """vader_lexicon.txt of the vaderSentiment package, if installed"""
+    try:
+        import vaderSentiment
+    except ImportError:
+        return None
+    path = os.path.join(os.path.dirname(vaderSentiment.__file__), 'vader_lexicon.txt')
+    return path if os.path.exists(path) else None
+
+
+def read_lexicon(path):
+    """word<TAB>mean valence[<TAB>...] lines (the VADER lexicon format)"""
+    entries = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) >= 2:
+                try:
+                    entries[parts[0]] = float(parts[1])
+                except ValueError:
+                    continue
+    return entries
+
+
+def compile_lexicon(entries):
+    """
+    Lower-cased single words -> valence, multi-word entries as token tuples
+    keyed by their first token, booster and negation lookups
+    """
+    words, phrases = {}, {}
+    for entry, valence in {**entries, **PHRASES}.items():
+        tokens = tuple(t.replace("'", '') for t in TOKEN_RE.findall(entry.lower()))
+        if len(tokens) == 1:
+            words[tokens[0]] = valence
+        elif tokens:
+            phrases.setdefault(tokens[0], []).append((tokens, valence))
+    for options in phrases.values():
+        options.sort(key=lambda p: -len(p[0]))  # longest match first
+    return {'words': words, 'phrases': phrases, 'boosters': dict(BOOSTERS),
+            'negations': frozenset(NEGATIONS)}
+
+
+def lexicon_cache(path=None, cache_dir=None):
+    """
+    Path of the compiled lexicon pickle (under `cache_dir`, default CACHE_DIR),
+    building it if the source changed.
+    Source: `path`, else the vaderSentiment lexicon, else the built-in one.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    path = path or vader_lexicon_path()
+    if path:
+        with open(path, 'rb') as f:
+            source = f.read()
+    else:
+        source = repr(sorted(LEXICON.items())).encode('utf-8')
+    rules = repr((sorted(PHRASES.items()), sorted(BOOSTERS.items()), sorted(NEGATIONS)))
+    key = hashlib.sha1(source + rules.encode('utf-8')).hexdigest()[:16]
+    cache_file = os.path.join(cache_dir, f"lexicon-{key}.pkl")
+    if not os.path.exists(cache_file):
+        entries = read_lexicon(path) if path else LEXICON
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(compile_lexicon(entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+    return cache_file
+
+
+def load(cache_file):
+    """Load a compiled lexicon into this process (the pool initializer)"""
+    global _compiled
+    with open(cache_file, 'rb') as f:
+        _compiled = pickle.load(f)
+
+
+# ---------- scoring ----------
+
+def polarity(text, lexicon):
+    """(compound, pos, neu, neg) of one text"""
+    raw = TOKEN_RE.findall(text)
+    if not raw:
+        return 0.0, 0.0, 1.0, 0.0
+    tokens = [t.lower().replace("'", '') for t in raw]
+    words, phrases = lexicon['words'], lexicon['phrases']
+    boosters, negations = lexicon['boosters'], lexicon['negations']
+    uppers = [t.isupper() and len(t) > 1 for t in raw]
+    negated = [t in negations or "n't" in r.lower() for t, r in zip(tokens, raw)]
+    shouting = any(uppers) and not all(uppers)
+
+    sentiments = [0.0] * len(tokens)
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        valence, width = words.get(token), 1
+        for phrase, phrase_valence in phrases.get(token, ()):
+            if tuple(tokens[i:i + len(phrase)]) == phrase:
+                valence, width = phrase_valence, len(phrase)
+                break
+        if valence is None or (token in boosters and width == 1):
+            i += 1
+            continue
+        if shouting and uppers[i]:
+            valence += C_INCR if valence > 0 else -C_INCR
+        for back, damp in ((1, 1.0), (2, 0.95), (3, 0.9)):
+            j = i - back
+            if j < 0:
+                break
+            boost = boosters.get(tokens[j])
+            if boost:
+                boost *= damp
+                if shouting and uppers[j]:
+                    boost += C_INCR if boost > 0 else -C_INCR
+                valence += boost if valence > 0 else -boost
+            if negated[j]:
+                valence *= N_SCALAR
+        sentiments[i] = valence
+        i += width
+
+    if 'but' in tokens:
+        pivot = tokens.index('but')
+        sentiments = [s * BUT_BEFORE if k < pivot else s * BUT_AFTER if k > pivot else s
+                      for k, s in enumerate(sentiments)]
+
+    total = sum(sentiments)
+    emphasis = min(text.count('!'), 4) * 0.292
+    questions = text.count('?')
+    if questions > 1:
+        emphasis += min(questions * 0.18, 0.96)
+    if total > 0:
+        total += emphasis
+    elif total < 0:
+        total -= emphasis
+    compound = total / math.sqrt(total * total + ALPHA)
+
+    pos = sum(s + 1 for s in sentiments if s > 0)
+    neg = sum(s - 1 for s in sentiments if s < 0)
+    neu = sum(1 for t, s in zip(tokens, sentiments) if s == 0 and t not in boosters)
+    if pos > -neg:
+        pos += emphasis
+    elif pos < -neg:
+        neg -= emphasis
+    scale = pos - neg + neu
+    if not scale:
+        return round(compound, 4), 0.0, 1.0, 0.0
+    return round(compound, 4), pos / scale, neu / scale, -neg / scale
+
+
+def score_batch(texts):
+    """float32 array (len(texts), 4) of COMPOUND, POS, NEU, NEG"""
+    if _compiled is None:
+        load(lexicon_cache())
+    out = np.empty((len(texts), 4), dtype=np.float32)
+    for row, text in enumerate(texts):
+        out[row] = polarity(text, _compiled) if isinstance(text, str) else (0.0, 0.0, 1.0, 0.0)
+    return out
+
+
+def score_texts(texts, workers=None, batch_size=BATCH_SIZE, lexicon=None):
+    """
+    Score texts in batches of `batch_size`; with more than one worker the
+    batches are spread over a process pool. Returns a DataFrame of SCORES in
+    the order of `texts`.
+    """
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    cache_file = lexicon_cache(lexicon)
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    if workers == 1 or len(batches) < 2:
+        load(cache_file)
+        parts = [score_batch(b) for b in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=load,
+                                 initargs=(cache_file,)) as pool:
+            parts = list(pool.map(score_batch, batches))
+    scores = np.concatenate(parts) if parts else np.empty((0, 4), dtype=np.float32)
+    return pd.DataFrame(scores, columns=SCORES)
+
+
+def label(compound):
+    """Positive / Neutral / Negative at VADER's +-0.05 thresholds"""
+    if compound >= POSITIVE:
+        return 'Positive'
+    if compound <= NEGATIVE:
+        return 'Negative'
+    return 'Neutral'
+
+
+# ---------- stored posts ----------
+
+def score_stored(subreddit='nba', days=30, root=columnar_store.DEFAULT_ROOT, workers=None,
+                 lexicon=None):
+    """
+    Score every stored post and comment of the last `days` that has no score
+    yet, month by month. Returns (texts scored, seconds).
+    """
+    since = pd.Timestamp.now() - pd.Timedelta(days=days)
+    scored, started = 0, time.perf_counter()
+    for source in SOURCES:
+        months = [m for m in columnar_store.partition_values(root, source, 'month',
+                                                             subreddit=subreddit)
+                  if m >= f"{since:%Y-%m}"]
+        for month in months:
+            df = columnar_store.read_dataset(root, source, columns=['ID', 'CREATED_UTC']
+                                             + SOURCES[source], subreddit=subreddit, month=month)
+            df = df.drop_duplicates('ID', keep='last')
+            done = columnar_store.read_dataset(root, DATASET, columns=['ID'], source=source,
+                                               subreddit=subreddit, month=month)
+            if not done.empty:
+                df = df[~df['ID'].isin(done['ID'])]
+            if df.empty:
+                continue
+            with instrumentation.step('sentiment.score'):
+                scores = score_texts(reddit_ingester.text_of(df, source), workers, lexicon=lexicon)
+                instrumentation.record_rows(rows_in=len(df), rows_out=len(scores))
+            out = pd.concat([df[['ID', 'CREATED_UTC']].reset_index(drop=True), scores], axis=1)
+            columnar_store.append_partition(out, root, DATASET, {
+                'source': source, 'subreddit': subreddit, 'month': month})
+            scored += len(out)
+    return scored, time.perf_counter() - started
+
+
+def load_scored(subreddit='nba', days=30, root=columnar_store.DEFAULT_ROOT, unique=False):
+    """
+    Scored posts and comments of the last `days`: TEXT, CREATED_UTC and
+    SCORES. With `unique`, near-duplicates (see near_duplicate.py) are left
+    out - each cluster counts once, as its earliest post.
+    """
+    frames = []
+    for source in SOURCES:
+        posts = reddit_ingester.load(source, subreddit, days, root)
+        if posts.empty:
+            continue
+        months = sorted(set(pd.to_datetime(posts['CREATED_UTC'], unit='s').dt.strftime('%Y-%m')))
+        scores = columnar_store.read_dataset(root, DATASET, columns=['ID'] + SCORES, source=source,
+                                             subreddit=subreddit, month=months)
+        if scores.empty:
+            continue
+        posts = posts.drop_duplicates('ID', keep='last')
+        if unique:
+            posts = posts[~posts['ID'].isin(
+                near_duplicate.duplicate_ids(source, subreddit, months, root))]
+        df = posts[['ID', 'CREATED_UTC']].assign(TEXT=reddit_ingester.text_of(posts, source))
+        frames.append(df.merge(scores.drop_duplicates('ID', keep='last'), on='ID'))
+    if not frames:
+        return pd.DataFrame(columns=['ID', 'CREATED_UTC', 'TEXT'] + SCORES)
+    return pd.concat(frames, ignore_index=True)
+
+
+def aliases(names):
+    """Full name, plus the last name where no other name in the list shares it"""
+    last = pd.Series([n.split()[-1] for n in names])
+    unique = set(last[~last.duplicated(keep=False)])
+    return {n: [n] + ([n.split()[-1]] if ' ' in n and n.split()[-1] in unique
+                      and len(n.split()[-1]) > 3 else []) for n in names}
+
+
+def daily_sentiment(scored, entities):
+    """
+    Per entity and day: TEXTS mentioning it (any alias, whole words, any
+    case), mean COMPOUND as SENTIMENT, POSITIVE_SHARE and NEGATIVE_SHARE.
+    `entities` maps name -> aliases (a list of names means each name alone).
+    """
+    if not isinstance(entities, dict):
+        entities = {e: [e] for e in entities}
+    columns = ['ENTITY', 'DAY', 'TEXTS', 'SENTIMENT', 'POSITIVE_SHARE', 'NEGATIVE_SHARE']
+    if scored.empty:
+        return pd.DataFrame(columns=columns)
+    days = pd.to_datetime(scored['CREATED_UTC'], unit='s').dt.strftime('%Y-%m-%d')
+    compound = scored['COMPOUND'].astype(np.float64)
+    frames = []
+    for name, names in entities.items():
+        pattern = r'\b(?:' + '|'.join(re.escape(a) for a in names) + r')\b'
+        hit = scored['TEXT'].str.contains(pattern, case=False, regex=True).to_numpy()
+        if not hit.any():
+            continue
+        c = compound[hit]
+        df = pd.DataFrame({'DAY': days[hit], 'C': c, 'P': c >= POSITIVE, 'N': c <= NEGATIVE})
+        g = df.groupby('DAY').agg(TEXTS=('C', 'size'), SENTIMENT=('C', 'mean'),
+                                  POSITIVE_SHARE=('P', 'mean'), NEGATIVE_SHARE=('N', 'mean'))
+        frames.append(g.reset_index().assign(ENTITY=name))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat(frames, ignore_index=True)[columns]
+    return df.round({'SENTIMENT': 4, 'POSITIVE_SHARE': 4, 'NEGATIVE_SHARE': 4})
+
+
+def summarize(daily):
+    """Per entity over all days: TEXTS and text-weighted SENTIMENT"""
+    if daily.empty:
+        return pd.DataFrame(columns=['TEXTS', 'SENTIMENT'])
+    weighted = daily['SENTIMENT'] * daily['TEXTS']
+    g = daily.assign(W=weighted).groupby('ENTITY')
+    return pd.DataFrame({'TEXTS': g['TEXTS'].sum(),
+                         'SENTIMENT': (g['W'].sum() / g['TEXTS'].sum()).round(3)})
+
+
+def entity_sentiment(names, subreddit='nba', days=30, root=columnar_store.DEFAULT_ROOT,
+                     score=True, players=False, workers=None, unique=False):
+    """
+    Summary sentiment per name (index) over the last `days` of stored Reddit
+    posts, scoring unscored ones first unless `score` is False. Player names
+    also match on a unique last name. With `unique`, TEXTS counts each
+    near-duplicate cluster once.
+    """
+    if unique:
+        # Cluster posts ingested since the last run before counting
+        near_duplicate.dedupe_stored(subreddit, days, root)
+    if score:
+        score_stored(subreddit, days, root, workers)
+    entities = aliases(list(names)) if players else list(names)
+    return summarize(daily_sentiment(load_scored(subreddit, days, root, unique), entities))
+
+
+class SentimentEngine:
+    def __init__(self, subreddit='nba', root=columnar_store.DEFAULT_ROOT, workers=None,
+                 lexicon=None, timeseries_root=None):
+        self.subreddit = subreddit
+        self.root = root
+        self.workers = workers or os.cpu_count() or 1
+        self.lexicon = lexicon
+        self.timeseries_root = timeseries_root
+
+    def record_daily(self, daily, kind):
+        """Complete days into the time-series store (today's are still partial)"""
+        import timeseries_store
+
+        today = f"{pd.Timestamp.now():%Y-%m-%d}"
+        daily = daily[daily['DAY'] < today]
+        if daily.empty:
+            return 0
+        store = timeseries_store.TimeSeriesStore(self.timeseries_root or timeseries_store.DEFAULT_ROOT)
+        days = pd.to_datetime(daily['DAY'])
+        return (store.append(kind, 'reddit_sentiment', daily['ENTITY'], days, daily['SENTIMENT'])
+                + store.append(kind, 'reddit_mentions', daily['ENTITY'], days, daily['TEXTS']))
+
+    def collect_all_sentiment(self, keywords=None, players=None, days=30):
+        """Pipeline entry point: score new posts, aggregate per keyword / player and day"""
+        print("="*70)
+        print(f"SENTIMENT SCORING - r/{self.subreddit}")
+        print("="*70)
+
+        count, seconds = score_stored(self.subreddit, days, self.root, self.workers, self.lexicon)
+        if count:
+            print(f"[OK] Scored {count:,} texts in {seconds:.1f}s "
+                  f"({count / max(seconds, 1e-9):,.0f} texts/s, {self.workers} workers)")
+        else:
+            print("[OK] No unscored posts")
+        for source, (total, duplicates) in near_duplicate.dedupe_stored(
+                self.subreddit, days, self.root).items():
+            if total:
+                print(f"  - {source}: {duplicates:,} of {total:,} new texts are near-duplicates")
+
+        # Mention counts are buzz - each repost cluster counts once
+        scored = load_scored(self.subreddit, days, self.root, unique=True)
+        if scored.empty:
+            print("[WARNING] No scored posts - run reddit_ingester.py first")
+            return pd.DataFrame()
+
+        keywords = keywords or reddit_ingester.DEFAULT_KEYWORDS
+        players = players or MEDIA_PLAYERS
+        frames = []
+        for kind, entities in (('keyword', keywords), ('player', aliases(players))):
+            daily = daily_sentiment(scored, entities)
+            stored = self.record_daily(daily, kind)
+            print(f"  - {kind}s: {daily['ENTITY'].nunique()} with mentions, "
+                  f"{stored} points recorded")
+            frames.append(daily.assign(KIND=kind))
+        df = pd.concat(frames, ignore_index=True)
+
+        os.makedirs('data', exist_ok=True)
+        filepath = os.path.join('data', '4_sentiment_daily.csv')
+        df.to_csv(filepath, index=False)
+        print(f"\n[SAVED] {filepath}")
+        return df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score stored Reddit posts and comments")
+    parser.add_argument('keywords', nargs='*', default=None)
+    parser.add_argument('--subreddit', default='nba')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--workers', type=int, default=None, help="Default: one per CPU")
+    parser.add_argument('--lexicon', default=None,
+                        help="VADER-format lexicon file (default: vaderSentiment's, else built-in)")
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    SentimentEngine(args.subreddit, args.root, args.workers, args.lexicon).collect_all_sentiment(
+        args.keywords, days=args.days)
+    instrumentation.write_run()
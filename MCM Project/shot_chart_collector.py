@@ -0,0 +1,144 @@
+"""
+Shot Chart Collector
+Every field-goal attempt of every player-season (ShotChartDetail) in the
+columnar store, partitioned by (season, game_date):
+
+    data/warehouse/shot_charts/season=2023-24/game_date=2023-10-24/part.parquet
+
+With player_id=0 and team_id=0 the endpoint returns the whole league, so one
+request per season type covers every player. As with the game logs, a daily
+run only asks for the dates from the last stored one onward. Locations and
+flags are stored as small integers, which keeps a full season (~220k shots)
+at a few MB. Aggregation lives in shot_zones.py.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+import instrumentation
+from collector_registry import current_season
+from shot_zones import DATASET
+
+SEASON_TYPES = ['Regular Season', 'Playoffs']
+KEEP_COLUMNS = ['GAME_ID', 'GAME_EVENT_ID', 'PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'TEAM_NAME',
+                'PERIOD', 'MINUTES_REMAINING', 'SECONDS_REMAINING', 'ACTION_TYPE', 'SHOT_TYPE',
+                'SHOT_ZONE_BASIC', 'SHOT_ZONE_AREA', 'SHOT_ZONE_RANGE', 'SHOT_DISTANCE',
+                'LOC_X', 'LOC_Y', 'SHOT_MADE_FLAG', 'GAME_DATE', 'HTM', 'VTM']
+COMPACT = {'GAME_EVENT_ID': np.int32, 'PERIOD': np.int8, 'MINUTES_REMAINING': np.int8,
+           'SECONDS_REMAINING': np.int8, 'SHOT_DISTANCE': np.int16, 'LOC_X': np.int16,
+           'LOC_Y': np.int16, 'SHOT_MADE_FLAG': np.int8}
+CATEGORIES = ['ACTION_TYPE', 'SHOT_TYPE', 'SHOT_ZONE_BASIC', 'SHOT_ZONE_AREA', 'SHOT_ZONE_RANGE']
+
+
+def compact(df):
+    """Keep the useful columns with small dtypes"""
+    df = df[[c for c in KEEP_COLUMNS if c in df]]
+    df = df.astype({c: t for c, t in COMPACT.items() if c in df})
+    return df.astype({c: 'category' for c in CATEGORIES if c in df})
+
+
+@instrumentation.instrument_class
+class ShotChartCollector:
+    def __init__(self, root=columnar_store.DEFAULT_ROOT):
+        self.root = root
+        self.delay = 2  # Respectful delay between requests
+
+    def last_stored_date(self, season):
+        dates = columnar_store.partition_values(self.root, DATASET, 'game_date', season=season)
+        return dates[-1] if dates else None
+
+    def fetch_shots(self, season='2023-24', date_from=None):
+        """League-wide shot chart for a season (optionally from a date), all season types"""
+        from nba_api.stats.endpoints import shotchartdetail
+
+        frames = []
+        for season_type in SEASON_TYPES:
+            chart = shotchartdetail.ShotChartDetail(
+                team_id=0,
+                player_id=0,
+                season_nullable=season,
+                season_type_all_star=season_type,
+                context_measure_simple='FGA',
+                date_from_nullable=date_from.strftime('%m/%d/%Y') if date_from else ''
+            )
+            instrumentation.record_endpoint(chart)
+            df = chart.get_data_frames()[0]
+            instrumentation.throttle(self.delay)
+
+            if not df.empty:
+                df = compact(df)
+                df['SEASON_TYPE'] = season_type
+                frames.append(df)
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def store_by_date(self, df, season):
+        """Write one partition per game date (replacing it if it exists)"""
+        dates = pd.to_datetime(df['GAME_DATE'].astype(str), format='%Y%m%d').dt.strftime('%Y-%m-%d')
+        for game_date, day in df.groupby(dates):
+            columnar_store.write_partition(day, self.root, DATASET,
+                                           {'season': season, 'game_date': game_date})
+        return dates.nunique()
+
+    def update_shots(self, season='2023-24'):
+        """
+        Incremental update: fetch from the last stored game date (re-fetched in
+        case its late games were still in progress) up to today, and append.
+        """
+        last = self.last_stored_date(season)
+        date_from = datetime.strptime(last, '%Y-%m-%d') if last else None
+        label = f"from {last}" if last else "full season"
+        print(f"\n[SHOT CHARTS] {season} ({label})...")
+
+        try:
+            df = self.fetch_shots(season, date_from=date_from)
+        except Exception as e:
+            print(f"[ERROR] {e}")
+            return pd.DataFrame()
+
+        if df.empty:
+            print("[OK] No new shots")
+            return df
+
+        days = self.store_by_date(df, season)
+        print(f"[OK] Stored {len(df)} shots by {df['PLAYER_ID'].nunique()} players "
+              f"across {days} game dates")
+        return df
+
+    def collect_all_shot_charts(self, season='2023-24', first_season=None):
+        """
+        Update `season`; with `first_season`, every season from there on is
+        loaded first (shot charts start in 1996-97)
+        """
+        print("="*70)
+        print("SHOT CHART COLLECTION")
+        print("="*70)
+
+        seasons = [season]
+        if first_season:
+            from historical_backfill import season_range
+            seasons = season_range(first_season, season)
+
+        for s in seasons:
+            self.update_shots(s)
+
+        print(f"\n[SUCCESS] Shot charts stored under {self.root}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest league-wide shot charts incrementally")
+    parser.add_argument('--season', default=current_season(datetime.now()))
+    parser.add_argument('--first-season', default=None,
+                        help="Also load every season since this one (e.g. 1996-97)")
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    ShotChartCollector(args.root).collect_all_shot_charts(args.season, args.first_season)
+    instrumentation.write_run()
@@ -0,0 +1,320 @@
+"""
+Shot Zones
+Spatial aggregation of shot-chart data (shot_chart_collector.py). LOC_X/LOC_Y
+are tenths of a foot with the hoop at (0, 0) and the baseline at y = -47.5.
+
+Shots are binned three ways - a square grid, a hex grid or the NBA's basic
+zones - and every player (or team) is binned in one pass: each shot gets a
+cell id, and np.bincount over (group * n_cells + cell) builds the whole
+players x cells attempts/makes matrices, the grouped form of np.histogram2d.
+Those matrices are kept in a ShotProfiles object, so comparing two profiles
+or finding the most similar shooters is a row lookup or one matrix product.
+
+    python shot_zones.py --season 2023-24              # zone table + profiles
+    python shot_zones.py --season 2023-24 --compare 201939 1629029
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+
+DATASET = 'shot_charts'
+SHOT_COLUMNS = ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'SHOT_ZONE_BASIC',
+                'LOC_X', 'LOC_Y', 'SHOT_MADE_FLAG']
+
+# Half court in LOC units: sideline to sideline, baseline to half-court line
+COURT_X = (-250.0, 250.0)
+COURT_Y = (-47.5, 422.5)
+ZONES = ['Restricted Area', 'In The Paint (Non-RA)', 'Mid-Range', 'Left Corner 3',
+         'Right Corner 3', 'Above the Break 3', 'Backcourt']
+BINS = ('zone', 'grid', 'hex')
+
+
+def zone_of(x, y):
+    """Basic shot zone index (into ZONES) from court location"""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    dist = np.hypot(x, y)
+    return np.select(
+        [y >= COURT_Y[1],
+         dist <= 40,
+         (np.abs(x) < 80) & (y < 142.5),
+         (x <= -220) & (y <= 92.5),
+         (x >= 220) & (y <= 92.5),
+         dist >= 237.5],
+        [6, 0, 1, 3, 4, 5], default=2)
+
+
+def zone_cells(shots):
+    """Zone index per shot: the API's SHOT_ZONE_BASIC when present, else from location"""
+    if 'SHOT_ZONE_BASIC' in shots:
+        cells = pd.Categorical(shots['SHOT_ZONE_BASIC'], categories=ZONES).codes
+        if (cells >= 0).all():
+            return cells.astype(np.int64), len(ZONES)
+        located = zone_of(shots['LOC_X'], shots['LOC_Y'])
+        return np.where(cells >= 0, cells, located), len(ZONES)
+    return zone_of(shots['LOC_X'], shots['LOC_Y']), len(ZONES)
+
+
+def grid_edges(cell=20.0):
+    """Bin edges of the square grid (cell size in LOC units; 20 = 2 ft)"""
+    nx = int(np.ceil((COURT_X[1] - COURT_X[0]) / cell))
+    ny = int(np.ceil((COURT_Y[1] - COURT_Y[0]) / cell))
+    return COURT_X[0] + cell * np.arange(nx + 1), COURT_Y[0] + cell * np.arange(ny + 1)
+
+
+def grid_cells(x, y, cell=20.0):
+    """Square-grid cell id per shot (row-major, y outer); shots off the grid are clipped"""
+    x_edges, y_edges = grid_edges(cell)
+    nx, ny = len(x_edges) - 1, len(y_edges) - 1
+    ix = np.clip(((np.asarray(x, dtype=float) - COURT_X[0]) // cell).astype(np.int64), 0, nx - 1)
+    iy = np.clip(((np.asarray(y, dtype=float) - COURT_Y[0]) // cell).astype(np.int64), 0, ny - 1)
+    return iy * nx + ix, nx * ny
+
+
+def _axial(x, y, size):
+    """Fractional axial coordinates of pointy-top hexagons with circumradius `size`"""
+    q = (np.sqrt(3) / 3 * x - y / 3) / size
+    r = (2 / 3 * y) / size
+    return q, r
+
+
+def _hex_bounds(size):
+    corners_x = np.array([COURT_X[0], COURT_X[1], COURT_X[0], COURT_X[1]])
+    corners_y = np.array([COURT_Y[0], COURT_Y[0], COURT_Y[1], COURT_Y[1]])
+    q, r = _axial(corners_x, corners_y, size)
+    return (int(np.floor(q.min())) - 1, int(np.ceil(q.max())) + 1,
+            int(np.floor(r.min())) - 1, int(np.ceil(r.max())) + 1)
+
+
+def hex_cells(x, y, size=15.0):
+    """Hex-grid cell id per shot (pointy-top hexagons, circumradius `size` LOC units)"""
+    x = np.clip(np.asarray(x, dtype=float), *COURT_X)
+    y = np.clip(np.asarray(y, dtype=float), *COURT_Y)
+    q, r = _axial(x, y, size)
+    # Cube rounding: round all three coordinates, fix the one with the largest error
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+
+    q0, q1, r0, r1 = _hex_bounds(size)
+    width = q1 - q0 + 1
+    return ((rr - r0) * width + (rq - q0)).astype(np.int64), width * (r1 - r0 + 1)
+
+
+def hex_centers(size=15.0):
+    """(x, y) centre of every hex cell id"""
+    q0, q1, r0, r1 = _hex_bounds(size)
+    r, q = np.divmod(np.arange((q1 - q0 + 1) * (r1 - r0 + 1)), q1 - q0 + 1)
+    q, r = q + q0, r + r0
+    return size * np.sqrt(3) * (q + r / 2), size * 1.5 * r
+
+
+def cells(shots, bins='zone', cell=None):
+    """(cell id per shot, number of cells) for the chosen binning"""
+    if bins == 'zone':
+        return zone_cells(shots)
+    if bins == 'grid':
+        return grid_cells(shots['LOC_X'], shots['LOC_Y'], cell or 20.0)
+    if bins == 'hex':
+        return hex_cells(shots['LOC_X'], shots['LOC_Y'], cell or 15.0)
+    raise ValueError(f"Unknown binning {bins!r} (expected one of {', '.join(BINS)})")
+
+
+class ShotProfiles:
+    """
+    Attempts/makes per group (player or team) and cell, plus league totals per
+    cell. Rows follow `ids`.
+    """
+
+    def __init__(self, ids, names, fga, fgm, bins='zone', cell=None):
+        self.ids = np.asarray(ids)
+        self.names = np.asarray(names, dtype=object)
+        self.fga = fga
+        self.fgm = fgm
+        self.bins = bins
+        self.cell = cell
+        self.index = pd.Index(self.ids)
+
+    @classmethod
+    def build(cls, shots, by='PLAYER_ID', bins='zone', cell=None):
+        """Bin every shot once and count attempts/makes per (group, cell)"""
+        codes, ids = pd.factorize(shots[by], sort=True)
+        cell_ids, n_cells = cells(shots, bins, cell)
+        flat = codes.astype(np.int64) * n_cells + cell_ids
+        size = len(ids) * n_cells
+        made = shots['SHOT_MADE_FLAG'].to_numpy(dtype=np.float64)
+        fga = np.bincount(flat, minlength=size).reshape(len(ids), n_cells)
+        fgm = np.bincount(flat, weights=made, minlength=size).reshape(len(ids), n_cells)
+
+        name_col = 'PLAYER_NAME' if by == 'PLAYER_ID' else 'TEAM_NAME'
+        if name_col in shots:
+            # Names are constant per id, so any shot's name will do
+            names = np.empty(len(ids), dtype=object)
+            names[codes] = shots[name_col].to_numpy()
+        else:
+            names = np.asarray(ids).astype(str)
+        return cls(np.asarray(ids), names, fga.astype(np.float32), fgm.astype(np.float32),
+                   bins, cell)
+
+    # ---------- league ----------
+
+    @property
+    def league_fga(self):
+        return self.fga.sum(axis=0)
+
+    @property
+    def league_fg_pct(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.fgm.sum(axis=0) / self.league_fga
+
+    # ---------- per-group ----------
+
+    def rows(self, ids):
+        rows = self.index.get_indexer(np.atleast_1d(ids))
+        if (rows < 0).any():
+            missing = np.atleast_1d(ids)[rows < 0]
+            raise KeyError(f"No shots for {', '.join(map(str, missing))}")
+        return rows
+
+    def frequency(self, rows=slice(None)):
+        """Share of each group's attempts taken from each cell"""
+        fga = self.fga[rows]
+        return fga / np.maximum(fga.sum(axis=-1, keepdims=True), 1)
+
+    def fg_pct(self, rows=slice(None)):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.fgm[rows] / self.fga[rows]
+
+    def relative_fg_pct(self, rows=slice(None)):
+        """FG% minus league FG% in the same cell (NaN where the group took no shots)"""
+        return self.fg_pct(rows) - self.league_fg_pct
+
+    def compare(self, a, b):
+        """
+        Two profiles side by side: cosine similarity and L1 distance of their
+        shot distributions, and each one's attempt-weighted FG% above league
+        """
+        rows = self.rows([a, b])
+        freq = self.frequency(rows)
+        rel = np.nan_to_num(self.relative_fg_pct(rows))
+        norms = np.linalg.norm(freq, axis=1)
+        return {
+            'similarity': float(freq[0] @ freq[1] / max(norms[0] * norms[1], 1e-12)),
+            'l1_distance': float(np.abs(freq[0] - freq[1]).sum()),
+            'fg_pct_vs_league': [float((f * r).sum()) for f, r in zip(freq, rel)],
+        }
+
+    def most_similar(self, player_id, k=10, min_fga=100):
+        """The k groups whose shot distribution is closest (cosine) to `player_id`'s"""
+        row = self.rows(player_id)[0]
+        freq = self.frequency()
+        unit = freq / np.maximum(np.linalg.norm(freq, axis=1, keepdims=True), 1e-12)
+        scores = unit @ unit[row]
+        scores[self.fga.sum(axis=1) < min_fga] = -np.inf
+        scores[row] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        top = np.argpartition(-scores, k - 1)[:k] if k else np.array([], dtype=np.int64)
+        top = top[np.argsort(-scores[top])]
+        return pd.DataFrame({'ID': self.ids[top], 'NAME': self.names[top],
+                             'SIMILARITY': scores[top].round(4),
+                             'FGA': self.fga[top].sum(axis=1).astype(int)})
+
+    # ---------- output ----------
+
+    def zone_table(self):
+        """Long table: one row per group and cell with FGA, FG%, league FG% and frequency"""
+        n, n_cells = self.fga.shape
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fg_pct = self.fg_pct()
+        league = np.broadcast_to(self.league_fg_pct, (n, n_cells))
+        table = pd.DataFrame({
+            'ID': np.repeat(self.ids, n_cells),
+            'NAME': np.repeat(self.names, n_cells),
+            'CELL': np.tile(np.arange(n_cells), n),
+            'FGA': self.fga.ravel().astype(np.int64),
+            'FGM': self.fgm.ravel().astype(np.int64),
+            'FG_PCT': fg_pct.ravel().round(3),
+            'LEAGUE_FG_PCT': league.ravel().round(3),
+            'FREQ': self.frequency().ravel().round(4),
+        })
+        table['FG_PCT_DIFF'] = (table['FG_PCT'] - table['LEAGUE_FG_PCT']).round(3)
+        if self.bins == 'zone':
+            table.insert(3, 'ZONE', np.array(ZONES, dtype=object)[table['CELL']])
+        return table[table['FGA'] > 0].reset_index(drop=True)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, ids=self.ids, names=self.names.astype(str), fga=self.fga, fgm=self.fgm,
+                     bins=np.array(self.bins), cell=np.array(self.cell or 0.0))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        state = np.load(path, allow_pickle=False)
+        return cls(state['ids'], state['names'].astype(object), state['fga'], state['fgm'],
+                   str(state['bins']), float(state['cell']) or None)
+
+
+def load_shots(seasons=None, root=columnar_store.DEFAULT_ROOT, season_type='Regular Season'):
+    """Stored shots, only the columns the engine needs"""
+    filters = {'season': seasons} if seasons else {}
+    shots = columnar_store.read_dataset(root, DATASET, columns=SHOT_COLUMNS + ['SEASON_TYPE'],
+                                        **filters)
+    if season_type and not shots.empty:
+        shots = shots[shots['SEASON_TYPE'] == season_type].reset_index(drop=True)
+    return shots
+
+
+def profile_path(season, bins, output_dir='data'):
+    return os.path.join(output_dir, f"shot_profiles_{season}_{bins}.npz")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shot zones and profiles from stored shot charts")
+    parser.add_argument('--season', required=True)
+    parser.add_argument('--bins', default='zone,grid,hex',
+                        help=f"Comma separated, any of {', '.join(BINS)}")
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    parser.add_argument('--output-dir', default='data')
+    parser.add_argument('--compare', nargs=2, type=int, metavar='PLAYER_ID',
+                        help="Compare two players' zone profiles")
+    args = parser.parse_args()
+
+    print("="*70)
+    print(f"SHOT ZONES - {args.season}")
+    print("="*70)
+
+    shots = load_shots([args.season], args.root)
+    if shots.empty:
+        print(f"[ERROR] No shots stored for {args.season} - run shot_chart_collector.py first")
+        raise SystemExit(1)
+    print(f"[OK] {len(shots)} shots, {shots['PLAYER_ID'].nunique()} players")
+
+    for bins in args.bins.split(','):
+        profiles = ShotProfiles.build(shots, bins=bins)
+        path = profile_path(args.season, bins, args.output_dir)
+        profiles.save(path)
+        print(f"[SAVED] {path} ({profiles.fga.shape[0]} players x {profiles.fga.shape[1]} cells)")
+        if bins == 'zone':
+            table = profiles.zone_table().rename(columns={'ID': 'PLAYER_ID',
+                                                          'NAME': 'PLAYER_NAME'})
+            out = os.path.join(args.output_dir, f"1_player_shot_zones_{args.season}.csv")
+            table.to_csv(out, index=False)
+            print(f"[SAVED] {out}")
+            if args.compare:
+                result = profiles.compare(*args.compare)
+                print(f"\n[INFO] {args.compare[0]} vs {args.compare[1]}: "
+                      f"similarity {result['similarity']:.3f}, "
+                      f"L1 distance {result['l1_distance']:.3f}, FG% vs league "
+                      + " / ".join(f"{v:+.3f}" for v in result['fg_pct_vs_league']))
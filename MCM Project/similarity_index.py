@@ -0,0 +1,299 @@
+"""
+Similarity Index
+"Most similar player-seasons in history" for contract comps. Every
+player-season becomes a vector of per-100-possession rates, shooting and
+advanced metrics (optionally plus the shot-zone mix from shot_zones.py),
+z-scored within its season so eras with different pace and scoring compare
+fairly. Neighbours are exact: squared distances for a batch of queries come
+from one matrix product (|a|^2 + |b|^2 - 2 a.b), so a query over ~25 seasons x
+~550 players takes well under a millisecond.
+
+Sources: the backfilled player_stats in the warehouse (historical_backfill.py,
+Base + Advanced PerGame) and data/1_COMPLETE_advanced_stats.csv (the 2023-24
+season quick_complete_collector.py writes) when that season is not in the
+warehouse yet.
+
+    python similarity_index.py --build [--shots]
+    python similarity_index.py "Nikola Jokic" --season 2023-24 -k 20
+"""
+
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+import metrics_engine
+
+INDEX_FILE = os.path.join('data', 'similarity_index.npz')
+COMPLETE_FILE = os.path.join('data', '1_COMPLETE_advanced_stats.csv')
+COMPLETE_SEASON = '2023-24'  # the season quick_complete_collector.py writes
+RATE_STATS = ['PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV']
+SHOOTING = ['FG_PCT', 'FG3_PCT', 'FT_PCT', 'TS_PCT']
+ADVANCED = ['USG_PCT', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'PER', 'BPM']
+FEATURES = [f'{s}_PER100' for s in RATE_STATS] + SHOOTING + ADVANCED
+KEY_COLUMNS = ['SEASON', 'PLAYER_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'MIN_TOTAL']
+TEXT_KEYS = ['SEASON', 'PLAYER_NAME', 'TEAM_ABBREVIATION']
+LEAGUE_PACE = 100.0  # used when a source has no PACE; a constant cancels out in the z-scores
+
+
+def name_key(name):
+    """Accent/case-insensitive player name ('Nikola Jokić' -> 'nikola jokic')"""
+    text = unicodedata.normalize('NFKD', str(name))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower().strip()
+
+
+def feature_table(df):
+    """
+    Raw feature columns from per-game stats (SEASON, PLAYER_NAME, GP, MIN,
+    box columns, rating columns, PACE if known)
+    """
+    out = df.copy()
+    # PER/BPM as in the COMPLETE file (metrics_engine approximations); computed
+    # here for sources that only have the box score
+    missing = [m for m in ('PER', 'BPM') if m not in out]
+    if missing:
+        out = metrics_engine.compute(out, [f'{m}_approx' for m in missing])
+        out = out.rename(columns={f'{m}_approx': m for m in missing})
+    pace = out['PACE'].fillna(LEAGUE_PACE) if 'PACE' in out else LEAGUE_PACE
+    poss = out['MIN'] * pace / 48
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for stat in RATE_STATS:
+            out[f'{stat}_PER100'] = 100 * out[stat] / poss
+    out['MIN_TOTAL'] = out['MIN'] * out['GP']
+    # Sources without ids (the COMPLETE file) get -1
+    out['PLAYER_ID'] = out['PLAYER_ID'].fillna(-1) if 'PLAYER_ID' in out else -1
+    for col in FEATURES:
+        if col not in out:
+            out[col] = np.nan
+    return out.replace([np.inf, -np.inf], np.nan)
+
+
+def standardize(df, features, by='SEASON'):
+    """Z-score every feature within its season; missing values become the season mean"""
+    values = df[features].astype(float)
+    grouped = values.groupby(df[by])
+    std = grouped.transform('std').replace(0, np.nan)
+    z = (values - grouped.transform('mean')) / std
+    return z.fillna(0.0).to_numpy(dtype=np.float32)
+
+
+def warehouse_seasons(root=columnar_store.DEFAULT_ROOT, seasons=None):
+    """Per-game Base + Advanced regular-season stats from the backfill, one row per player-season"""
+    filters = {'per_mode': 'PerGame', 'season_type': 'Regular Season'}
+    if seasons:
+        filters['season'] = seasons
+    base = columnar_store.read_dataset(root, 'player_stats', measure='Base', **filters)
+    if base.empty:
+        return base
+    adv = columnar_store.read_dataset(root, 'player_stats', measure='Advanced', **filters)
+    if not adv.empty:
+        extra = ['season', 'PLAYER_ID'] + [c for c in adv.columns if c not in base.columns]
+        base = base.merge(adv[extra], on=['season', 'PLAYER_ID'], how='left')
+    return base.rename(columns={'season': 'SEASON'})
+
+
+def complete_season(path=COMPLETE_FILE, season=COMPLETE_SEASON):
+    """1_COMPLETE_advanced_stats.csv in the same layout, labelled with its season"""
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    df = pd.read_csv(path)
+    df.insert(0, 'SEASON', season)
+    return df
+
+
+def shot_mix(seasons, output_dir='data'):
+    """Zone shares (SHOT_<zone>) per player-season from saved shot_zones profiles"""
+    import shot_zones
+
+    frames = []
+    for season in seasons:
+        path = shot_zones.profile_path(season, 'zone', output_dir)
+        if not os.path.exists(path):
+            continue
+        profiles = shot_zones.ShotProfiles.load(path)
+        mix = pd.DataFrame(profiles.frequency(), columns=shot_columns())
+        mix.insert(0, 'PLAYER_ID', profiles.ids)
+        mix.insert(0, 'SEASON', season)
+        frames.append(mix)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def shot_columns():
+    from shot_zones import ZONES
+    return ['SHOT_' + z.split(' (')[0].upper().replace(' ', '_') for z in ZONES]
+
+
+class SimilarityIndex:
+    """Standardised player-season vectors (`X`, rows follow `keys`) with exact k-NN queries"""
+
+    def __init__(self, keys, features, X):
+        self.keys = keys.reset_index(drop=True)
+        # Plain arrays for building query results without per-call pandas overhead
+        self.columns = {c: self.keys[c].to_numpy(dtype=object if c in TEXT_KEYS else None)
+                        for c in KEY_COLUMNS}
+        self.features = list(features)
+        self.X = X
+        self.sq_norms = (X ** 2).sum(axis=1)
+        ids = self.keys['PLAYER_ID'].to_numpy()
+        names = self.keys['PLAYER_NAME'].map(name_key)
+        # Players are matched by id; rows from a source without ids (the
+        # COMPLETE file) borrow the id stored for the same name
+        known = pd.Series(ids, index=names)[ids >= 0]
+        known = known[~known.index.duplicated()]
+        ids = np.where(ids >= 0, ids, names.map(known).fillna(-1).to_numpy(dtype=np.int64))
+        self.player_codes = pd.factorize(np.where(ids >= 0, ids.astype(str), names))[0]
+        self.name_keys = names.to_numpy()
+
+    @classmethod
+    def build(cls, seasons_df, shots=None, min_minutes=500):
+        """Index every player-season with at least `min_minutes` minutes"""
+        table = feature_table(seasons_df)
+        table = table[table['MIN_TOTAL'] >= min_minutes].reset_index(drop=True)
+        features = list(FEATURES)
+        if shots is not None and not shots.empty:
+            table = table.merge(shots, on=['SEASON', 'PLAYER_ID'], how='left')
+            features += [c for c in shots.columns if c.startswith('SHOT_')]
+        X = standardize(table, features)
+        return cls(table[KEY_COLUMNS], features, X)
+
+    # ---------- lookup ----------
+
+    def find(self, name, season=None):
+        """Row of a player's season (latest indexed season if not given)"""
+        rows = np.flatnonzero(self.name_keys == name_key(name))
+        if season:
+            rows = rows[self.columns['SEASON'][rows] == season]
+        if not len(rows):
+            raise KeyError(f"{name} {season or ''} is not in the index".strip())
+        return rows[np.argmax(self.columns['SEASON'][rows])]
+
+    # ---------- queries ----------
+
+    def neighbours(self, rows, k=20, exclude_same_player=True, batch=512):
+        """
+        (rows, distances) of the k nearest player-seasons to each query row,
+        nearest first. Distance is the RMS z-score gap over all features.
+        """
+        rows = np.atleast_1d(rows)
+        k = min(k, len(self.X) - 1)
+        tops, dists = [], []
+        for start in range(0, len(rows), batch):
+            q = rows[start:start + batch]
+            d2 = self.sq_norms[q, None] + self.sq_norms[None, :] - 2 * (self.X[q] @ self.X.T)
+            d2[np.arange(len(q)), q] = np.inf
+            if exclude_same_player:
+                d2[self.player_codes[q, None] == self.player_codes[None, :]] = np.inf
+            top = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(d2, top, axis=1), axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            tops.append(top)
+            dists.append(np.sqrt(np.maximum(np.take_along_axis(d2, top, axis=1), 0)
+                                 / len(self.features)))
+        return np.concatenate(tops), np.concatenate(dists)
+
+    def query(self, rows, k=20, exclude_same_player=True):
+        """neighbours() as a table: QUERY_PLAYER, QUERY_SEASON, RANK, keys, DISTANCE"""
+        rows = np.atleast_1d(rows)
+        top, dist = self.neighbours(rows, k, exclude_same_player)
+        k = top.shape[1]
+        found = pd.DataFrame({
+            'QUERY_PLAYER': np.repeat(self.columns['PLAYER_NAME'][rows], k),
+            'QUERY_SEASON': np.repeat(self.columns['SEASON'][rows], k),
+            'RANK': np.tile(np.arange(1, k + 1), len(rows)),
+            **{c: values[top.ravel()] for c, values in self.columns.items()},
+            'DISTANCE': dist.ravel().round(3),
+        })
+        return found[np.isfinite(found['DISTANCE'])].reset_index(drop=True)
+
+    def similar(self, name, season=None, k=20, exclude_same_player=True):
+        return self.query(self.find(name, season), k, exclude_same_player)
+
+    # ---------- persistence ----------
+
+    def save(self, path=INDEX_FILE):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, X=self.X, features=np.array(self.features),
+                     **{f'key_{c}': values.astype(str if c in TEXT_KEYS else float)
+                        for c, values in self.columns.items()})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        state = np.load(path, allow_pickle=False)
+        keys = pd.DataFrame({c: state[f'key_{c}'] for c in KEY_COLUMNS})
+        keys['PLAYER_ID'] = keys['PLAYER_ID'].astype(np.int64)
+        return cls(keys, list(state['features']), state['X'])
+
+
+def build_index(root=columnar_store.DEFAULT_ROOT, complete_file=COMPLETE_FILE, shots=False,
+                min_minutes=500, path=INDEX_FILE, complete_season_label=COMPLETE_SEASON):
+    """Index the warehouse seasons plus the COMPLETE file's season if it is not stored yet"""
+    frames = [warehouse_seasons(root)]
+    current = complete_season(complete_file, complete_season_label)
+    if not current.empty and (frames[0].empty
+                              or current['SEASON'].iloc[0] not in set(frames[0]['SEASON'])):
+        frames.append(current)
+    data = pd.concat([f for f in frames if not f.empty], ignore_index=True) if any(
+        not f.empty for f in frames) else pd.DataFrame()
+    if data.empty:
+        return None
+
+    mix = shot_mix(sorted(data['SEASON'].unique())) if shots else None
+    index = SimilarityIndex.build(data, mix, min_minutes)
+    index.save(path)
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Most similar player-seasons in history")
+    parser.add_argument('player', nargs='?', help="Player name, e.g. \"Nikola Jokic\"")
+    parser.add_argument('--season', default=None)
+    parser.add_argument('-k', type=int, default=20)
+    parser.add_argument('--build', action='store_true', help="(Re)build the index first")
+    parser.add_argument('--shots', action='store_true',
+                        help="Include shot-zone mix (needs shot_zones.py profiles)")
+    parser.add_argument('--min-minutes', type=int, default=500)
+    parser.add_argument('--include-same-player', action='store_true',
+                        help="Also return the player's own other seasons")
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    parser.add_argument('--complete-file', default=COMPLETE_FILE)
+    parser.add_argument('--complete-season', default=COMPLETE_SEASON,
+                        help=f"Season of the COMPLETE file (default: {COMPLETE_SEASON})")
+    parser.add_argument('--index', default=INDEX_FILE)
+    args = parser.parse_args()
+
+    if args.build or not os.path.exists(args.index):
+        print("="*70)
+        print("BUILDING SIMILARITY INDEX")
+        print("="*70)
+        index = build_index(args.root, args.complete_file, args.shots, args.min_minutes,
+                            args.index, args.complete_season)
+        if index is None:
+            print(f"[ERROR] No player stats under {args.root} or in {args.complete_file}")
+            raise SystemExit(1)
+        print(f"[OK] {len(index.keys)} player-seasons, {index.keys['SEASON'].nunique()} seasons, "
+              f"{len(index.features)} features")
+        print(f"[SAVED] {args.index}")
+    else:
+        index = SimilarityIndex.load(args.index)
+
+    if args.player:
+        started = time.perf_counter()
+        try:
+            result = index.similar(args.player, args.season, args.k,
+                                   not args.include_same_player)
+        except KeyError as e:
+            print(f"[ERROR] {e.args[0]}")
+            raise SystemExit(1)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"\n{args.k} most similar to {result['QUERY_PLAYER'].iloc[0]} "
+              f"({result['QUERY_SEASON'].iloc[0]}) - {elapsed:.1f} ms")
+        print(result[['RANK', 'SEASON', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'DISTANCE']]
+              .to_string(index=False))
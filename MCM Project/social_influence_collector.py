@@ -3,19 +3,72 @@ Social Influence & Market Data Collector
 Collects social media metrics, Google Trends, and demographic data
 """
 
+import numpy as np
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-import time
 import os
-from pytrends.request import TrendReq
-
+import re
+import unicodedata
+from bisect import bisect_left
+import instrumentation
+from timeseries_store import TimeSeriesStore
+from trends_planner import TrendsPlanner
+
+# Follower-count template columns -> time-series store metrics
+SOCIAL_METRICS = {
+    'Instagram_Followers': 'instagram_followers',
+    'Twitter_Followers': 'twitter_followers',
+    'Facebook_Followers': 'facebook_followers',
+    'TikTok_Followers': 'tiktok_followers',
+    'YouTube_Subscribers': 'youtube_subscribers',
+}
+GROWTH_COLUMNS = {
+    'Instagram_30Day_Growth': 'Instagram_Followers',
+    'Twitter_30Day_Growth': 'Twitter_Followers',
+}
+
+
+def normalize_place(name):
+    """'Montréal' / 'St. Louis' -> 'montreal' / 'st louis' for name matching"""
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+
+def place_name(city):
+    """'Kansas City MO' -> 'Kansas City' (drop the state/province code)"""
+    return city.rsplit(' ', 1)[0]
+
+
+class PlaceIndex:
+    """Row lookup by normalized place name: exact match, else the first name it prefixes"""
+
+    def __init__(self, names):
+        self.rows = {}
+        for row, name in enumerate(names):
+            self.rows.setdefault(normalize_place(name), row)
+        self.keys = sorted(self.rows)
+
+    def find(self, name):
+        key = normalize_place(name)
+        if key in self.rows:
+            return self.rows[key]
+        # 'seattle' -> 'seattle tacoma'
+        i = bisect_left(self.keys, key + ' ')
+        if i < len(self.keys) and self.keys[i].startswith(key + ' '):
+            return self.rows[self.keys[i]]
+        return None
+
+@instrumentation.instrument_class
 class SocialInfluenceCollector:
     def __init__(self):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         self.delay = 3
+        self.trends = TrendsPlanner(delay=self.delay)
+        self.store = TimeSeriesStore()
 
     def get_google_trends_by_city(self, keywords, cities_geo_codes):
         """
@@ -24,6 +77,8 @@ class SocialInfluenceCollector:
         print(f"\n[1/5] Fetching Google Trends by city...")
 
         try:
+            from pytrends.request import TrendReq
+
             pytrends = TrendReq(hl='en-US', tz=360)
 
             all_data = []
@@ -45,7 +100,7 @@ class SocialInfluenceCollector:
 
                     all_data.append(regional)
 
-                time.sleep(self.delay)
+                instrumentation.throttle(self.delay)
 
             if all_data:
                 combined = pd.concat(all_data, ignore_index=True)
@@ -58,9 +113,11 @@ class SocialInfluenceCollector:
 
         return pd.DataFrame()
 
-    def get_expansion_city_trends(self):
+    def get_expansion_city_trends(self, expansion_keywords=None):
         """
-        Focused trends for potential expansion cities
+        Focused trends for potential expansion cities. Each distinct
+        (keyword, country) is one Trends request; cities are then looked up in
+        a normalized-name index of the regional frame.
         """
         print(f"\n[2/5] Analyzing expansion city search interest...")
 
@@ -74,57 +131,69 @@ class SocialInfluenceCollector:
             'Nashville TN': 'US-TN-659',
             'Austin TX': 'US-TX-635',
             'Vancouver BC': 'CA-BC',  # Canada
-            'Montreal QC': 'CA-QC'
+            'Montreal QC': 'CA-QC',
+            'Baltimore MD': 'US-MD-512',
+            'St. Louis MO': 'US-MO-609'
         }
 
-        keywords = ['NBA', 'NBA expansion', 'Seattle NBA', 'Las Vegas NBA', 'professional basketball']
-
-        try:
-            pytrends = TrendReq(hl='en-US', tz=360)
-
-            results = []
-
-            for city, geo_code in list(expansion_cities.items())[:5]:  # Sample cities
-                print(f"  - Analyzing: {city}")
-
-                try:
-                    # Get interest for this specific geo location
-                    pytrends.build_payload(['NBA'], timeframe='today 12-m', geo=geo_code.split('-')[0])
-
-                    regional = pytrends.interest_by_region(resolution='CITY', inc_low_vol=True)
-
-                    if not regional.empty:
-                        # Get the specific city's interest
-                        city_name = city.split()[0]  # Extract city name
-                        matching_rows = regional[regional.index.str.contains(city_name, case=False, na=False)]
-
-                        if not matching_rows.empty:
-                            interest_score = matching_rows['NBA'].values[0]
-                            results.append({
-                                'City': city,
-                                'NBA_Search_Interest': interest_score,
-                                'Geo_Code': geo_code
-                            })
-
-                    time.sleep(self.delay)
-
-                except Exception as e:
-                    print(f"    [WARNING] Could not get data for {city}: {e}")
-                    results.append({
-                        'City': city,
-                        'NBA_Search_Interest': 0,
-                        'Geo_Code': geo_code
-                    })
-
-            if results:
-                df = pd.DataFrame(results)
-                print(f"[OK] Analyzed {len(df)} expansion cities")
-                return df
-
-        except Exception as e:
-            print(f"[ERROR] {e}")
+        if expansion_keywords is None:
+            expansion_keywords = ['NBA', 'NBA expansion', 'Seattle NBA', 'Las Vegas NBA',
+                                  'professional basketball']
+        # Output column per keyword; '<City> NBA' terms fill Local_Team_Search for that city
+        keyword_columns = {
+            'NBA': 'NBA_Search_Interest',
+            'NBA expansion': 'NBA_Expansion_Search',
+            'professional basketball': 'Basketball_Interest_Index'
+        }
 
-        return self.create_expansion_trends_template()
+        places = {city: place_name(city) for city in expansion_cities}
+        country = {city: code.split('-')[0] for city, code in expansion_cities.items()}
+        results = pd.DataFrame({'City': list(expansion_cities)}).set_index('City', drop=False)
+        for column in ['NBA_Search_Interest', 'NBA_Expansion_Search', 'Local_Team_Search',
+                       'Basketball_Interest_Index']:
+            results[column] = 0
+
+        # Distinct (keyword, country) requests: general terms in every country,
+        # a city's own term only in its country
+        requests_needed = {}
+        for keyword in expansion_keywords:
+            local = [city for city, name in places.items()
+                     if normalize_place(keyword).startswith(normalize_place(name) + ' ')]
+            geos = sorted({country[c] for c in local} if local else set(country.values()))
+            for geo in geos:
+                requests_needed[(keyword, geo)] = local
+
+        fetched = 0
+        for (keyword, geo), local in requests_needed.items():
+            print(f"  - Searching: {keyword} ({geo})")
+            try:
+                regional = self.trends.fetch('region', [keyword], geo=geo)
+            except Exception as e:
+                print(f"    [WARNING] Could not get data for {keyword} in {geo}: {e}")
+                continue
+            if regional.empty:
+                continue
+            fetched += 1
+
+            index = PlaceIndex(regional.index)
+            values = regional[keyword].to_numpy()
+            column = 'Local_Team_Search' if local else keyword_columns.get(
+                keyword, f"{keyword.replace(' ', '_')}_Search")
+            for city in local or [c for c in expansion_cities if country[c] == geo]:
+                row = index.find(places[city])
+                if row is not None:
+                    results.loc[city, column] = values[row]
+                else:
+                    print(f"    [WARNING] {places[city]} not in the {geo} regional data")
+
+        if not fetched:
+            return self.create_expansion_trends_template()
+
+        results['Geo_Code'] = [expansion_cities[c] for c in results['City']]
+        results['Data_Source'] = 'Google Trends'
+        print(f"[OK] Analyzed {len(results)} expansion cities "
+              f"({len(requests_needed)} Trends payloads)")
+        return results.reset_index(drop=True)
 
     def create_expansion_trends_template(self):
         """
@@ -182,9 +251,62 @@ class SocialInfluenceCollector:
         print("\n[INSTRUCTIONS]:")
         print("  1. Visit Social Blade: https://socialblade.com/")
         print("  2. Search for each player's accounts")
-        print("  3. Record follower counts and 30-day growth")
-        print("  4. Calculate Growth_Momentum_Score = (30Day_Growth / Total_Followers) * 100")
+        print("  3. Record follower counts in this file")
+        print("  4. Re-run: counts are stored as snapshots, and 30-day growth and")
+        print("     Growth_Momentum_Score are filled in from the stored history")
+
+        return df
 
+    def record_social_snapshots(self, files):
+        """
+        Store the follower counts filled into last run's detailed files as
+        snapshots, timestamped by the file's modification time. Counts equal
+        to the last stored ones are skipped, so re-reading a file adds nothing.
+        """
+        for filepath, kind, name_column in files:
+            if not os.path.exists(filepath):
+                continue
+            df = pd.read_csv(filepath)
+            taken = pd.Timestamp(os.path.getmtime(filepath), unit='s').floor('s')
+            stored = self.store.record_snapshot(kind, df, name_column, SOCIAL_METRICS, taken,
+                                                skip_unchanged=True)
+            print(f"[INFO] {stored} new follower counts from {filepath}")
+
+    def fill_social_growth(self, df, kind, name_column, days=30):
+        """
+        Latest follower counts, 30-day growth, Growth_Momentum_Score and
+        Monthly_Growth_Rate from the store's daily rollups
+        """
+        names = df[name_column]
+        filled = pd.Series(False, index=df.index)
+        latest, growth, momentum = {}, {}, {}
+        for column, metric in SOCIAL_METRICS.items():
+            if column not in df:
+                continue
+            stats = self.store.momentum(kind, metric, days).set_index('NAME')
+            latest[column] = names.map(stats['LATEST'])
+            growth[column] = names.map(stats['GROWTH'])
+            momentum[column] = names.map(stats['MOMENTUM'])
+            df[column] = latest[column].fillna(df[column]).round().astype(np.int64)
+            filled |= latest[column].notna()
+        if not filled.any():
+            return df
+
+        for column, followers in GROWTH_COLUMNS.items():
+            if column in df and followers in growth:
+                df[column] = growth[followers].fillna(0).round().astype(np.int64)
+        if 'Total_Social_Reach' in df:
+            df['Total_Social_Reach'] = df[list(latest)].sum(axis=1)
+        if 'Growth_Momentum_Score' in df:
+            df['Growth_Momentum_Score'] = momentum['Instagram_Followers'].fillna(0).round(3)
+        if 'Monthly_Growth_Rate' in df:
+            # All platforms together; platforms without an old enough count are left out
+            gained = pd.DataFrame(growth).sum(axis=1)
+            base = pd.DataFrame({c: latest[c].where(growth[c].notna()) for c in latest}).sum(axis=1)
+            df['Monthly_Growth_Rate'] = (100 * gained / base.where(base > 0)).fillna(0).round(3)
+        df.loc[filled, 'Data_Source'] = 'Time-Series Store'
+        print(f"[OK] Filled follower counts and {days}-day growth for {filled.sum()} {kind}s "
+              f"from stored snapshots")
         return df
 
     def create_team_social_media_template(self):
@@ -330,22 +452,31 @@ class SocialInfluenceCollector:
         os.makedirs('data', exist_ok=True)
 
         # Google Trends by city
-        expansion_keywords = ['NBA', 'NBA expansion', 'Seattle NBA', 'Las Vegas NBA']
-        trends_city = self.get_expansion_city_trends()
+        expansion_keywords = ['NBA', 'NBA expansion', 'Seattle NBA', 'Las Vegas NBA',
+                              'professional basketball']
+        trends_city = self.get_expansion_city_trends(expansion_keywords)
 
         filepath = 'data/3_google_trends_expansion_cities.csv'
         trends_city.to_csv(filepath, index=False)
         print(f"\n[SAVED] {filepath}")
 
+        # Follower counts typed into last run's files become snapshots
+        player_file = 'data/3_player_social_media_detailed.csv'
+        team_file = 'data/3_team_social_media_detailed.csv'
+        self.record_social_snapshots([(player_file, 'player', 'Player'),
+                                      (team_file, 'team', 'Team')])
+
         # Player social media template
         player_social = self.create_social_media_detailed_template()
-        filepath = 'data/3_player_social_media_detailed.csv'
+        player_social = self.fill_social_growth(player_social, 'player', 'Player')
+        filepath = player_file
         player_social.to_csv(filepath, index=False)
         print(f"[SAVED] {filepath}")
 
         # Team social media template
         team_social = self.create_team_social_media_template()
-        filepath = 'data/3_team_social_media_detailed.csv'
+        team_social = self.fill_social_growth(team_social, 'team', 'Team')
+        filepath = team_file
         team_social.to_csv(filepath, index=False)
         print(f"[SAVED] {filepath}")
 
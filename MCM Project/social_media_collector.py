@@ -5,13 +5,17 @@ Collects engagement metrics, search trends, and social media following
 
 import pandas as pd
 import requests
-from pytrends.request import TrendReq
-import time
 import os
+import instrumentation
+from timeseries_store import TimeSeriesStore
+from trends_planner import TrendsPlanner
 
+@instrumentation.instrument_class
 class SocialMediaCollector:
     def __init__(self):
         self.delay = 2
+        self.trends = TrendsPlanner(delay=self.delay)
+        self.store = TimeSeriesStore()
 
     def get_google_trends_teams(self, teams=None, timeframe='today 12-m'):
         """
@@ -26,27 +30,12 @@ class SocialMediaCollector:
         print(f"\n[SEARCH] Fetching Google Trends for {len(teams)} teams...")
 
         try:
-            pytrends = TrendReq(hl='en-US', tz=360)
+            # Batches share an anchor team, so every team is on one 0-100 scale
+            df = self.trends.interest_over_time(teams, timeframe=timeframe, anchor=teams[0])
 
-            all_data = []
-
-            # Process in batches of 5 (Google Trends limit)
-            for i in range(0, len(teams), 5):
-                batch = teams[i:i+5]
-
-                pytrends.build_payload(batch, timeframe=timeframe)
-                df = pytrends.interest_over_time()
-
-                if not df.empty:
-                    df = df.drop('isPartial', axis=1, errors='ignore')
-                    all_data.append(df)
-
-                time.sleep(self.delay)
-
-            if all_data:
-                combined = pd.concat(all_data, axis=1)
-                combined = combined.reset_index()
-                print(f"[OK] Collected trends data for {len(batch)} teams")
+            if not df.empty:
+                combined = df.reset_index()
+                print(f"[OK] Collected trends data for {len(teams)} teams")
                 return combined
 
         except Exception as e:
@@ -67,27 +56,12 @@ class SocialMediaCollector:
         print(f"\n[SEARCH] Fetching Google Trends for {len(players)} players...")
 
         try:
-            pytrends = TrendReq(hl='en-US', tz=360)
-
-            # Process in batches
-            all_data = []
+            # Batches share an anchor player, so every player is on one 0-100 scale
+            df = self.trends.interest_over_time(players, timeframe=timeframe, anchor=players[0])
 
-            for i in range(0, len(players), 5):
-                batch = players[i:i+5]
-
-                pytrends.build_payload(batch, timeframe=timeframe)
-                df = pytrends.interest_over_time()
-
-                if not df.empty:
-                    df = df.drop('isPartial', axis=1, errors='ignore')
-                    all_data.append(df)
-
-                time.sleep(self.delay)
-
-            if all_data:
-                combined = pd.concat(all_data, axis=1)
-                combined = combined.reset_index()
-                print(f"[OK] Collected trends data for players")
+            if not df.empty:
+                combined = df.reset_index()
+                print(f"[OK] Collected trends data for {len(players)} players")
                 return combined
 
         except Exception as e:
@@ -168,17 +142,12 @@ class SocialMediaCollector:
         print(f"\n[MAP] Fetching regional interest for: {keywords}")
 
         try:
-            pytrends = TrendReq(hl='en-US', tz=360)
-
-            pytrends.build_payload(keywords, timeframe='today 12-m', geo=geo)
-            regional = pytrends.interest_by_region(resolution='CITY', inc_low_vol=True)
+            regional = self.trends.interest_by_region(keywords, geo=geo)
 
             regional = regional.reset_index()
             regional = regional.sort_values(keywords[0], ascending=False)
 
             print(f"[OK] Collected regional data for {len(regional)} cities")
-
-            time.sleep(self.delay)
             return regional
 
         except Exception as e:
@@ -203,6 +172,10 @@ class SocialMediaCollector:
             trends_teams.to_csv(filepath, index=False)
             files_created.append(filepath)
             print(f"[OK] Saved to {filepath}")
+            # Each payload is 0-100 on its own; rescaled to the stored history
+            stored = self.store.record_scaled_series('team', 'trends_interest',
+                                                     trends_teams.set_index('date'))
+            print(f"[OK] {stored} new weekly points in the time-series store")
 
         # Google Trends - Players
         trends_players = self.get_google_trends_players()
@@ -211,6 +184,10 @@ class SocialMediaCollector:
             trends_players.to_csv(filepath, index=False)
             files_created.append(filepath)
             print(f"[OK] Saved to {filepath}")
+            # Each payload is 0-100 on its own; rescaled to the stored history
+            stored = self.store.record_scaled_series('player', 'trends_interest',
+                                                     trends_players.set_index('date'))
+            print(f"[OK] {stored} new weekly points in the time-series store")
 
         # Regional Interest
         regional = self.get_regional_interest(['NBA'])
@@ -0,0 +1,257 @@
+"""
+Stint Engine
+Rebuilds the ten players on court for every play-by-play event and cuts each
+game into stints - stretches with the same ten players - with both teams'
+points and possessions:
+
+    GAME_ID, PERIOD, START, END (seconds elapsed), HOME_TEAM_ID, AWAY_TEAM_ID,
+    HOME_1..HOME_5, AWAY_1..AWAY_5, HOME_PTS, AWAY_PTS, HOME_POSS, AWAY_POSS,
+    COMPLETE (exactly five players per side were identified)
+
+PlayByPlayV2 lists substitutions but not who starts each period. A player
+started the period if their first involvement in it (any event, or being
+subbed out) comes before their first sub-in. On-court state is then the
+period starters plus the cumulative sum of +1/-1 substitution deltas over an
+events x players matrix - a few array operations per game, no per-event
+loop. Games are spread over a process pool.
+
+    python stint_engine.py --season 2023-24 --workers 8
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+
+PBP_DATASET = 'play_by_play'
+DATASET = 'stints'
+
+# PlayByPlayV2 EVENTMSGTYPE codes
+FG_MADE, FG_MISSED, FREE_THROW, REBOUND, TURNOVER = 1, 2, 3, 4, 5
+SUBSTITUTION = 8
+# EVENTMSGACTIONTYPE of free throws that end a trip: 1 of 1, 2 of 2, 3 of 3
+LAST_FREE_THROW = [10, 12, 15]
+AND_ONE = 10
+
+LINEUP_COLUMNS = [f"{side}_{i}" for side in ('HOME', 'AWAY') for i in range(1, 6)]
+COLUMNS = (['GAME_ID', 'PERIOD', 'START', 'END', 'HOME_TEAM_ID', 'AWAY_TEAM_ID']
+           + LINEUP_COLUMNS + ['HOME_PTS', 'AWAY_PTS', 'HOME_POSS', 'AWAY_POSS', 'COMPLETE'])
+
+
+def period_start(period):
+    """Seconds elapsed at the start of a period (12-minute quarters, 5-minute OTs)"""
+    return np.where(period <= 4, (period - 1) * 720, 2880 + (period - 5) * 300)
+
+
+def period_length(period):
+    return np.where(period <= 4, 720, 300)
+
+
+def elapsed_seconds(period, clock):
+    """PCTIMESTRING ('11:34', time left in the period) -> seconds since tip-off"""
+    parts = clock.astype(str).str.split(':', expand=True).astype(float)
+    remaining = (parts[0] * 60 + parts[1]).to_numpy()
+    return period_start(period) + period_length(period) - remaining
+
+
+def _ids(events, column):
+    return pd.to_numeric(events[column], errors='coerce').fillna(0).to_numpy(np.int64)
+
+
+def event_arrays(events):
+    """
+    Column arrays of PlayByPlayV2 rows sorted by game, period and event
+    number; the text and clock parsing is done once for all games
+    """
+    ev = events.sort_values(['GAME_ID', 'PERIOD', 'EVENTNUM'], kind='stable')
+    text = (ev['HOMEDESCRIPTION'].fillna('') + ' ' + ev['VISITORDESCRIPTION'].fillna('')).str
+    period = ev['PERIOD'].to_numpy()
+    return {
+        'game': ev['GAME_ID'].to_numpy(),
+        'kind': ev['EVENTMSGTYPE'].to_numpy(),
+        'action': ev['EVENTMSGACTIONTYPE'].to_numpy(),
+        'period': period,
+        'elapsed': elapsed_seconds(period, ev['PCTIMESTRING']),
+        'pid': np.stack([_ids(ev, f'PLAYER{k}_ID') for k in (1, 2, 3)], axis=1),
+        'tid': np.stack([_ids(ev, f'PLAYER{k}_TEAM_ID') for k in (1, 2, 3)], axis=1),
+        'home_side': ev['HOMEDESCRIPTION'].notna().to_numpy(),
+        'missed': text.contains('MISS', regex=False).to_numpy(),
+        'three': text.contains('3PT', regex=False).to_numpy(),
+    }
+
+
+def game_stints(a):
+    """Stint columns (dict of arrays) of one game, given its event arrays"""
+    kind, action, period, elapsed = a['kind'], a['action'], a['period'], a['elapsed']
+    pid, tid, missed = a['pid'], a['tid'], a['missed']
+    n = len(kind)
+
+    # Home team: the team of players in events described from the home side
+    team_ids = np.unique(tid[tid > 0])
+    home_teams, counts = np.unique(tid[a['home_side'] & (tid[:, 0] > 0), 0], return_counts=True)
+    home = home_teams[np.argmax(counts)]
+    away = team_ids[team_ids != home][0]
+
+    # Player columns, ordered by id; a player's team is the one they appear for
+    valid = (pid > 0) & (tid > 0)
+    players, first_seen = np.unique(pid[valid], return_index=True)
+    player_team = tid[valid][first_seen]
+    col = np.where(valid, np.searchsorted(players, pid), -1)
+
+    is_sub = kind == SUBSTITUTION
+    rows = np.repeat(np.arange(n), 3).reshape(n, 3)
+    # Involvement: any non-substitution event, or being subbed out (PLAYER1)
+    involved = valid & ~is_sub[:, None]
+    involved[:, 0] |= is_sub & valid[:, 0]
+    sub_in = is_sub & valid[:, 1]
+
+    periods, pidx = np.unique(period, return_inverse=True)
+    first_act = np.full((len(periods), len(players)), n)
+    first_in = np.full((len(periods), len(players)), n)
+    np.minimum.at(first_act, (pidx[rows[involved]], col[involved]), rows[involved])
+    np.minimum.at(first_in, (pidx[sub_in], col[sub_in, 1]), np.flatnonzero(sub_in))
+    starters = (first_act < first_in).astype(np.int16)
+
+    # On court after each event: starters + cumulative substitution deltas
+    delta = np.zeros((n, len(players)), dtype=np.int16)
+    subs = np.flatnonzero(is_sub & valid[:, 0] & valid[:, 1])
+    np.add.at(delta, (subs, col[subs, 1]), 1)
+    np.add.at(delta, (subs, col[subs, 0]), -1)
+    cum = np.cumsum(delta, axis=0)
+    starts = np.flatnonzero(np.r_[True, period[1:] != period[:-1]])
+    before = np.vstack([np.zeros((1, len(players)), dtype=cum.dtype), cum])[starts]
+    on = starters[pidx] + cum - before[pidx]
+
+    # Scoring and possession ends, credited to the team with the ball
+    team = np.where(tid[:, 0] > 0, tid[:, 0], np.where(np.isin(pid[:, 0], team_ids), pid[:, 0], 0))
+    points = np.select([kind == FG_MADE, (kind == FREE_THROW) & ~missed],
+                       [np.where(a['three'], 3, 2), 1], 0)
+    shot = (kind == FG_MISSED) | ((kind == FREE_THROW) & missed)
+    last_shot = np.maximum.accumulate(np.where(shot, np.arange(n), -1))
+    shot_team = np.where(last_shot >= 0, team[np.maximum(last_shot, 0)], 0)
+    # A 1-of-1 free throw after a made basket at the same time (and-one) is
+    # part of that possession
+    moment = elapsed.astype(np.int64) * 2 + (team == home)
+    and_one = ((kind == FREE_THROW) & (action == AND_ONE)
+               & np.isin(moment, moment[kind == FG_MADE]))
+    defensive_rebound = (kind == REBOUND) & (team > 0) & (team != shot_team)
+    ends = ((kind == FG_MADE) | (kind == TURNOVER)
+            | ((kind == FREE_THROW) & np.isin(action, LAST_FREE_THROW) & ~missed & ~and_one))
+    poss_team = np.where(ends, team, np.where(defensive_rebound, shot_team, 0))
+
+    # Stints: runs of events with the same players on court
+    change = np.r_[True, np.any(on[1:] != on[:-1], axis=1) | (period[1:] != period[:-1])]
+    first = np.flatnonzero(change)
+    start = elapsed[first]
+    stint_period = period[first]
+    last_in_period = np.r_[stint_period[1:] != stint_period[:-1], True]
+    end = np.where(last_in_period, period_start(stint_period) + period_length(stint_period),
+                   np.r_[start[1:], 0])
+
+    m = len(first)
+    out = {
+        'GAME_ID': np.repeat(a['game'][0], m),
+        'PERIOD': stint_period,
+        'START': start,
+        'END': end,
+        'HOME_TEAM_ID': np.repeat(home, m),
+        'AWAY_TEAM_ID': np.repeat(away, m),
+    }
+    lineup_on = on[first]
+    sizes = []
+    for side, team_id in (('HOME', home), ('AWAY', away)):
+        sel = (lineup_on == 1) & (player_team == team_id)
+        order = np.argsort(~sel, axis=1, kind='stable')[:, :5]
+        ids = players[order]
+        ids[~np.take_along_axis(sel, order, axis=1)] = 0
+        for i in range(5):
+            out[f"{side}_{i + 1}"] = ids[:, i] if ids.shape[1] > i else np.zeros(m, np.int64)
+        sizes.append(sel.sum(axis=1))
+    out['HOME_PTS'] = np.add.reduceat(points * (team == home), first)
+    out['AWAY_PTS'] = np.add.reduceat(points * (team == away), first)
+    out['HOME_POSS'] = np.add.reduceat((poss_team == home).astype(int), first)
+    out['AWAY_POSS'] = np.add.reduceat((poss_team == away).astype(int), first)
+    well_formed = np.all((on == 0) | (on == 1), axis=1)
+    out['COMPLETE'] = (sizes[0] == 5) & (sizes[1] == 5) & np.logical_and.reduceat(well_formed, first)
+
+    # Back-to-back substitutions leave empty in-between states
+    keep = (end > start) | (out['HOME_PTS'] + out['AWAY_PTS']
+                            + out['HOME_POSS'] + out['AWAY_POSS'] > 0)
+    return {name: values[keep] for name, values in out.items()}
+
+
+def _stints_chunk(events):
+    if events.empty:
+        return pd.DataFrame(columns=COLUMNS)
+    a = event_arrays(events)
+    bounds = np.flatnonzero(np.r_[True, a['game'][1:] != a['game'][:-1], True])
+    parts = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        try:
+            parts.append(game_stints({name: values[lo:hi] for name, values in a.items()}))
+        except Exception as e:
+            print(f"[WARNING] Game {a['game'][lo]}: {e}")
+    if not parts:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.DataFrame({name: np.concatenate([p[name] for p in parts]) for name in COLUMNS})
+
+
+def stints(events, workers=None):
+    """
+    Stint table for every game in `events` (PlayByPlayV2 rows). With more
+    than one worker, games are split into chunks across a process pool.
+    """
+    workers = workers or os.cpu_count() or 1
+    game_ids = events['GAME_ID'].unique()
+    if workers == 1 or len(game_ids) < 4 * workers:
+        return _stints_chunk(events)
+
+    groups = np.array_split(game_ids, workers * 4)
+    chunks = [events[events['GAME_ID'].isin(ids)] for ids in groups]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(_stints_chunk, chunks))
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_season_stints(season, root=columnar_store.DEFAULT_ROOT, workers=None):
+    """Reconstruct the stored play-by-play of a season into its stints partition"""
+    events = columnar_store.read_dataset(root, PBP_DATASET, season=season)
+    if events.empty:
+        print(f"[WARNING] No play-by-play stored for {season}")
+        return pd.DataFrame(columns=COLUMNS)
+    df = stints(events, workers)
+    columnar_store.write_partition(df, root, DATASET, {'season': season})
+    return df
+
+
+def load_stints(seasons=None, root=columnar_store.DEFAULT_ROOT, complete_only=True):
+    """Stored stints, by default only those with five identified players per side"""
+    filters = {'season': seasons} if seasons else {}
+    df = columnar_store.read_dataset(root, DATASET, **filters)
+    if complete_only and not df.empty:
+        df = df[df['COMPLETE']]
+    return df
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Rebuild lineup stints from stored play-by-play")
+    parser.add_argument('--season', required=True)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    print("="*70)
+    print(f"STINT RECONSTRUCTION - {args.season}")
+    print("="*70)
+    started = time.monotonic()
+    df = build_season_stints(args.season, args.root, args.workers)
+    if not df.empty:
+        print(f"[OK] {len(df)} stints from {df['GAME_ID'].nunique()} games "
+              f"in {time.monotonic() - started:.1f}s ({(~df['COMPLETE']).sum()} incomplete)")
+        print(f"[SAVED] {columnar_store.partition_path(args.root, DATASET, {'season': args.season})}")
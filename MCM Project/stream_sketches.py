@@ -0,0 +1,417 @@
+"""
+Stream Sketches
+Live, memory-bounded mention tracking for buzz during busy news cycles (the
+trade deadline) without storing every event. Per time window it keeps:
+
+  - Space-Saving top-K of mentioned players ("trending right now")
+  - Count-Min mention counts for any player
+  - HyperLogLog unique authors, overall and per mentioned player
+
+Every sketch merges with another of the same shape - windows into longer
+periods, and sketches built by separate workers into one (Sketches.merge).
+Windows are hourly for the last two days and rolled up into days for a
+month, so memory stays bounded (~10 MB with 600 players mentioned every
+hour) however many events stream through.
+
+reddit_ingester.py feeds each batch it writes to a MentionTracker; the state
+is saved in data/sketches/<stream>.pkl and data/4_live_buzz.csv holds the live
+Media_Buzz_Score inputs per player:
+
+    Player, Mentions_24h, Unique_Authors_24h, Mentions_7d, Unique_Authors_7d, Trending_Rank
+
+    python stream_sketches.py --last 24h --top 10
+"""
+
+import os
+import pickle
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import reddit_ingester
+
+SKETCH_DIR = os.path.join('data', 'sketches')
+PLAYERS_FILE = os.path.join('data', '1_player_basic_stats.csv')
+TOP_K = 200
+HOURS_KEPT = 48
+DAYS_KEPT = 31
+ENTITY_P = 8  # unique authors per player: ~6.5% error, 256 bytes per player and window
+
+_rng = np.random.default_rng(7)  # fixed: sketches from different workers must agree
+CM_A = _rng.integers(1, 2**63, 8, dtype=np.uint64) | np.uint64(1)
+CM_B = _rng.integers(0, 2**63, 8, dtype=np.uint64)
+
+
+def hashes(items):
+    return pd.util.hash_array(np.asarray(items, dtype=object))
+
+
+def bit_length(x):
+    """Bit length of every uint64 (0 for 0)"""
+    x = x.copy()
+    n = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= (np.uint64(1) << np.uint64(shift))
+        n += shift * big
+        x = np.where(big, x >> np.uint64(shift), x)
+    return n + (x > 0)
+
+
+class SpaceSaving:
+    """Top-K heavy hitters; counts are upper bounds, count - error lower bounds"""
+
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+
+    def floor(self):
+        """Count any untracked item may have (0 until the summary is full)"""
+        return min(self.counts.values()) if len(self.counts) >= self.k else 0
+
+    def update(self, items):
+        for item, weight in Counter(items).most_common():
+            if item in self.counts:
+                self.counts[item] += int(weight)
+            elif len(self.counts) < self.k:
+                self.counts[item] = int(weight)
+                self.errors[item] = 0
+            else:
+                evict = min(self.counts, key=self.counts.get)
+                floor = self.counts.pop(evict)
+                del self.errors[evict]
+                self.counts[item] = floor + int(weight)
+                self.errors[item] = floor
+
+    def merge(self, other):
+        out = SpaceSaving(max(self.k, other.k))
+        floors = (self.floor(), other.floor())
+        for item in set(self.counts) | set(other.counts):
+            out.counts[item] = (self.counts.get(item, floors[0])
+                                + other.counts.get(item, floors[1]))
+            out.errors[item] = (self.errors.get(item, floors[0])
+                                + other.errors.get(item, floors[1]))
+        for item in sorted(out.counts, key=out.counts.get)[:max(0, len(out.counts) - out.k)]:
+            del out.counts[item], out.errors[item]
+        return out
+
+    def top(self, n=10):
+        """(item, count, guaranteed) of the n heaviest items"""
+        items = sorted(self.counts, key=self.counts.get, reverse=True)[:n]
+        return [(i, self.counts[i], self.counts[i] - self.errors[i]) for i in items]
+
+
+def hll_registers(h, p):
+    """(register, rank) of each 64-bit hash for 2^p registers"""
+    index = (h >> np.uint64(64 - p)).astype(np.int64)
+    rest = h & np.uint64((1 << (64 - p)) - 1)
+    return index, (64 - p - bit_length(rest) + 1).astype(np.uint8)
+
+
+def hll_count(registers):
+    """HyperLogLog estimate from the registers (last axis)"""
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    zeros = (registers == 0).sum(axis=-1)
+    with np.errstate(divide='ignore'):
+        small = m * np.log(m / np.maximum(zeros, 1))  # linear counting for small sets
+    return np.rint(np.where((estimate <= 2.5 * m) & (zeros > 0), small, estimate)).astype(np.int64)
+
+
+class HyperLogLog:
+    """Distinct count in 2^p one-byte registers (~1.04 / sqrt(2^p) relative error)"""
+
+    def __init__(self, p=12):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, items):
+        self.add(hashes(items))
+
+    def add(self, h):
+        """Update with 64-bit hashes of the items"""
+        if len(h):
+            np.maximum.at(self.registers, *hll_registers(h, self.p))
+
+    def merge(self, other):
+        out = HyperLogLog(self.p)
+        out.registers = np.maximum(self.registers, other.registers)
+        return out
+
+    def count(self):
+        return int(hll_count(self.registers))
+
+
+class CountMin:
+    """Frequency of any item; overestimates by at most e/width of the total w.p. 1 - e^-depth"""
+
+    def __init__(self, width=2048, depth=4):
+        self.bits = int(width - 1).bit_length()
+        self.table = np.zeros((depth, 1 << self.bits), dtype=np.int64)
+
+    def columns(self, h):
+        with np.errstate(over='ignore'):
+            return [((h * CM_A[d] + CM_B[d]) >> np.uint64(64 - self.bits)).astype(np.int64)
+                    for d in range(len(self.table))]
+
+    def update(self, items, weights=1):
+        self.add(hashes(items), weights)
+
+    def add(self, h, weights=1):
+        """Update with 64-bit hashes of the items"""
+        for row, cols in zip(self.table, self.columns(h)):
+            np.add.at(row, cols, weights)
+
+    def merge(self, other):
+        out = CountMin(self.table.shape[1], len(self.table))
+        out.table = self.table + other.table
+        return out
+
+    def query(self, items):
+        if not len(items):
+            return np.array([], dtype=np.int64)
+        return np.min([row[cols] for row, cols in zip(self.table, self.columns(hashes(items)))],
+                      axis=0)
+
+
+class Window:
+    """
+    The sketches of one time window. Unique authors per entity are one
+    HyperLogLog (2^ENTITY_P registers) per row of a matrix, so a batch
+    updates every entity at once.
+    """
+
+    def __init__(self):
+        self.events = 0
+        self.top = SpaceSaving()
+        self.volume = CountMin()
+        self.authors = HyperLogLog(12)
+        self.rows = {}  # entity -> row of entity_registers
+        self.entity_registers = np.zeros((0, 1 << ENTITY_P), dtype=np.uint8)
+
+    def update(self, entities, authors, entity_hashes=None, author_hashes=None):
+        """One event per (entity, author) mention pair; pass hashes if already computed"""
+        entities = np.asarray(entities, dtype=object)
+        entity_hashes = hashes(entities) if entity_hashes is None else entity_hashes
+        author_hashes = hashes(authors) if author_hashes is None else author_hashes
+        self.events += len(entities)
+        self.top.update(entities)
+        self.volume.add(entity_hashes)
+        self.authors.add(author_hashes)
+        new = [e for e in pd.unique(entities) if e not in self.rows]
+        self.rows.update({e: len(self.rows) + i for i, e in enumerate(new)})
+        if new:
+            self.entity_registers = np.vstack([
+                self.entity_registers, np.zeros((len(new), 1 << ENTITY_P), dtype=np.uint8)])
+        register, rank = hll_registers(author_hashes, ENTITY_P)
+        rows = np.fromiter((self.rows[e] for e in entities), dtype=np.int64, count=len(entities))
+        np.maximum.at(self.entity_registers, (rows, register), rank)
+
+    def unique_authors(self, entity):
+        row = self.rows.get(entity)
+        return 0 if row is None else int(hll_count(self.entity_registers[row]))
+
+    def merge(self, other):
+        out = Window()
+        out.events = self.events + other.events
+        out.top = self.top.merge(other.top)
+        out.volume = self.volume.merge(other.volume)
+        out.authors = self.authors.merge(other.authors)
+        out.rows = dict(self.rows)
+        out.rows.update({e: len(out.rows) + i for i, e in
+                         enumerate(e for e in other.rows if e not in self.rows)})
+        out.entity_registers = np.zeros((len(out.rows), 1 << ENTITY_P), dtype=np.uint8)
+        out.entity_registers[:len(self.rows)] = self.entity_registers
+        theirs = np.fromiter((out.rows[e] for e in other.rows), dtype=np.int64,
+                             count=len(other.rows))
+        out.entity_registers[theirs] = np.maximum(out.entity_registers[theirs],
+                                                  other.entity_registers)
+        return out
+
+
+class Sketches:
+    """Hourly windows for HOURS_KEPT hours, rolled up into days for DAYS_KEPT days"""
+
+    def __init__(self):
+        self.hours = {}  # pd.Timestamp (hour start) -> Window
+        self.days = {}   # pd.Timestamp (day start) -> Window
+
+    def update(self, timestamps, entities, authors):
+        """Mentions at `timestamps` (unix seconds) of `entities` by `authors`"""
+        if not len(entities):
+            return
+        hours = pd.to_datetime(np.asarray(timestamps, dtype=np.int64), unit='s').floor('h')
+        entities = np.asarray(entities, dtype=object)
+        authors = np.asarray(authors, dtype=object)
+        entity_hashes, author_hashes = hashes(entities), hashes(authors)
+        for hour, rows in pd.Series(np.arange(len(hours))).groupby(hours).indices.items():
+            self.hours.setdefault(pd.Timestamp(hour), Window()).update(
+                entities[rows], authors[rows], entity_hashes[rows], author_hashes[rows])
+        self.roll_up()
+
+    def roll_up(self, now=None):
+        """Fold hours older than HOURS_KEPT into their day; drop days beyond DAYS_KEPT"""
+        now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+        for hour in [h for h in self.hours if h < now - pd.Timedelta(hours=HOURS_KEPT)]:
+            window = self.hours.pop(hour)
+            day = hour.floor('D')
+            self.days[day] = self.days[day].merge(window) if day in self.days else window
+        for day in [d for d in self.days if d < now - pd.Timedelta(days=DAYS_KEPT)]:
+            del self.days[day]
+
+    def merge(self, other):
+        """Combine with sketches built elsewhere (another worker or run)"""
+        out = Sketches()
+        for mine, theirs, into in ((self.hours, other.hours, out.hours),
+                                   (self.days, other.days, out.days)):
+            for key in set(mine) | set(theirs):
+                a, b = mine.get(key), theirs.get(key)
+                into[key] = (a or Window()).merge(b or Window())
+        out.roll_up()
+        return out
+
+    def window(self, last='24h', now=None):
+        """One Window merged over the last period; rolled-up days count whole"""
+        now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+        since = now - pd.Timedelta(last)
+        merged = Window()
+        for start, window in self.hours.items():
+            if start + pd.Timedelta(hours=1) > since:
+                merged = merged.merge(window)
+        for start, window in self.days.items():
+            if start + pd.Timedelta(days=1) > since:
+                merged = merged.merge(window)
+        return merged
+
+
+# ---------- mentions from the social ingesters ----------
+
+def load_players(path=PLAYERS_FILE):
+    """League player names, from the player stats table (media buzz players if missing)"""
+    import sentiment_engine
+
+    if os.path.exists(path):
+        names = pd.read_csv(path, usecols=['Player'])['Player'].dropna().astype(str)
+        return sorted(set(names) | set(sentiment_engine.MEDIA_PLAYERS))
+    return list(sentiment_engine.MEDIA_PLAYERS)
+
+
+def tokens(texts):
+    return pd.Series(list(texts), dtype=object).fillna('').astype(str).str.lower() \
+        .str.findall(r"[a-z0-9]+")
+
+
+class MentionTracker:
+    """
+    Ingester listener: finds full player names in each written batch and
+    feeds (player, author, time) mentions into the sketches of `stream`.
+    Checkpoints deliver each comment once; a submission found by several
+    keyword searches of one run is counted once (submission IDs are kept
+    for the tracker's lifetime only, never saved).
+    """
+
+    def __init__(self, stream='reddit', players=None, sketch_dir=SKETCH_DIR):
+        self.path = os.path.join(sketch_dir, f"{stream}.pkl")
+        self.sketches, self.seen = Sketches(), set()
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                self.sketches = pickle.load(f)['sketches']
+        names = players or load_players()
+        # Names as token n-grams, matched against n-grams of the text
+        self.names = {}
+        for name in names:
+            key = ' '.join(tokens([name])[0])
+            if key.count(' ') >= 1:
+                self.names[key] = name
+        self.lengths = sorted({k.count(' ') + 1 for k in self.names})
+
+    def mentions(self, texts):
+        """(text row, player) of every distinct player named in each text"""
+        words = tokens(texts).explode().dropna()
+        doc, words = words.index.to_numpy(), words.to_numpy(dtype=object)
+        rows, found = [], []
+        for n in self.lengths:
+            if len(words) < n:
+                continue
+            same = doc[:len(doc) - n + 1] == doc[n - 1:]
+            grams = pd.Series(words[:len(words) - n + 1])
+            for k in range(1, n):
+                grams = grams + ' ' + words[k:len(words) - n + 1 + k]
+            grams = grams.to_numpy()[same]
+            starts = np.flatnonzero(same)
+            hit = pd.Series(grams).isin(self.names).to_numpy()
+            rows.append(doc[starts[hit]])
+            found.append([self.names[g] for g in grams[hit]])
+        if not rows:
+            return pd.DataFrame({'ROW': [], 'PLAYER': []})
+        df = pd.DataFrame({'ROW': np.concatenate(rows), 'PLAYER': np.concatenate(found)})
+        return df.drop_duplicates()
+
+    def __call__(self, dataset, df):
+        """Listener for RedditIngester: one batch of written submissions/comments"""
+        if dataset == reddit_ingester.SUBMISSIONS:
+            df = df[~df['ID'].isin(self.seen).to_numpy() & ~df['ID'].duplicated().to_numpy()]
+            self.seen.update(df['ID'])
+        if df.empty:
+            return
+        found = self.mentions(reddit_ingester.text_of(df, dataset))
+        if found.empty:
+            return
+        rows = found['ROW'].to_numpy()
+        self.sketches.update(df['CREATED_UTC'].to_numpy()[rows], found['PLAYER'].to_numpy(),
+                             df['AUTHOR'].fillna('[deleted]').astype(str).to_numpy()[rows])
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump({'sketches': self.sketches}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+    def live_buzz(self, players=None, now=None):
+        """Live Media_Buzz_Score inputs per player from the sketches"""
+        day, week = self.sketches.window('24h', now), self.sketches.window('7D', now)
+        trending = [item for item, _, _ in day.top.top(len(day.top.counts))]
+        players = list(players) if players is not None else trending
+        rank = {p: i + 1 for i, p in enumerate(trending)}
+        df = pd.DataFrame({'Player': players})
+        for label, window in (('24h', day), ('7d', week)):
+            mentions = window.volume.query(players) if players else np.array([], dtype=np.int64)
+            authors = np.array([window.unique_authors(p) for p in players], dtype=np.int64)
+            df[f"Mentions_{label}"] = mentions
+            # HLL error can overshoot small counts; a mention has one author
+            df[f"Unique_Authors_{label}"] = np.minimum(authors, mentions)
+        df['Trending_Rank'] = [rank.get(p, 0) for p in players]
+        return df
+
+    def write_live_buzz(self, players=None):
+        import sentiment_engine
+
+        df = self.live_buzz(players or sentiment_engine.MEDIA_PLAYERS)
+        os.makedirs('data', exist_ok=True)
+        filepath = os.path.join('data', '4_live_buzz.csv')
+        df.to_csv(filepath, index=False)
+        print(f"[SAVED] {filepath}")
+        return df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Trending players and unique authors from the live sketches")
+    parser.add_argument('--stream', default='reddit-nba')
+    parser.add_argument('--last', default='24h', help="Period, e.g. 1h, 24h, 7D")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    tracker = MentionTracker(args.stream)
+    window = tracker.sketches.window(args.last)
+    authors = min(window.authors.count(), window.events)
+    print(f"[OK] {window.events:,} mentions by ~{authors:,} authors in the last {args.last}")
+    for i, (player, count, guaranteed) in enumerate(window.top.top(args.top), 1):
+        authors = min(window.unique_authors(player), count)
+        print(f"  {i:2d}. {player}: {guaranteed:,}-{count:,} mentions, ~{authors:,} authors")
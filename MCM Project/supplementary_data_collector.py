@@ -4,19 +4,16 @@ Collects injury history and media sentiment data
 """
 
 import pandas as pd
-import requests
+import http_client
 from bs4 import BeautifulSoup
-import time
 import os
+import instrumentation
+import inverted_index
+import reddit_ingester
+import sentiment_engine
 
-# Reddit API is optional
-try:
-    import praw
-    PRAW_AVAILABLE = True
-except ImportError:
-    PRAW_AVAILABLE = False
-    print("[INFO] praw not installed - Reddit API features disabled")
 
+@instrumentation.instrument_class
 class SupplementaryDataCollector:
     def __init__(self):
         self.headers = {
@@ -34,8 +31,8 @@ class SupplementaryDataCollector:
         url = f"https://www.basketball-reference.com/friv/injuries.fcgi"
 
         try:
-            time.sleep(self.delay)
-            response = requests.get(url, headers=self.headers)
+            instrumentation.throttle(self.delay)
+            response = http_client.get(url, headers=self.headers)
 
             if response.status_code == 200:
                 tables = pd.read_html(response.text)
@@ -96,49 +93,37 @@ class SupplementaryDataCollector:
 
         return df
 
-    def scrape_reddit_sentiment(self, subreddit='nba', keywords=None, limit=100):
+    def scrape_reddit_sentiment(self, subreddit='nba', keywords=None, days=30):
         """
-        Scrape Reddit r/nba for sentiment analysis
-        Note: Requires Reddit API credentials
+        Reddit activity per keyword over the last `days`, aggregated from the
+        submissions and comments streamed into the columnar store by
+        reddit_ingester.py. Needs Reddit API credentials (REDDIT_CLIENT_ID /
+        REDDIT_CLIENT_SECRET) or REDDIT_API_BASE pointing at the local stand-in.
         """
         print(f"\n[2/3] Attempting Reddit sentiment collection...")
 
         if keywords is None:
-            keywords = ['expansion', 'Seattle', 'Las Vegas', 'LeBron', 'Curry']
-
-        try:
-            # This requires Reddit API credentials
-            # Users need to create an app at: https://www.reddit.com/prefs/apps
+            keywords = reddit_ingester.DEFAULT_KEYWORDS
 
+        if not reddit_ingester.configured():
             print("[INFO] Reddit API requires authentication")
             print("      Create app at: https://www.reddit.com/prefs/apps")
-            print("      Then configure credentials in code")
-
-            # Placeholder for Reddit API
-            # reddit = praw.Reddit(
-            #     client_id='YOUR_CLIENT_ID',
-            #     client_secret='YOUR_CLIENT_SECRET',
-            #     user_agent='MCM_Project_Data_Collector'
-            # )
-            #
-            # subreddit_obj = reddit.subreddit(subreddit)
-            # posts = []
-            #
-            # for keyword in keywords:
-            #     for submission in subreddit_obj.search(keyword, limit=limit):
-            #         posts.append({
-            #             'Keyword': keyword,
-            #             'Title': submission.title,
-            #             'Score': submission.score,
-            #             'Comments': submission.num_comments,
-            #             'Created': submission.created_utc,
-            #             'URL': submission.url
-            #         })
-            #
-            # if posts:
-            #     df = pd.DataFrame(posts)
-            #     print(f"[OK] Collected {len(df)} Reddit posts")
-            #     return df
+            print("      Then set REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET")
+            return self.create_reddit_sentiment_template()
+
+        try:
+            ingester = reddit_ingester.RedditIngester(subreddit)
+            ingester.ingest_submissions(keywords, days)
+            ingester.ingest_comments(days)
+            scores = sentiment_engine.entity_sentiment(keywords, subreddit, days)
+            mentions = inverted_index.keyword_mentions(keywords, subreddit, days)
+            df = reddit_ingester.keyword_activity(
+                reddit_ingester.load_submissions(subreddit, days), pd.DataFrame(),
+                keywords, days, subreddit=subreddit, sentiment=scores['SENTIMENT'],
+                mentions=mentions)
+            print(f"[OK] Reddit activity for {len(df)} keywords "
+                  f"({df['Total_Posts_30d'].sum()} posts)")
+            return df
 
         except Exception as e:
             print(f"[ERROR] {e}")
@@ -151,12 +136,7 @@ class SupplementaryDataCollector:
         """
         print("\n[INFO] Creating Reddit sentiment template...")
 
-        keywords = [
-            'NBA expansion', 'Seattle NBA', 'Las Vegas NBA',
-            'LeBron James', 'Stephen Curry', 'Nikola Jokic',
-            'Lakers', 'Warriors', 'Celtics',
-            'NBA playoffs', 'NBA Finals'
-        ]
+        keywords = reddit_ingester.DEFAULT_KEYWORDS
 
         template = {
             'Keyword': keywords,
@@ -228,12 +208,7 @@ class SupplementaryDataCollector:
         """
         print("\n[INFO] Creating composite media buzz template...")
 
-        players = [
-            'LeBron James', 'Stephen Curry', 'Giannis Antetokounmpo',
-            'Luka Doncic', 'Nikola Jokic', 'Joel Embiid',
-            'Kevin Durant', 'Damian Lillard', 'Jayson Tatum',
-            'Anthony Edwards', 'Victor Wembanyama', 'Ja Morant'
-        ]
+        players = sentiment_engine.MEDIA_PLAYERS
 
         template = {
             'Player': players,
@@ -250,6 +225,17 @@ class SupplementaryDataCollector:
 
         df = pd.DataFrame(template)
 
+        # Players mentioned in scored Reddit posts get their measured sentiment,
+        # and mentions counted once per repost cluster
+        scores = sentiment_engine.entity_sentiment(players, score=False, players=True, unique=True)
+        if not scores.empty:
+            found = df['Player'].isin(scores.index)
+            df.loc[found, 'Reddit_Mentions'] = df.loc[found, 'Player'].map(scores['TEXTS'])
+            df.loc[found, 'Fan_Sentiment'] = df.loc[found, 'Player'].map(
+                scores['SENTIMENT']).map(sentiment_engine.label)
+            print(f"[OK] Reddit_Mentions and Fan_Sentiment from stored posts for "
+                  f"{found.sum()} players")
+
         print(f"[OK] Created template for {len(players)} players")
         print("\n[CALCULATION]:")
         print("  Media_Buzz_Score = (")
@@ -0,0 +1,578 @@
+"""
+Synthetic Data Generator
+Realistic stand-ins for the collected datasets at any multiple of today's size
+(scale 1 ~ one NBA season: 30 teams, ~570 players, 2000 five-man lineups).
+Schemas match the real CSVs so the collectors and DataMerger run on them unchanged.
+Used by benchmark_suite.py.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+BASE_TEAMS = 30
+PLAYERS_PER_TEAM = 19
+BASE_LINEUPS = 2000
+
+FIRST_NAMES = ['Anthony', 'Brandon', 'Chris', 'Damian', 'Jalen', 'Jaylen', 'Kevin',
+               'Kyle', 'LeBron', 'Luka', 'Marcus', 'Nikola', 'Stephen', 'Tyrese']
+SURNAMES = ['Johnson', 'Williams', 'Brown', 'Jones', 'Davis', 'Miller', 'Wilson',
+            'Moore', 'Taylor', 'Thomas', 'Jackson', 'White', 'Harris', 'Martin',
+            'Thompson', 'Garcia', 'Robinson', 'Walker', 'Young', 'Allen', 'King',
+            'Wright', 'Hill', 'Green', 'Adams', 'Baker', 'Nelson', 'Carter']
+
+
+def make_roster(scale=1, seed=0):
+    """
+    One row per player: Player (full name), Short_Name (lineup style "J. Smith")
+    and Team. Roster slot 0 is the star, later slots are the end of the bench.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = BASE_TEAMS * scale
+    n_players = n_teams * PLAYERS_PER_TEAM
+
+    ids = np.arange(n_players)
+    first = rng.choice(FIRST_NAMES, n_players)
+    # The id suffix keeps names unique at any scale
+    surnames = [f"{s}{n}" for s, n in zip(rng.choice(SURNAMES, n_players), ids)]
+    full = [f"{f} {s}" for f, s in zip(first, surnames)]
+    short = [f"{f[0]}. {s}" for f, s in zip(first, surnames)]
+
+    return pd.DataFrame({
+        'Player': full,
+        'Short_Name': short,
+        'Team': [f"T{t:03d}" for t in ids // PLAYERS_PER_TEAM],
+        'Slot': ids % PLAYERS_PER_TEAM,
+    })
+
+
+def lineup_table(roster, n_lineups, seed=0):
+    """
+    Five-man lineups shaped like 1_lineup_5player_stats.csv. Starters appear in
+    far more lineups than bench players, and minutes are heavy-tailed.
+    """
+    rng = np.random.default_rng(seed)
+    teams = roster['Team'].unique()
+    names = roster['Short_Name'].to_numpy().reshape(len(teams), PLAYERS_PER_TEAM)
+
+    team_idx = rng.integers(0, len(teams), n_lineups)
+
+    # Weighted sampling without replacement (Efraimidis-Spirakis):
+    # the 5 largest u^(1/w) per row
+    weights = 1.0 / (1.0 + np.arange(PLAYERS_PER_TEAM)) ** 2.6
+    keys = rng.random((n_lineups, PLAYERS_PER_TEAM)) ** (1.0 / weights)
+    slots = np.argsort(-keys, axis=1)[:, :5]
+    players = names[team_idx[:, None], slots]
+
+    minutes = np.round(rng.lognormal(mean=2.6, sigma=1.0, size=n_lineups) + 10, 6)
+    games = np.maximum(1, rng.poisson(np.sqrt(minutes) * 1.5)).astype(int)
+    plus_minus = np.round(rng.normal(0, 0.35, n_lineups) * minutes ** 0.8)
+
+    df = pd.DataFrame({
+        'Lineup_Players': [' - '.join(p) for p in players],
+        'Team': teams[team_idx],
+        'Games': games,
+        'Minutes': minutes,
+        'Plus_Minus': plus_minus,
+    })
+    for k in range(5):
+        df[f'Player_{k + 1}'] = players[:, k]
+
+    return df.sort_values('Minutes', ascending=False).reset_index(drop=True)
+
+
+def edge_list(lineups):
+    """
+    Pairwise edges shaped like 1_lineup_network_edges.csv (vectorised, so it
+    can be generated at scales where the collector itself would be slow)
+    """
+    frames = []
+    for i in range(1, 5):
+        for j in range(i + 1, 6):
+            frames.append(pd.DataFrame({
+                'Player_A': lineups[f'Player_{i}'].to_numpy(),
+                'Player_B': lineups[f'Player_{j}'].to_numpy(),
+                'Team': lineups['Team'].to_numpy(),
+                'Minutes_Together': lineups['Minutes'].to_numpy(),
+                'Net_Rating': lineups['Plus_Minus'].to_numpy(),
+            }))
+    pairs = pd.concat(frames, ignore_index=True)
+
+    edges = pairs.groupby(['Player_A', 'Player_B', 'Team']).agg({
+        'Minutes_Together': 'sum',
+        'Net_Rating': 'mean'
+    }).reset_index()
+    return edges.sort_values('Minutes_Together', ascending=False).reset_index(drop=True)
+
+
+def box_scores(roster, seed=0):
+    """
+    Per-game box score and rating columns as returned by the NBA API
+    (LeagueDashPlayerStats Base + Advanced merged on PLAYER_ID)
+    """
+    rng = np.random.default_rng(seed)
+    n = len(roster)
+    # Starters (low slots) play more and score more
+    role = 1.0 / (1.0 + roster['Slot'].to_numpy() * 0.15)
+
+    minutes = np.clip(rng.normal(34 * role, 4), 2, 40).round(1)
+    fga = np.clip(minutes * rng.normal(0.42, 0.08, n), 0.3, None).round(1)
+    fg_pct = np.clip(rng.normal(0.47, 0.05, n), 0.3, 0.7).round(3)
+    fgm = (fga * fg_pct).round(1)
+    fta = (fga * rng.uniform(0.15, 0.4, n)).round(1)
+    ft_pct = np.clip(rng.normal(0.77, 0.08, n), 0.4, 0.95).round(3)
+    fg3m = (fgm * rng.uniform(0.1, 0.45, n)).round(1)
+    pts = (2 * fgm + fg3m + (fta * ft_pct).round(1)).round(1)
+    oreb = (minutes * rng.uniform(0.01, 0.1, n)).round(1)
+    dreb = (minutes * rng.uniform(0.07, 0.25, n)).round(1)
+    off_rating = rng.normal(114, 5, n).round(1)
+    def_rating = rng.normal(114, 4, n).round(1)
+
+    return pd.DataFrame({
+        'PLAYER_ID': np.arange(n) + 1_000_000,
+        'PLAYER_NAME': roster['Player'].to_numpy(),
+        'TEAM_ABBREVIATION': roster['Team'].to_numpy(),
+        'GP': np.clip(rng.normal(60 * role + 10, 15), 1, 82).astype(int),
+        'MIN': minutes,
+        'PTS': pts,
+        'REB': (oreb + dreb).round(1),
+        'OREB': oreb,
+        'DREB': dreb,
+        'AST': (minutes * rng.uniform(0.03, 0.3, n)).round(1),
+        'STL': (minutes * rng.uniform(0.01, 0.05, n)).round(1),
+        'BLK': (minutes * rng.uniform(0.0, 0.06, n)).round(1),
+        'TOV': (minutes * rng.uniform(0.02, 0.1, n)).round(1),
+        'FGM': fgm,
+        'FGA': fga,
+        'FG_PCT': fg_pct,
+        'FG3M': fg3m,
+        'FG3_PCT': np.clip(rng.normal(0.35, 0.06, n), 0.0, 0.5).round(3),
+        'FTM': (fta * ft_pct).round(1),
+        'FTA': fta,
+        'FT_PCT': ft_pct,
+        'PF': (minutes * rng.uniform(0.03, 0.1, n)).round(1),
+        'PLUS_MINUS': rng.normal(0, 3, n).round(1),
+        'OFF_RATING': off_rating,
+        'DEF_RATING': def_rating,
+        'NET_RATING': (off_rating - def_rating).round(1),
+        'TS_PCT': (pts / (2 * (fga + 0.44 * fta))).round(3),
+        'USG_PCT': np.clip(rng.normal(0.19 * role ** 0.5, 0.04), 0.05, 0.4).round(3),
+        'PACE': rng.normal(99, 2, n).round(2),
+        'PIE': rng.normal(0.09, 0.03, n).round(3),
+    })
+
+
+def season_totals(box, season='2023-24', seed=0):
+    """
+    Player and team season totals for one season, shaped like the NBA API
+    Totals (+ Opponent) measures that advanced_metrics.py expects
+    """
+    rng = np.random.default_rng(seed)
+    counting = ['FGM', 'FGA', 'FG3M', 'FTM', 'FTA', 'OREB', 'DREB', 'REB',
+                'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS']
+
+    players = box[['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ABBREVIATION', 'GP']].copy()
+    games = box['GP'].to_numpy()
+    players['MIN'] = (box['MIN'] * games).round(0)
+    for col in counting:
+        players[col] = (box[col] * games).round(0)
+    players['TEAM_ID'] = players['TEAM_ABBREVIATION'].str[1:].astype(int) + 1610612700
+    players.insert(0, 'SEASON', season)
+
+    teams = players.groupby(['SEASON', 'TEAM_ID', 'TEAM_ABBREVIATION'], as_index=False)[
+        ['MIN'] + counting].sum()
+    teams['GP'] = 82
+    teams['MIN'] = (teams['MIN'] / 5).round(0)  # game minutes
+
+    # Opponent totals: every team faces a league-average-ish mix of the others
+    opp = teams[counting].to_numpy()
+    opp = opp.mean(axis=0) * rng.normal(1.0, 0.03, opp.shape)
+    for i, col in enumerate(counting):
+        teams[f'OPP_{col}'] = opp[:, i].round(0)
+
+    margin = (teams['PTS'] - teams['OPP_PTS']) / teams['GP']
+    teams['W'] = np.clip(np.round(41 + margin * 2.7), 5, 77).astype(int)
+    teams['L'] = teams['GP'] - teams['W']
+    return players, teams
+
+
+def game_logs(box, seasons=('2023-24',), seed=0):
+    """
+    Player and team game logs shaped like stored LeagueGameLog partitions
+    (regular season, with `season`/`game_date` columns). Each of the 82 rounds
+    pairs every team with a random opponent; players miss games through
+    injury spells, rest and DNPs, and a few are traded mid-season.
+    """
+    rng = np.random.default_rng(seed)
+    teams = np.unique(box['TEAM_ABBREVIATION'].to_numpy())
+    team_of = np.searchsorted(teams, box['TEAM_ABBREVIATION'].to_numpy())
+    team_ids = np.char.lstrip(teams.astype(str), 'T').astype(int) + 1610612700
+    n_players, n_teams, n_rounds = len(box), len(teams), 82
+    per_round = n_teams // 2
+
+    # Per-player rates: bench players sit more, some players are injury prone
+    gp_share = np.clip(box['GP'].to_numpy() / 82, 0.05, 1.0)
+    play_prob = np.clip(gp_share * 1.15, 0.1, 0.99)
+    injure = rng.uniform(0.002, 0.03, n_players)
+    counting = ['FGM', 'FGA', 'FG3M', 'FTM', 'FTA', 'OREB', 'DREB', 'AST', 'STL',
+                'BLK', 'TOV', 'PF']
+    means = {col: box[col].to_numpy() for col in counting}
+
+    player_frames, team_frames = [], []
+    for season in seasons:
+        start = pd.Timestamp(f"{season[:4]}-10-24")
+        # Round r: team order[r, 2k] hosts order[r, 2k + 1]
+        order = np.argsort(rng.random((n_rounds, n_teams)), axis=1)
+        game_no = np.empty((n_rounds, n_teams), dtype=int)
+        rows = np.arange(n_rounds)[:, None]
+        game_no[rows, order] = np.arange(n_teams) // 2 + rows * per_round
+        home = np.zeros((n_rounds, n_teams), dtype=bool)
+        home[rows, order[:, 0::2]] = True
+        opponent = np.empty((n_rounds, n_teams), dtype=int)
+        opponent[rows, order[:, 0::2]] = order[:, 1::2]
+        opponent[rows, order[:, 1::2]] = order[:, 0::2]
+
+        # Team for every (player, round), with ~4% traded at a random round
+        team = np.repeat(team_of[:, None], n_rounds, axis=1)
+        traded = np.flatnonzero(rng.random(n_players) < 0.04)
+        at = rng.integers(10, 70, len(traded))
+        new_team = (team_of[traded] + rng.integers(1, n_teams, len(traded))) % n_teams
+        after = np.arange(n_rounds)[None, :] >= at[:, None]
+        team[traded] = np.where(after, new_team[:, None], team[traded])
+
+        # Injury spells: a healthy player gets hurt with p=injure, recovers with p=0.15
+        hurt = np.zeros((n_players, n_rounds), dtype=bool)
+        state = np.zeros(n_players, dtype=bool)
+        for r in range(n_rounds):
+            draw = rng.random(n_players)
+            state = np.where(state, draw > 0.15, draw < injure)
+            hurt[:, r] = state
+        played = ~hurt & (rng.random((n_players, n_rounds)) < play_prob[:, None])
+
+        p, r = np.nonzero(played)
+        t = team[p, r]
+        n = len(p)
+        lines = {col: rng.poisson(means[col][p]) for col in ['FGA', 'FTA', 'FG3M', 'OREB',
+                                                             'DREB', 'AST', 'STL', 'BLK',
+                                                             'TOV', 'PF']}
+        fg_pct = np.clip(means['FGM'][p] / np.maximum(means['FGA'][p], 0.1), 0.2, 0.8)
+        ft_pct = np.clip(means['FTM'][p] / np.maximum(means['FTA'][p], 0.1), 0.3, 1.0)
+        lines['FGM'] = rng.binomial(lines['FGA'], fg_pct)
+        lines['FG3M'] = np.minimum(lines['FG3M'], lines['FGM'])
+        lines['FTM'] = rng.binomial(lines['FTA'], ft_pct)
+        dates = (start + pd.to_timedelta(r * 2, unit='D')).strftime('%Y-%m-%d').to_numpy()
+        game_ids = np.char.add(f"002{season[2:4]}", np.char.zfill(
+            (game_no[r, t] + 1).astype(str), 5))
+
+        players = pd.DataFrame({
+            'SEASON_ID': f"2{season[:4]}",
+            'PLAYER_ID': box['PLAYER_ID'].to_numpy()[p],
+            'PLAYER_NAME': box['PLAYER_NAME'].to_numpy()[p],
+            'TEAM_ID': team_ids[t],
+            'TEAM_ABBREVIATION': teams[t],
+            'GAME_ID': game_ids,
+            'GAME_DATE': dates,
+            'MIN': np.clip(rng.normal(box['MIN'].to_numpy()[p], 5), 1, 48).round(0),
+            **{col: lines[col] for col in counting},
+        })
+        players['REB'] = players['OREB'] + players['DREB']
+        players['PTS'] = 2 * players['FGM'] + players['FG3M'] + players['FTM']
+
+        stats = counting + ['REB', 'PTS']
+        totals = players.groupby(['GAME_ID', 'TEAM_ID'], as_index=False)[stats].sum()
+        tr, tt = np.nonzero(np.ones((n_rounds, n_teams), dtype=bool))
+        schedule = pd.DataFrame({
+            'SEASON_ID': f"2{season[:4]}",
+            'TEAM_ID': team_ids[tt],
+            'TEAM_ABBREVIATION': teams[tt],
+            'GAME_ID': np.char.add(f"002{season[2:4]}", np.char.zfill(
+                (game_no[tr, tt] + 1).astype(str), 5)),
+            'GAME_DATE': (start + pd.to_timedelta(tr * 2, unit='D')).strftime('%Y-%m-%d'),
+            'MATCHUP': np.where(home[tr, tt],
+                                np.char.add(teams[tt].astype(str), ' vs. '),
+                                np.char.add(teams[tt].astype(str), ' @ ')),
+            'HOME': home[tr, tt],
+            'MIN': 240,
+        })
+        schedule['MATCHUP'] += teams[opponent[tr, tt]]
+        teams_df = schedule.merge(totals, on=['GAME_ID', 'TEAM_ID'], how='left')
+        teams_df[stats] = teams_df[stats].fillna(0).astype(int)
+        opp_pts = teams_df.groupby('GAME_ID')['PTS'].transform('sum') - teams_df['PTS']
+        margin = teams_df['PTS'] - opp_pts
+        teams_df['WL'] = np.where((margin > 0) | ((margin == 0) & teams_df['HOME']), 'W', 'L')
+        teams_df['PLUS_MINUS'] = margin
+        teams_df = teams_df.drop(columns='HOME')
+
+        players = players.merge(teams_df[['GAME_ID', 'TEAM_ID', 'MATCHUP', 'WL', 'PLUS_MINUS']],
+                                on=['GAME_ID', 'TEAM_ID'])
+        players['PLUS_MINUS'] = (players.pop('PLUS_MINUS') * players['MIN'] / 48
+                                 + rng.normal(0, 4, n)).round(0)
+
+        for df, frames in ((players, player_frames), (teams_df, team_frames)):
+            df['SEASON_TYPE'] = 'Regular Season'
+            df['season'] = season
+            df['game_date'] = df['GAME_DATE']
+            frames.append(df)
+
+    return (pd.concat(player_frames, ignore_index=True),
+            pd.concat(team_frames, ignore_index=True))
+
+
+PBP_COLUMNS = ['GAME_ID', 'EVENTNUM', 'EVENTMSGTYPE', 'EVENTMSGACTIONTYPE', 'PERIOD',
+               'PCTIMESTRING', 'HOMEDESCRIPTION', 'VISITORDESCRIPTION',
+               'PLAYER1_ID', 'PLAYER1_TEAM_ID', 'PLAYER2_ID', 'PLAYER2_TEAM_ID',
+               'PLAYER3_ID', 'PLAYER3_TEAM_ID']
+
+
+def play_by_play(box, n_games=100, season='2023-24', seed=0):
+    """
+    Simulated games shaped like PlayByPlayV2 (made/missed shots, rebounds,
+    turnovers, shooting fouls and free throws, substitutions). As in the real
+    feed, lineups also change between periods without substitution events.
+    """
+    rng = np.random.default_rng(seed)
+    teams = box['TEAM_ABBREVIATION'].to_numpy()
+    team_names = np.unique(teams)
+    team_ids = {t: int(t[1:]) + 1610612700 for t in team_names}
+    names = dict(zip(box['PLAYER_ID'], box['PLAYER_NAME'].str.split().str[-1]))
+    rosters = {t: box['PLAYER_ID'].to_numpy()[teams == t][:10] for t in team_names}
+    weights = 1.0 / (1.0 + np.arange(10) * 0.3)
+    weights /= weights.sum()
+
+    rows = []
+    for g in range(n_games):
+        game_id = f"002{season[2:4]}{g + 1:05d}"
+        home, away = rng.choice(team_names, 2, replace=False)
+        sides = {home: 'H', away: 'V'}
+        eventnum = 0
+
+        def add(kind, action, period, clock, team, p1=0, p2=0, p2_team=None, p3=0,
+                p3_team=None, text=''):
+            nonlocal eventnum
+            eventnum += 1
+            desc = f"{names.get(p1, '')} {text}".strip()
+            rows.append((game_id, eventnum, kind, action, period,
+                         f"{clock // 60}:{clock % 60:02d}",
+                         desc if sides.get(team) == 'H' else None,
+                         desc if sides.get(team) == 'V' else None,
+                         p1, team_ids[team] if team and p1 else None,
+                         p2, team_ids[p2_team] if p2_team and p2 else None,
+                         p3, team_ids[p3_team] if p3_team and p3 else None))
+
+        for period in range(1, 5):
+            on = {t: list(rng.choice(rosters[t], 5, replace=False, p=weights))
+                  for t in (home, away)}
+            clock = 720
+            add(12, 0, period, clock, None)
+            offense = home if rng.random() < 0.5 else away
+            while True:
+                clock -= int(rng.integers(6, 22))
+                if clock <= 0:
+                    break
+                defense = away if offense == home else home
+                for t in (home, away):
+                    if rng.random() < 0.05:
+                        bench = [p for p in rosters[t] if p not in on[t]]
+                        out, sub = rng.choice(on[t]), rng.choice(bench)
+                        on[t][on[t].index(out)] = sub
+                        add(8, 0, period, clock, t, out, sub, t, text=f"SUB: FOR {names[sub]}")
+                shooter = rng.choice(on[offense])
+                draw = rng.random()
+                if draw < 0.13:
+                    stealer = rng.choice(on[defense]) if rng.random() < 0.5 else 0
+                    add(5, 1, period, clock, offense, shooter, stealer, defense,
+                        text="Bad Pass Turnover")
+                elif draw < 0.23:
+                    fouler = rng.choice(on[defense])
+                    add(6, 2, period, clock, defense, fouler, shooter, offense, text="S.FOUL")
+                    for k in (1, 2):
+                        made = rng.random() < 0.77
+                        add(3, 10 + k, period, clock, offense, shooter,
+                            text=f"{'' if made else 'MISS '}Free Throw {k} of 2")
+                    if not made:
+                        rebounder = rng.choice(on[defense])
+                        add(4, 0, period, clock, defense, rebounder, text="REBOUND")
+                else:
+                    three = rng.random() < 0.38
+                    label = '3PT Jump Shot' if three else 'Driving Layup'
+                    if rng.random() < (0.36 if three else 0.53):
+                        assist = rng.choice([p for p in on[offense] if p != shooter])
+                        add(1, 1, period, clock, offense, shooter, assist, offense, text=label)
+                    else:
+                        add(2, 1, period, clock, offense, shooter, text=f"MISS {label}")
+                        if rng.random() < 0.27:
+                            add(4, 0, period, clock, offense, rng.choice(on[offense]),
+                                text="REBOUND")
+                            continue
+                        add(4, 0, period, clock, defense, rng.choice(on[defense]), text="REBOUND")
+                offense = defense
+            add(13, 0, period, 0, None)
+
+    return pd.DataFrame(rows, columns=PBP_COLUMNS)
+
+
+def shot_chart(box, n_shots=200_000, season='2023-24', seed=0):
+    """
+    League-wide shots shaped like ShotChartDetail (LOC_X/LOC_Y in tenths of a
+    foot, hoop at the origin). Each player has their own rim / mid-range / three
+    mix and touch; make probability falls with distance.
+    """
+    from shot_zones import ZONES, zone_of
+
+    rng = np.random.default_rng(seed)
+    n_players = len(box)
+    teams = box['TEAM_ABBREVIATION'].to_numpy()
+    team_ids = np.char.lstrip(teams.astype(str), 'T').astype(int) + 1610612700
+    volume = box['FGA'].to_numpy(dtype=float)
+    shooter = rng.choice(n_players, n_shots, p=volume / volume.sum())
+
+    mix = rng.dirichlet([4, 2, 3], n_players)
+    kind = (rng.random(n_shots)[:, None] > np.cumsum(mix, axis=1)[shooter]).sum(axis=1)
+    dist = np.select([kind == 0, kind == 1],
+                     [np.abs(rng.normal(0, 35, n_shots)), rng.uniform(50, 225, n_shots)],
+                     default=rng.uniform(238, 275, n_shots))
+    angle = rng.uniform(-0.1, np.pi + 0.1, n_shots)
+    x = np.clip(dist * np.cos(angle), -247, 247).round()
+    y = np.maximum(dist * np.sin(angle), -45).round()
+    # Corner threes: pin some long shots to the corners
+    corner = (kind == 2) & (rng.random(n_shots) < 0.25)
+    x[corner] = np.sign(rng.random(corner.sum()) - 0.5) * rng.uniform(222, 240, corner.sum())
+    y[corner] = rng.uniform(-40, 90, corner.sum()).round()
+
+    touch = rng.normal(0, 0.04, n_players)[shooter]
+    feet = np.hypot(x, y) / 10
+    made = rng.random(n_shots) < np.clip(0.66 - 0.012 * feet + touch, 0.05, 0.9)
+    zone = zone_of(x, y)
+    game = rng.integers(0, 1230, n_shots)
+    game_ids = np.array([f"002{season[2:4]}{g + 1:05d}" for g in range(1230)], dtype=object)
+    days = pd.date_range(f"{season[:4]}-10-24", periods=1230 // 7 + 1).strftime('%Y%m%d')
+
+    return pd.DataFrame({
+        'GRID_TYPE': 'Shot Chart Detail',
+        'GAME_ID': game_ids[game],
+        'GAME_EVENT_ID': rng.integers(1, 700, n_shots),
+        'PLAYER_ID': box['PLAYER_ID'].to_numpy()[shooter],
+        'PLAYER_NAME': box['PLAYER_NAME'].to_numpy()[shooter],
+        'TEAM_ID': team_ids[shooter],
+        'TEAM_NAME': teams[shooter],
+        'PERIOD': rng.integers(1, 5, n_shots),
+        'MINUTES_REMAINING': rng.integers(0, 12, n_shots),
+        'SECONDS_REMAINING': rng.integers(0, 60, n_shots),
+        'EVENT_TYPE': np.where(made, 'Made Shot', 'Missed Shot'),
+        'ACTION_TYPE': np.where(kind == 0, 'Driving Layup Shot', 'Jump Shot'),
+        'SHOT_TYPE': np.where(np.isin(zone, [3, 4, 5, 6]), '3PT Field Goal', '2PT Field Goal'),
+        'SHOT_ZONE_BASIC': np.array(ZONES, dtype=object)[zone],
+        'SHOT_ZONE_AREA': np.where(x < -80, 'Left Side(L)',
+                                   np.where(x > 80, 'Right Side(R)', 'Center(C)')),
+        'SHOT_ZONE_RANGE': pd.cut(feet, [-1, 8, 16, 24, 1000],
+                                  labels=['Less Than 8 ft.', '8-16 ft.', '16-24 ft.',
+                                          '24+ ft.']).astype(str),
+        'SHOT_DISTANCE': feet.astype(int),
+        'LOC_X': x.astype(int),
+        'LOC_Y': y.astype(int),
+        'SHOT_ATTEMPTED_FLAG': 1,
+        'SHOT_MADE_FLAG': made.astype(int),
+        'GAME_DATE': days.to_numpy(dtype=object)[game // 7],
+        'HTM': teams[shooter],
+        'VTM': teams[(shooter + 19) % n_players],
+    })
+
+
+def player_basic_stats(box):
+    """1_player_basic_stats.csv"""
+    return pd.DataFrame({
+        'Player': box['PLAYER_NAME'],
+        'Team': box['TEAM_ABBREVIATION'],
+        'Games_Played': box['GP'],
+        'Minutes': box['MIN'],
+        'Points': box['PTS'],
+        'Rebounds': box['REB'],
+        'Assists': box['AST'],
+        'Steals': box['STL'],
+        'Blocks': box['BLK'],
+        'Turnovers': box['TOV'],
+        'FG_Pct': box['FG_PCT'],
+        'FG3_Pct': box['FG3_PCT'],
+        'FT_Pct': box['FT_PCT'],
+        'Plus_Minus': box['PLUS_MINUS'],
+    })
+
+
+def player_advanced_stats(box):
+    """1_player_advanced_stats_nba_api.csv"""
+    return box[['PLAYER_NAME', 'TEAM_ABBREVIATION', 'OFF_RATING', 'DEF_RATING',
+                'NET_RATING', 'TS_PCT', 'USG_PCT', 'PACE', 'PIE']].copy()
+
+
+def player_salaries(box, seed=0):
+    """2_player_salaries.csv - roughly 80% of players have a known contract"""
+    rng = np.random.default_rng(seed)
+    known = box[rng.random(len(box)) < 0.8]
+    salary = np.clip(known['PTS'].to_numpy() ** 1.6 * 180_000 +
+                     rng.normal(0, 2_000_000, len(known)), 1_100_000, 52_000_000)
+    return pd.DataFrame({
+        'Player': known['PLAYER_NAME'].to_numpy(),
+        'Team': known['TEAM_ABBREVIATION'].to_numpy(),
+        'Salary': salary.round(0),
+    })
+
+
+def player_social(box, seed=0):
+    """3_social_media_players_template.csv - followers for the top ~25%"""
+    rng = np.random.default_rng(seed)
+    top = box[box['PTS'] >= box['PTS'].quantile(0.75)]
+    return pd.DataFrame({
+        'Player': top['PLAYER_NAME'].to_numpy(),
+        'Instagram_Followers': (rng.lognormal(14, 1.2, len(top))).astype(int),
+        'Twitter_Followers': (rng.lognormal(13, 1.3, len(top))).astype(int),
+    })
+
+
+def make_dataset(scale=1, seed=0):
+    """All synthetic tables for one scale, keyed by name"""
+    roster = make_roster(scale, seed)
+    lineups = lineup_table(roster, BASE_LINEUPS * scale, seed + 1)
+    box = box_scores(roster, seed + 2)
+    return {
+        'roster': roster,
+        'lineups': lineups,
+        'edges': edge_list(lineups),
+        'box_scores': box,
+        'basic': player_basic_stats(box),
+        'advanced': player_advanced_stats(box),
+        'salaries': player_salaries(box, seed + 3),
+        'social': player_social(box, seed + 4),
+    }
+
+
+def write_dataset(data, data_dir):
+    """Write the tables under the filenames DataMerger reads"""
+    os.makedirs(data_dir, exist_ok=True)
+    files = {
+        'lineups': '1_lineup_5player_stats.csv',
+        'edges': '1_lineup_network_edges.csv',
+        'basic': '1_player_basic_stats.csv',
+        'advanced': '1_player_advanced_stats_nba_api.csv',
+        'salaries': '2_player_salaries.csv',
+        'social': '3_social_media_players_template.csv',
+    }
+    for key, filename in files.items():
+        data[key].to_csv(os.path.join(data_dir, filename), index=False)
+    return data_dir
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write synthetic datasets at a given scale")
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output-dir', default=os.path.join('data', 'synthetic'))
+    args = parser.parse_args()
+
+    data = make_dataset(args.scale, args.seed)
+    write_dataset(data, args.output_dir)
+    for key, df in data.items():
+        print(f"[OK] {key}: {len(df)} rows")
+    print(f"[SAVED] {args.output_dir}")
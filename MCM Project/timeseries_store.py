@@ -0,0 +1,330 @@
+"""
+Time-Series Store
+Append-only history of trends and social snapshots (search interest, follower
+counts), with daily / weekly / monthly rollups kept up to date on every append:
+
+    data/timeseries/points/month=2024-05/part-<n>.parquet      raw points
+    data/timeseries/rollups/freq=W/month=2024-05/part.parquet  per (entity, metric, period)
+    data/timeseries/series.parquet                             first/last timestamp per series
+    data/timeseries/entities.csv, metrics.csv                  name <-> id dictionaries
+
+Points are ENTITY int32, METRIC int16, TS datetime64[s] and VALUE float32 -
+10 bytes per point before compression. A batch is written as a new part file
+in its month; raw points are never rewritten. Each rollup row keeps count,
+sum, min, max, first and last, which merge exactly, so an append only merges
+the batch's own rollup into the touched periods. Growth and momentum
+(Growth_Momentum_Score) are read from the daily rollups, not from raw points.
+
+    store = TimeSeriesStore()
+    store.record_snapshot('player', df, 'Player', {'Instagram_Followers': 'instagram_followers'})
+    store.momentum('player', 'instagram_followers', days=30)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import columnar_store
+
+DEFAULT_ROOT = os.path.join('data', 'timeseries')
+POINTS = 'points'
+ROLLUPS = 'rollups'
+FREQS = ('D', 'W', 'M')  # weeks start on Monday
+KEYS = ['ENTITY', 'METRIC', 'PERIOD']
+DTYPES = {'ENTITY': np.int32, 'METRIC': np.int16, 'VALUE': np.float32}
+ROLLUP_DTYPES = {'ENTITY': np.int32, 'METRIC': np.int16, 'COUNT': np.int32, 'SUM': np.float64,
+                 'MIN': np.float32, 'MAX': np.float32, 'FIRST': np.float32, 'LAST': np.float32}
+
+
+def period_start(ts, freq):
+    """Start of the day / week / month holding each timestamp"""
+    return ts.dt.to_period(freq).dt.start_time.astype('datetime64[s]')
+
+
+def month_of(ts):
+    """'YYYY-MM' of each timestamp (numpy month units; strftime is ~50x slower)"""
+    return pd.Series(ts.to_numpy().astype('datetime64[M]').astype(str), index=ts.index)
+
+
+def rollup(points, freq):
+    """count/sum/min/max/first/last per (entity, metric, period) of a batch of points"""
+    df = points.sort_values('TS', kind='stable')
+    keys = [df['ENTITY'], df['METRIC'], period_start(df['TS'], freq).rename('PERIOD')]
+    values = df['VALUE'].astype(np.float64).groupby(keys, sort=False)
+    stamps = df['TS'].groupby(keys, sort=False)
+    out = pd.DataFrame({
+        'COUNT': values.count(), 'SUM': values.sum(), 'MIN': values.min(), 'MAX': values.max(),
+        'FIRST': values.first(), 'LAST': values.last(),
+        'FIRST_TS': stamps.min(), 'LAST_TS': stamps.max(),
+    })
+    return out.reset_index().astype(ROLLUP_DTYPES)
+
+
+def merge_rollups(frames):
+    """Combine rollup rows of the same (entity, metric, period) from separate batches"""
+    df = pd.concat([f for f in frames if not f.empty], ignore_index=True)
+    if not df.duplicated(KEYS).any():
+        return df
+    first = df.sort_values('FIRST_TS', kind='stable').groupby(KEYS, sort=False).agg(
+        COUNT=('COUNT', 'sum'), SUM=('SUM', 'sum'), MIN=('MIN', 'min'), MAX=('MAX', 'max'),
+        FIRST=('FIRST', 'first'), FIRST_TS=('FIRST_TS', 'min'))
+    last = df.sort_values('LAST_TS', kind='stable').groupby(KEYS, sort=False).agg(
+        LAST=('LAST', 'last'), LAST_TS=('LAST_TS', 'max'))
+    return first.join(last).reset_index().astype(ROLLUP_DTYPES)
+
+
+class Codes:
+    """Persistent name -> int id dictionary (CSV with ID plus the key columns)"""
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        if os.path.exists(path):
+            self.table = pd.read_csv(path, dtype={c: str for c in columns}, keep_default_na=False)
+        else:
+            self.table = pd.DataFrame({'ID': pd.Series(dtype=np.int64),
+                                       **{c: pd.Series(dtype=str) for c in columns}})
+        self.lookup = dict(zip(map(tuple, self.table[columns].to_numpy()), self.table['ID']))
+
+    def ids(self, keys, create=True):
+        """Id of each key tuple; unknown keys get new ids (or -1 without `create`)"""
+        new = [k for k in dict.fromkeys(keys) if k not in self.lookup]
+        if new and create:
+            start = len(self.lookup)
+            added = pd.DataFrame(new, columns=self.columns)
+            added.insert(0, 'ID', np.arange(start, start + len(new)))
+            self.table = pd.concat([self.table, added], ignore_index=True)
+            self.lookup.update(zip(new, added['ID']))
+            self.save()
+        return np.array([self.lookup.get(k, -1) for k in keys], dtype=np.int64)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        self.table.to_csv(tmp, index=False)
+        os.replace(tmp, self.path)
+
+
+class TimeSeriesStore:
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+        self.entities = Codes(os.path.join(root, 'entities.csv'), ['KIND', 'NAME'])
+        self.metrics = Codes(os.path.join(root, 'metrics.csv'), ['NAME'])
+        self.series_file = os.path.join(root, 'series.parquet')
+
+    # ---------- writes ----------
+
+    def series(self):
+        """First/last timestamp, point count and last value of every stored series"""
+        if not os.path.exists(self.series_file):
+            return pd.DataFrame({'ENTITY': pd.Series(dtype=np.int32),
+                                 'METRIC': pd.Series(dtype=np.int16),
+                                 'FIRST_TS': pd.Series(dtype='datetime64[s]'),
+                                 'LAST_TS': pd.Series(dtype='datetime64[s]'),
+                                 'COUNT': pd.Series(dtype=np.int64),
+                                 'LAST': pd.Series(dtype=np.float32)})
+        return pd.read_parquet(self.series_file)
+
+    def append(self, kind, metric, names, timestamps, values):
+        """
+        Append points of one entity kind and metric. Points at or before the
+        last stored timestamp of their series are dropped, so recording the
+        same snapshot again, or a trends payload overlapping the last one,
+        never double counts. Returns the number of points stored.
+        """
+        points = pd.DataFrame({
+            'ENTITY': self.entities.ids([(kind, str(n)) for n in names]),
+            'METRIC': self.metrics.ids([(metric,)])[0],
+            'TS': pd.to_datetime(pd.Series(timestamps)).astype('datetime64[s]').to_numpy(),
+            'VALUE': np.asarray(values, dtype=np.float64),
+        }).dropna(subset=['VALUE', 'TS']).astype(DTYPES)
+
+        series = self.series()
+        last = points[['ENTITY', 'METRIC']].merge(series, on=['ENTITY', 'METRIC'], how='left')
+        points = points[~(points['TS'].to_numpy() <= last['LAST_TS'].to_numpy())]
+        points = points.drop_duplicates(['ENTITY', 'METRIC', 'TS'], keep='last')
+        if points.empty:
+            return 0
+
+        for month, batch in points.groupby(month_of(points['TS'])):
+            columnar_store.append_partition(batch, self.root, POINTS, {'month': month})
+        for freq in FREQS:
+            self.update_rollups(points, freq)
+        self.update_series(series, points)
+        return len(points)
+
+    def update_rollups(self, points, freq):
+        batch = rollup(points, freq)
+        for month, new in batch.groupby(month_of(batch['PERIOD'])):
+            partition = {'freq': freq, 'month': month}
+            path = columnar_store.partition_path(self.root, ROLLUPS, partition)
+            old = pd.read_parquet(path).drop(columns=list(partition)) if os.path.exists(path) \
+                else pd.DataFrame()
+            columnar_store.write_partition(merge_rollups([old, new]), self.root, ROLLUPS, partition)
+
+    def update_series(self, series, points):
+        points = points.sort_values('TS', kind='stable')
+        keys = [points['ENTITY'], points['METRIC']]
+        stamps = points['TS'].groupby(keys)
+        new = pd.DataFrame({'FIRST_TS': stamps.min(), 'LAST_TS': stamps.max(),
+                            'COUNT': stamps.size(),
+                            'LAST': points['VALUE'].groupby(keys).last()}).reset_index()
+        # New points are always later than the stored ones, so their LAST wins
+        df = pd.concat([f for f in (series, new) if not f.empty], ignore_index=True)
+        df = df.groupby(['ENTITY', 'METRIC'], as_index=False).agg(
+            FIRST_TS=('FIRST_TS', 'min'), LAST_TS=('LAST_TS', 'max'), COUNT=('COUNT', 'sum'),
+            LAST=('LAST', 'last'))
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.series_file + '.tmp'
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, self.series_file)
+
+    def latest(self, kind, metric):
+        """Last stored value per entity name of one kind and metric"""
+        metric_id = self.metrics.ids([(metric,)], create=False)[0]
+        series = self.series()
+        series = series[series['METRIC'] == metric_id]
+        entities = self.entities.table[self.entities.table['KIND'] == kind]
+        df = series.merge(entities, left_on='ENTITY', right_on='ID')
+        return pd.Series(df['LAST'].to_numpy(), index=df['NAME'].to_numpy(), dtype=np.float64)
+
+    def record_snapshot(self, kind, df, name_column, metrics, ts=None, skip_unchanged=False):
+        """
+        One point per row and metric column at `ts` (default now), e.g.
+        follower counts typed into a template. `metrics` maps column -> metric
+        name; zero or missing values are treated as not filled in, and with
+        `skip_unchanged` so are values equal to the last stored one.
+        """
+        ts = pd.Timestamp(ts) if ts is not None else pd.Timestamp.now().floor('s')
+        stored = 0
+        for column, metric in metrics.items():
+            if column not in df:
+                continue
+            values = pd.to_numeric(df[column], errors='coerce')
+            filled = values > 0
+            if skip_unchanged:
+                last = df[name_column].astype(str).map(self.latest(kind, metric))
+                filled &= ~np.isclose(values.astype(np.float32), last)
+            stored += self.append(kind, metric, df.loc[filled, name_column],
+                                  [ts] * int(filled.sum()), values[filled])
+        return stored
+
+    def record_series(self, kind, metric, df):
+        """Wide series (datetime index, one column per entity), e.g. Trends output"""
+        rows, cols = df.shape
+        return self.append(kind, metric, np.tile(df.columns.to_numpy(), rows),
+                           np.repeat(df.index.to_numpy(), cols), df.to_numpy().ravel())
+
+    def record_scaled_series(self, kind, metric, df):
+        """
+        Wide series whose every payload has its own scale (Trends 'today
+        12-m' is 0-100 over that payload's year): rescaled so the dates it
+        shares with the stored points have the same total, then recorded. A
+        payload that can't be linked to stored history is not recorded.
+        """
+        df = df.astype(np.float64)
+        df.index = pd.to_datetime(df.index).astype('datetime64[s]')
+        stored = self.points(metric, kind, df.columns, start=df.index.min())
+        if stored.empty:
+            return self.record_series(kind, metric, df)
+        stored = stored.pivot_table(index='TS', columns='NAME', values='VALUE')
+        shared = stored.index.intersection(df.index)
+        common = stored.columns.intersection(df.columns)
+        ours = stored.loc[shared, common].to_numpy().sum()
+        theirs = df.loc[shared, common].to_numpy().sum()
+        if ours > 0 and theirs > 0:
+            factor = ours / theirs
+        elif not len(shared) or ours > 0:
+            print(f"[WARNING] {metric}: payload does not overlap stored volume - not recorded")
+            return 0
+        else:
+            factor = 1.0  # no volume stored yet, any scale fits
+        return self.record_series(kind, metric, df * factor)
+
+    # ---------- reads ----------
+
+    def _filter(self, df, metric, kind=None, names=None):
+        metric_id = self.metrics.ids([(metric,)], create=False)[0]
+        df = df[df['METRIC'] == metric_id]
+        entities = self.entities.table
+        if kind is not None:
+            entities = entities[entities['KIND'] == kind]
+        if names is not None:
+            entities = entities[entities['NAME'].isin([str(n) for n in names])]
+        df = df.merge(entities.rename(columns={'ID': 'ENTITY'}), on='ENTITY')
+        return df.drop(columns=['METRIC'])
+
+    def _months(self, dataset, start=None, end=None, **filters):
+        months = columnar_store.partition_values(self.root, dataset, 'month', **filters)
+        if start is not None:
+            months = [m for m in months if m >= f"{pd.Timestamp(start):%Y-%m}"]
+        if end is not None:
+            months = [m for m in months if m <= f"{pd.Timestamp(end):%Y-%m}"]
+        return months
+
+    def points(self, metric, kind=None, names=None, start=None, end=None):
+        """Raw points of one metric (KIND, NAME, TS, VALUE)"""
+        months = self._months(POINTS, start, end)
+        if not months:
+            return pd.DataFrame()
+        df = columnar_store.read_dataset(self.root, POINTS, month=months).drop(columns=['month'])
+        df = self._filter(df, metric, kind, names)
+        if start is not None:
+            df = df[df['TS'] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df['TS'] <= pd.Timestamp(end)]
+        return df.sort_values(['ENTITY', 'TS']).reset_index(drop=True)
+
+    def rollups(self, freq, metric, kind=None, names=None, start=None, end=None):
+        """
+        Rollup rows of one metric at `freq` ('D', 'W', 'M'): KIND, NAME,
+        PERIOD, COUNT, SUM, MEAN, MIN, MAX, FIRST, LAST, FIRST_TS, LAST_TS
+        """
+        months = self._months(ROLLUPS, start, end, freq=freq)
+        if not months:
+            return pd.DataFrame()
+        df = columnar_store.read_dataset(self.root, ROLLUPS, freq=freq, month=months)
+        df = self._filter(df.drop(columns=['freq', 'month']), metric, kind, names)
+        if start is not None:
+            df = df[df['LAST_TS'] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df['PERIOD'] <= pd.Timestamp(end)]
+        df['MEAN'] = df['SUM'] / df['COUNT']
+        return df.sort_values(['ENTITY', 'PERIOD']).reset_index(drop=True)
+
+    def growth(self, kind, metric, days=30):
+        """
+        Change of `metric` over the last `days` per entity, from the daily
+        rollups: latest value minus the last value at least `days` earlier.
+        Sparse series (snapshots taken weeks apart) use the last value up to
+        2 x `days` back, scaled to `days`. Columns NAME, LATEST, LATEST_TS,
+        PAST, PAST_TS, GROWTH (NaN without an old enough value).
+        """
+        metric_id = self.metrics.ids([(metric,)], create=False)[0]
+        series = self.series()
+        series = series[series['METRIC'] == metric_id]
+        if series.empty:
+            return pd.DataFrame(columns=['NAME', 'LATEST', 'LATEST_TS', 'PAST', 'PAST_TS', 'GROWTH'])
+        window = pd.Timedelta(days=days)
+        df = self.rollups('D', metric, kind, start=series['LAST_TS'].min() - 2 * window)
+
+        latest = df.sort_values('LAST_TS').groupby('ENTITY').tail(1)
+        latest = latest[['ENTITY', 'NAME', 'LAST', 'LAST_TS']].rename(
+            columns={'LAST': 'LATEST', 'LAST_TS': 'LATEST_TS'})
+        df = df.merge(latest[['ENTITY', 'LATEST_TS']], on='ENTITY')
+        old = df[(df['LAST_TS'] <= df['LATEST_TS'] - window)
+                 & (df['LAST_TS'] >= df['LATEST_TS'] - 2 * window)]
+        past = old.sort_values('LAST_TS').groupby('ENTITY').tail(1)[['ENTITY', 'LAST', 'LAST_TS']]
+        out = latest.merge(past.rename(columns={'LAST': 'PAST', 'LAST_TS': 'PAST_TS'}),
+                           on='ENTITY', how='left')
+
+        span = (out['LATEST_TS'] - out['PAST_TS']) / window
+        out['GROWTH'] = (out['LATEST'] - out['PAST']) / span
+        return out.drop(columns=['ENTITY']).reset_index(drop=True)
+
+    def momentum(self, kind, metric, days=30):
+        """growth() plus MOMENTUM: growth over `days` as % of the latest value"""
+        out = self.growth(kind, metric, days)
+        out['MOMENTUM'] = 100 * out['GROWTH'] / out['LATEST'].where(out['LATEST'] > 0)
+        return out
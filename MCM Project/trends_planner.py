@@ -0,0 +1,195 @@
+"""
+Trends Planner
+Google Trends requests for any number of keywords on one comparable scale.
+
+Trends normalises every payload (max 5 keywords) to 0-100 on its own, so
+batches fetched separately can't be compared. The planner puts one shared
+anchor term in every batch - anchor + 4 new keywords, the fewest requests that
+still link every batch - and rescales each batch by how the anchor compares
+with its values in the first batch. The stitched table is then renormalised so
+its overall peak is 100.
+
+Every payload is cached on disk by (kind, keywords, timeframe, geo), so
+re-running a collector, or another collector asking for the same terms, does
+not hit Google again until the cache entry expires.
+
+    from trends_planner import TrendsPlanner
+    df = TrendsPlanner().interest_over_time(teams, anchor='Los Angeles Lakers')
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+import instrumentation
+
+CACHE_DIR = os.path.join('data', 'cache', 'trends')
+BATCH_SIZE = 5  # Google Trends payload limit
+DAY = 24 * 3600
+
+
+def plan_batches(keywords, anchor=None, size=BATCH_SIZE):
+    """
+    Keyword batches sharing `anchor` (default: the first keyword). N keywords
+    take one request if they fit in a payload, else ceil((N - 1) / (size - 1)).
+    """
+    keywords = list(dict.fromkeys(keywords))
+    if len(keywords) <= size:
+        return [keywords]
+    anchor = anchor or keywords[0]
+    rest = [k for k in keywords if k != anchor]
+    step = size - 1
+    return [[anchor] + rest[i:i + step] for i in range(0, len(rest), step)]
+
+
+def stitch(frames, anchor, by_row=False):
+    """
+    Put batches fetched with a shared anchor on the first batch's scale and
+    renormalise to a peak of 100. Over time one factor per batch (ratio of the
+    anchor's totals) is used; by region (`by_row`), where Trends compares the
+    keywords within each region, the anchor links every row separately.
+    Batches where the anchor never registers can't be linked and are NaN.
+    """
+    reference = frames[0][anchor]
+    scaled = []
+    for i, df in enumerate(frames):
+        linked = df[anchor]
+        if by_row:
+            factor = (reference / linked.where(linked > 0)).to_numpy()[:, None]
+        elif reference.sum() > 0 and linked.sum() > 0:
+            factor = reference.sum() / linked.sum()
+        else:
+            print(f"[WARNING] Anchor '{anchor}' is zero in batch {i + 1} - "
+                  f"pick a more popular anchor to link {', '.join(df.columns)}")
+            factor = float('nan')
+        df = df * factor
+        scaled.append(df.drop(columns=[anchor]) if i else df)
+    combined = pd.concat(scaled, axis=1)
+    peak = combined.max().max()
+    return (combined * (100 / peak)).round(2) if peak > 0 else combined
+
+
+def unique_columns(df):
+    """Drop the repeated anchor columns of unstitched batches"""
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+class TrendsPlanner:
+    def __init__(self, cache_dir=CACHE_DIR, max_age=DAY, delay=2, retries=2, hl='en-US', tz=360,
+                 limiter=None):
+        self.cache_dir = cache_dir
+        self.max_age = max_age  # seconds; None keeps cached payloads forever
+        self.delay = delay
+        # Shared http_client.RateLimiter when several planners run in threads;
+        # replaces the fixed delay after each request
+        self.limiter = limiter
+        self.retries = retries
+        self.hl = hl
+        self.tz = tz
+        self.requests_made = 0
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from pytrends.request import TrendReq
+            self._client = TrendReq(hl=self.hl, tz=self.tz)
+        return self._client
+
+    # ---------- cache ----------
+
+    def cache_path(self, kind, keywords, timeframe, geo, **extra):
+        key = json.dumps([kind, list(keywords), timeframe, geo, extra], sort_keys=True)
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, kind, f"{digest}.pkl")
+
+    def cached(self, path):
+        if not os.path.exists(path):
+            return None
+        if self.max_age is not None and time.time() - os.path.getmtime(path) > self.max_age:
+            return None
+        return pd.read_pickle(path)
+
+    def store(self, path, df):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        df.to_pickle(tmp)
+        os.replace(tmp, path)
+
+    # ---------- payloads ----------
+
+    def fetch(self, kind, keywords, timeframe='today 12-m', geo='', resolution='CITY'):
+        """
+        One Trends payload ('time' = interest over time, 'region' = interest
+        by region at `resolution`), from the cache when fresh
+        """
+        extra = {'resolution': resolution} if kind == 'region' else {}
+        path = self.cache_path(kind, keywords, timeframe, geo, **extra)
+        df = self.cached(path)
+        instrumentation.record_cache(df is not None)
+        if df is not None:
+            return df
+
+        for attempt in range(1, self.retries + 2):
+            if self.limiter is not None:
+                self.limiter.wait()
+            try:
+                self.client.build_payload(list(keywords), timeframe=timeframe, geo=geo)
+                if kind == 'time':
+                    df = self.client.interest_over_time()
+                    if 'isPartial' in df.columns:
+                        # The current week/day is still filling up; a stored
+                        # partial value would never be replaced
+                        df = df[~df['isPartial'].astype(bool)].drop(columns='isPartial')
+                else:
+                    df = self.client.interest_by_region(resolution=resolution,
+                                                        inc_low_vol=True)
+                break
+            except Exception as e:
+                if attempt > self.retries:
+                    raise
+                backoff = 2 ** attempt * 10
+                print(f"[WARNING] Trends request failed ({e}) - retry {attempt} in {backoff}s")
+                instrumentation.throttle(backoff)
+            finally:
+                self.requests_made += 1
+                if self.limiter is None:
+                    instrumentation.throttle(self.delay)
+
+        self.store(path, df)
+        return df
+
+    # ---------- stitched queries ----------
+
+    def interest_over_time(self, keywords, timeframe='today 12-m', geo='', anchor=None):
+        """
+        Interest over time for any number of keywords on one 0-100 scale
+        (date index, one column per keyword)
+        """
+        batches = plan_batches(keywords, anchor)
+        anchor = batches[0][0] if len(batches) > 1 else None
+        frames = [self.fetch('time', batch, timeframe, geo) for batch in batches]
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame()
+        if anchor is None or len(frames) < len(batches):
+            if anchor is not None:
+                print("[WARNING] Some Trends batches came back empty - values are not stitched")
+            return unique_columns(pd.concat(frames, axis=1))
+        return stitch(frames, anchor)
+
+    def interest_by_region(self, keywords, timeframe='today 12-m', geo='US', resolution='CITY',
+                           anchor=None):
+        """Interest by region for any number of keywords, batches linked by the anchor"""
+        batches = plan_batches(keywords, anchor)
+        anchor = batches[0][0] if len(batches) > 1 else None
+        frames = [self.fetch('region', batch, timeframe, geo, resolution) for batch in batches]
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame()
+        if anchor is None or len(frames) < len(batches):
+            return unique_columns(pd.concat(frames, axis=1))
+        return stitch(frames, anchor, by_row=True)
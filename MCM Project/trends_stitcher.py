@@ -0,0 +1,229 @@
+"""
+Trends Stitcher
+Multi-year daily Google Trends series. Trends only returns daily values for
+timeframes shorter than about nine months ('today 12-m' comes back weekly),
+and scales every payload 0-100 on its own. The stitcher requests overlapping
+180-day windows - concurrently, spaced by a shared rate limiter - and chains
+them in date order: each window is rescaled so that its overlap with the
+series so far has the same total, then its new days are appended.
+
+The stitched series is stored on the first window's scale, one partition per
+(geo, keyword):
+
+    data/warehouse/trends_daily/geo=US/keyword=NBA_expansion/part.parquet
+
+A later run only requests windows from the last stored day (minus the
+overlap) onward and links them to the stored tail. Reads renormalise the
+series to a peak of 100.
+
+    python trends_stitcher.py "NBA" "NBA expansion" --start 2019-01-01 --geo US
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import columnar_store
+import http_client
+import instrumentation
+from trends_planner import BATCH_SIZE, CACHE_DIR, TrendsPlanner
+
+DATASET = 'trends_daily'
+WINDOW_DAYS = 180  # well inside the ~269 days Trends still returns daily
+OVERLAP_DAYS = 30
+DEFAULT_START = '2019-01-01'
+DEFAULT_KEYWORDS = ['NBA', 'NBA expansion', 'NBA trade deadline']
+
+
+def geo_key(geo):
+    return geo or 'world'
+
+
+def plan_windows(start, end, window=WINDOW_DAYS, overlap=OVERLAP_DAYS):
+    """(first, last) day of each window; consecutive windows share `overlap` days"""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    windows = []
+    while True:
+        stop = min(start + pd.Timedelta(days=window - 1), end)
+        windows.append((start, stop))
+        if stop >= end:
+            return windows
+        start = stop - pd.Timedelta(days=overlap - 1)
+
+
+def timeframe(window):
+    return f"{window[0]:%Y-%m-%d} {window[1]:%Y-%m-%d}"
+
+
+def chain(frames, series=None):
+    """
+    Chain daily windows (date order) onto `series` (default: the first
+    window). Each window is scaled by the ratio of the two totals over the
+    shared days; days already in the series keep their values. While the
+    series is still all zero any scale fits, so the window is taken as is. A
+    window whose overlap has no search volume can't be linked and stitching
+    stops before it.
+    """
+    if series is None:
+        series, frames = frames[0], frames[1:]
+    for df in frames:
+        shared = series.index.intersection(df.index)
+        ours = series.loc[shared].to_numpy().sum()
+        theirs = df.loc[shared].to_numpy().sum()
+        if ours > 0 and theirs > 0:
+            factor = ours / theirs
+        elif not series.to_numpy().any():
+            factor = 1.0
+        else:
+            print(f"[WARNING] No search volume in the overlap before {df.index[-1]:%Y-%m-%d} - "
+                  f"series stops at {series.index.max():%Y-%m-%d}")
+            break
+        new = df[df.index > series.index.max()]
+        series = pd.concat([series, new * factor])
+    return series
+
+
+def normalize(series):
+    """Rescale to a peak of 100 (the stored scale is arbitrary)"""
+    peak = series.to_numpy().max() if not series.empty else 0
+    return (series * (100 / peak)).round(2) if peak > 0 else series
+
+
+def load_daily(keywords, geo='', root=columnar_store.DEFAULT_ROOT, normalized=True):
+    """
+    Stored daily series (date index, one column per keyword), or an empty
+    DataFrame if the keywords were not stitched together as one group
+    """
+    keywords = list(dict.fromkeys(keywords))
+    df = columnar_store.read_dataset(root, DATASET, geo=geo_key(geo), keyword=keywords)
+    group = '|'.join(keywords)
+    if df.empty or set(df['keyword']) != set(keywords) or (df['GROUP'] != group).any():
+        return pd.DataFrame()
+    series = df.pivot(index='DATE', columns='keyword', values='VALUE')[keywords]
+    series.index = pd.to_datetime(series.index)
+    series.index.name = 'date'
+    series.columns.name = None
+    return normalize(series) if normalized else series
+
+
+class TrendsStitcher:
+    def __init__(self, root=columnar_store.DEFAULT_ROOT, workers=3, min_interval=5.0,
+                 window=WINDOW_DAYS, overlap=OVERLAP_DAYS, cache_dir=CACHE_DIR):
+        self.root = root
+        self.workers = workers
+        self.window = window
+        self.overlap = overlap
+        self.cache_dir = cache_dir
+        self.limiter = http_client.RateLimiter(min_interval)
+        self._local = threading.local()
+
+    def planner(self):
+        """One TrendsPlanner (own pytrends session) per worker thread, one shared limiter"""
+        if not hasattr(self._local, 'planner'):
+            self._local.planner = TrendsPlanner(self.cache_dir, limiter=self.limiter)
+        return self._local.planner
+
+    def fetch_window(self, keywords, window, geo):
+        """Daily interest for one window; no search volume comes back as zeros"""
+        df = self.planner().fetch('time', keywords, timeframe(window), geo)
+        if df.empty:
+            days = pd.date_range(window[0], window[1], freq='D', name='date')
+            return pd.DataFrame(0.0, index=days, columns=keywords)
+        return df[keywords].astype(float)
+
+    def fetch_windows(self, keywords, windows, geo):
+        """Every window, requested concurrently; returned in date order"""
+        frames = [None] * len(windows)
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {pool.submit(self.fetch_window, keywords, w, geo): i
+                       for i, w in enumerate(windows)}
+            for future in as_completed(futures):
+                frames[futures[future]] = future.result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return frames
+
+    def store(self, series, keywords, geo):
+        group = '|'.join(keywords)
+        dates = series.index.strftime('%Y-%m-%d')
+        for keyword in keywords:
+            df = pd.DataFrame({'DATE': dates, 'VALUE': series[keyword].to_numpy(),
+                               'GROUP': group})
+            columnar_store.write_partition(df, self.root, DATASET,
+                                           {'geo': geo_key(geo), 'keyword': keyword})
+
+    def update(self, keywords, start=DEFAULT_START, end=None, geo=''):
+        """
+        Extend the daily series of `keywords` (at most 5, stitched on one
+        scale) through `end` (default yesterday - today's value is partial).
+        The stored series is extended when it already covers `start`,
+        otherwise rebuilt from `start`. Returns the series at a peak of 100.
+        """
+        keywords = list(dict.fromkeys(keywords))
+        if len(keywords) > BATCH_SIZE:
+            raise ValueError(f"At most {BATCH_SIZE} keywords share one daily scale")
+        end = pd.Timestamp(end) if end else pd.Timestamp.now().normalize() - pd.Timedelta(days=1)
+
+        series = load_daily(keywords, geo, self.root, normalized=False)
+        if not series.empty and series.index.min() > pd.Timestamp(start):
+            series = pd.DataFrame()
+        if not series.empty and series.index.max() >= end:
+            print(f"[OK] {', '.join(keywords)}: up to date through {series.index.max():%Y-%m-%d}")
+            return normalize(series)
+
+        if series.empty:
+            first = pd.Timestamp(start)
+        else:
+            first = series.index.max() - pd.Timedelta(days=self.overlap - 1)
+        windows = plan_windows(first, end, self.window, self.overlap)
+        print(f"[PLAN] {', '.join(keywords)} ({geo_key(geo)}): {len(windows)} windows "
+              f"{first:%Y-%m-%d} to {end:%Y-%m-%d}, {self.workers} workers")
+
+        with instrumentation.step('trends_stitcher.fetch'):
+            frames = self.fetch_windows(keywords, windows, geo)
+        with instrumentation.step('trends_stitcher.chain'):
+            series = chain(frames, None if series.empty else series)
+            instrumentation.record_rows(rows_in=sum(len(f) for f in frames), rows_out=len(series))
+        self.store(series, keywords, geo)
+        print(f"[OK] {len(series)} days through {series.index.max():%Y-%m-%d}")
+        return normalize(series)
+
+    def collect_daily_trends(self, keywords=None, start=DEFAULT_START, geo=''):
+        """Pipeline entry point: update every keyword group (5 per shared scale)"""
+        print("="*70)
+        print("DAILY GOOGLE TRENDS (stitched windows)")
+        print("="*70)
+
+        keywords = list(dict.fromkeys(keywords or DEFAULT_KEYWORDS))
+        results = {}
+        for i in range(0, len(keywords), BATCH_SIZE):
+            group = keywords[i:i + BATCH_SIZE]
+            try:
+                results[tuple(group)] = self.update(group, start, geo=geo)
+            except Exception as e:
+                print(f"[ERROR] {', '.join(group)}: {e}")
+                print("[TIP] Fetched windows are cached - re-run to resume.")
+
+        print(f"\n[SUCCESS] Daily trends stored under {self.root}/{DATASET}")
+        return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stitch multi-year daily Google Trends series")
+    parser.add_argument('keywords', nargs='*', default=None,
+                        help=f"Up to 5 keywords share one scale (default: {', '.join(DEFAULT_KEYWORDS)})")
+    parser.add_argument('--start', default=DEFAULT_START)
+    parser.add_argument('--geo', default='', help="e.g. US, US-WA (default worldwide)")
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--min-interval', type=float, default=5.0,
+                        help="Seconds between Trends requests across workers")
+    parser.add_argument('--root', default=columnar_store.DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    TrendsStitcher(args.root, args.workers, args.min_interval).collect_daily_trends(
+        args.keywords, args.start, args.geo)
+    instrumentation.write_run()